@@ -1,9 +1,14 @@
-import openai
+import argparse
 import os
+import sys
 from dotenv import load_dotenv
 import csv  
 import time
 
+# El pipeline vive en la app Django pero no depende de Django
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_project"))
+from quiz.generation_pipeline import FakeLLM, OpenAIClient, generate  # noqa: E402
+
 
 # Definir las categorías
 categories = [
@@ -19,67 +24,46 @@ categories = [
     "Current Events", "World Cultures", "Architecture", "Famous People", "Pop Culture"
 ]
 
-# Función para generar preguntas usando OpenAI
-def generate_questions(category, num_questions=50):  # Reducción a 50 preguntas por lote
-    questions = []
-    for _ in range(num_questions):
-        prompt = f"Genera una pregunta de opción múltiple sobre {category} con 4 respuestas posibles, indicando la respuesta correcta."
-        
-        # Llamada a la API de OpenAI con el modelo actualizado
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",  # Modelo gpt-3.5-turbo
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=150,  # Ajusta según sea necesario
-            n=1,
-            temperature=0.7
-        )
-        
-        question_data = response['choices'][0]['message']['content'].strip().split("\n")
-        question_text = question_data[0]
-        answers = question_data[1:]
-        
-        # Crear un diccionario con la pregunta y las respuestas
-        question = {
-            "category": category,
-            "question": question_text,
-            "answers": answers
-        }
-        questions.append(question)
-    return questions
-
 # Guardar las preguntas en un archivo CSV
 def save_to_csv(questions, filename='questions_data.csv'):
     with open(filename, mode='w', newline='') as file:
         writer = csv.writer(file)
-        writer.writerow(['Category', 'Question', 'Answer 1', 'Answer 2', 'Answer 3', 'Answer 4'])
+        writer.writerow(['Category', 'Question', 'Answer 1', 'Answer 2', 'Answer 3', 'Answer 4', 'Correct Answer'])
         
         for question in questions:
-            row = [
-                question['category'],
-                question['question'],
-                question['answers'][0],
-                question['answers'][1],
-                question['answers'][2],
-                question['answers'][3]
-            ]
+            answers = [answer['text'] for answer in question['answers']][:4]
+            correct = next((answer['text'] for answer in question['answers'] if answer.get('is_correct')), '')
+            row = [question['category'], question['question'], *answers, *[''] * (4 - len(answers)), correct]
             writer.writerow(row)
 
-# Generar las preguntas por categoría y hacer múltiples solicitudes
-def generate_all_questions():
-    all_questions = []
-    for category in categories:
-        print(f"Generando preguntas para la categoría: {category}")
-        # Realizar la solicitud por lotes pequeños
-        category_questions = generate_questions(category, 50)  # Solicita 50 preguntas por categoría
-        all_questions.extend(category_questions)
-        
-        # Pausa entre solicitudes para no exceder los límites de la API
-        time.sleep(2)  # Puedes ajustar este tiempo según sea necesario
-    
-    return all_questions
+# Generar las preguntas de todas las categorías en paralelo, respetando los límites de la API
+def generate_all_questions(client, per_category=50, batch_size=10, concurrency=8, rpm=None, tpm=None):
+    print(f"Generando {per_category} preguntas para {len(categories)} categorías...")
+    return generate(
+        categories, per_category, client,
+        batch_size=batch_size,
+        concurrency=concurrency,
+        requests_per_minute=rpm,
+        tokens_per_minute=tpm,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera preguntas de opción múltiple y las guarda en CSV.")
+    parser.add_argument("--per-category", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=10, help="Preguntas por prompt.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=None, help="Límite de peticiones por minuto.")
+    parser.add_argument("--tpm", type=int, default=None, help="Límite de tokens por minuto.")
+    parser.add_argument("--fake", action="store_true", help="Usar el LLM falso local (benchmark sin red).")
+    parser.add_argument("--output", default="questions_data.csv")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = FakeLLM() if args.fake else OpenAIClient(api_key=os.environ.get("OPENAI_API_KEY"))
 
-# Guardar todas las preguntas en un archivo CSV
-all_questions = generate_all_questions()
-save_to_csv(all_questions)
+    started = time.perf_counter()
+    all_questions = generate_all_questions(client, args.per_category, args.batch_size, args.concurrency, args.rpm, args.tpm)
+    save_to_csv(all_questions, args.output)
 
-print("Las preguntas han sido generadas y guardadas en 'questions_data.csv'.")
\ No newline at end of file
+    print(f"Las preguntas han sido generadas y guardadas en '{args.output}' ({len(all_questions)} en {time.perf_counter() - started:.1f}s).")
@@ -1,10 +1,11 @@
 from django.contrib import admin
-from django.http import HttpResponse
-import csv
+from django.http import HttpResponseBadRequest
 from django.urls import path
 from django.shortcuts import redirect
 from django.template.response import TemplateResponse
-from .models import Question, Answer, Score, QuizCategory
+from .models import Question, Answer, Score, QuizCategory, GenerationJob
+from .score_export import FORMATS, filter_by_date_range, streaming_export
+from .search import filter_by_search
 @admin.register(QuizCategory)
 class QuizCategoryAdmin(admin.ModelAdmin):
     list_display = ('name',)    
@@ -12,23 +13,18 @@ class QuizCategoryAdmin(admin.ModelAdmin):
     ordering = ('name',)
     
 
-# 🔹 Función para exportar puntuaciones a CSV
+# 🔹 Funciones para exportar puntuaciones (en streaming, por bloques)
 def export_scores_to_csv(modeladmin, request, queryset=None):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="scores.csv"'
-    writer = csv.writer(response, csv.excel, delimiter=',')
+    scores = queryset if queryset is not None else Score.objects.all()
+    return streaming_export(scores, 'csv')
 
-    # Escribir encabezados
-    writer.writerow(['Jugador', 'Puntos', 'Fecha'])
-
-    # Obtener los datos a exportar (todos o filtrados)
-    scores = queryset if queryset else Score.objects.all()
-    for score in scores:
-        writer.writerow([score.player_name, score.points, score.date.strftime('%Y-%m-%d %H:%M:%S')])
+export_scores_to_csv.short_description = "📥 Exportar puntuaciones a CSV"
 
-    return response
+def export_scores_to_jsonl(modeladmin, request, queryset=None):
+    scores = queryset if queryset is not None else Score.objects.all()
+    return streaming_export(scores, 'jsonl')
 
-export_scores_to_csv.short_description = "📥 Exportar puntuaciones a CSV"
+export_scores_to_jsonl.short_description = "📥 Exportar puntuaciones a JSONL"
 
 # 🔹 Inline para mostrar respuestas dentro de la pregunta
 class AnswerInline(admin.TabularInline):
@@ -41,10 +37,17 @@ class AnswerInline(admin.TabularInline):
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ('text', 'quiz_category', 'difficulty')
     list_filter = ('quiz_category', 'difficulty')
+    list_select_related = ('quiz_category',)
     search_fields = ('text',)
     ordering = ('difficulty',)
     inlines = [AnswerInline]
 
+    # Búsqueda con el índice FTS5 en lugar de LIKE '%term%'
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return filter_by_search(queryset, search_term), False
+
 # 🔹 Configuración del modelo Score en el admin (con botón de exportación)
 @admin.register(Score)
 class ScoreAdmin(admin.ModelAdmin):
@@ -52,7 +55,7 @@ class ScoreAdmin(admin.ModelAdmin):
     list_filter = ('date',)
     search_fields = ('player_name',)
     ordering = ('-points',)
-    actions = [export_scores_to_csv]
+    actions = [export_scores_to_csv, export_scores_to_jsonl]
     actions_on_top = True
     change_list_template = "admin/score_change_list.html"  # Plantilla personalizada
 
@@ -64,13 +67,35 @@ class ScoreAdmin(admin.ModelAdmin):
         ]
         return custom_urls + urls
 
-    # Vista para exportar todas las puntuaciones
+    # Vista para exportar todas las puntuaciones (?format=csv|jsonl&since=YYYY-MM-DD&until=YYYY-MM-DD)
     def export_all_scores(self, request):
-        return export_scores_to_csv(self, request)
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in FORMATS:
+            return HttpResponseBadRequest(f"format must be one of: {', '.join(FORMATS)}.")
+        try:
+            scores = filter_by_date_range(Score.objects.all(), request.GET.get('since'), request.GET.get('until'))
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        return streaming_export(scores, fmt)
 
 # 🔹 Configuración del modelo Answer en el admin
 @admin.register(Answer)
 class AnswerAdmin(admin.ModelAdmin):
     list_display = ('question', 'text', 'is_correct')
     list_filter = ('is_correct',)
+    list_select_related = ('question',)
     search_fields = ('text',)
+
+    # Búsqueda con el índice FTS5 en lugar de LIKE '%term%'
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return filter_by_search(queryset, search_term), False
+
+# 🔹 Trabajos de generación de preguntas con OpenAI
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'category', 'difficulty', 'num_questions', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'difficulty')
+    search_fields = ('category',)
+    readonly_fields = ('attempts', 'locked_until', 'result', 'error', 'created_at', 'started_at', 'finished_at')
@@ -0,0 +1,204 @@
+import threading
+import time
+from itertools import chain
+
+import numpy as np
+
+from . import content_cache
+from .models import Answer, QuizCategory
+from .question_ingest import chunked
+
+POINTS_PER_CORRECT = 10
+
+# grade_many() codes
+CORRECT = 1
+WRONG = 0
+UNKNOWN = -1
+
+_EMPTY = np.empty(0, dtype=np.int64)
+_MAX_ID = np.iinfo(np.int64).max
+
+
+def _fetch(category_ids=None):
+    """
+    Correct answers as ``{category_id: (question_ids, answer_ids)}``, sorted by question then answer.
+
+    One query for the whole bank (chunked ``IN`` lookups for a subset); the
+    rows go straight into one ``int64`` array and are split per category.
+    """
+    queryset = Answer.objects.filter(is_correct=True).order_by().values_list("question__quiz_category_id", "question_id", "id")
+    if category_ids is None:
+        querysets = [queryset]
+    else:
+        querysets = [queryset.filter(question__quiz_category_id__in=chunk) for chunk in chunked(category_ids)]
+    rows = [row for qs in querysets for row in qs.iterator(chunk_size=10000)]
+    if not rows:
+        return {}
+    rows = np.array(rows, dtype=np.int64)
+    rows = rows[np.lexsort((rows[:, 2], rows[:, 1], rows[:, 0]))]
+    boundaries = np.flatnonzero(np.diff(rows[:, 0])) + 1
+    return {int(part[0, 0]): (part[:, 1].copy(), part[:, 2].copy()) for part in np.split(rows, boundaries)}
+
+
+# 🔑 In-process answer key for real-time and batch grading
+class AnswerKey:
+    """
+    Correct answers of every question, held in process memory as NumPy arrays.
+
+    ``_questions`` holds the sorted ids of gradable questions and, for each,
+    where its run of correct answer ids starts in ``_answers`` and how long it
+    is (almost always 1). Looking a batch up is one ``searchsorted`` plus a
+    comparison per answer slot, so grading never touches the database.
+
+    The key is built with one query on first use. It is refreshed when the
+    global content generation (``quiz/content_cache.py``) moves, re-reading
+    only the categories whose own generation changed; the generation is
+    checked at most every ``CHECK_INTERVAL`` seconds.
+    """
+
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._parts = None  # category_id -> (question_ids, answer_ids)
+        self._generations = {}
+        self._generation = None
+        self._checked_at = 0.0
+        self._questions = self._starts = self._counts = self._answers = _EMPTY
+        self._max_count = 0
+
+    def rebuild(self):
+        """Reload the whole key; returns the number of gradable questions."""
+        generation = content_cache.generation()
+        category_ids = list(QuizCategory.objects.values_list("id", flat=True))
+        generations = content_cache.generations(category_ids)
+        self._install(_fetch(), generation, generations)
+        return len(self)
+
+    def refresh(self):
+        """Bring the key up to date (does I/O: call off the event loop)."""
+        generation = content_cache.generation()
+        if self._parts is None:
+            return self.rebuild()
+        if generation == self._generation:
+            self._checked_at = time.monotonic()
+            return len(self)
+        # Read the generations before the rows: a change racing with this
+        # refresh bumps them again and is picked up by the next one.
+        category_ids = list(QuizCategory.objects.values_list("id", flat=True))
+        generations = content_cache.generations(category_ids)
+        changed = [category_id for category_id in category_ids if generations[category_id] != self._generations.get(category_id)]
+        parts = {category_id: part for category_id, part in self._parts.items() if category_id in generations}
+        for category_id in changed:
+            parts.pop(category_id, None)
+        parts.update(_fetch(changed) if changed else {})
+        self._install(parts, generation, generations)
+        return len(self)
+
+    def needs_check(self):
+        return self._parts is None or time.monotonic() - self._checked_at >= self.CHECK_INTERVAL
+
+    def _install(self, parts, generation, generations):
+        if parts:
+            question_ids = np.concatenate([part[0] for part in parts.values()])
+            answer_ids = np.concatenate([part[1] for part in parts.values()])
+            order = np.lexsort((answer_ids, question_ids))
+            question_ids, answer_ids = question_ids[order], answer_ids[order]
+            questions, starts, counts = np.unique(question_ids, return_index=True, return_counts=True)
+        else:
+            answer_ids = questions = starts = counts = _EMPTY
+        with self._lock:
+            self._parts = parts
+            self._questions, self._starts, self._counts, self._answers = questions, starts, counts, answer_ids
+            self._max_count = int(counts.max()) if len(counts) else 0
+            self._generation = generation
+            self._generations = generations
+            self._checked_at = time.monotonic()
+
+    def grade_many(self, question_ids, answer_ids):
+        """
+        Grade many answers at once: an ``int8`` array of ``CORRECT``, ``WRONG``
+        or ``UNKNOWN`` (a question without correct answers, or that does not exist).
+        """
+        with self._lock:
+            questions, starts, counts, answers, max_count = (
+                self._questions, self._starts, self._counts, self._answers, self._max_count,
+            )
+        question_ids = np.asarray(question_ids, dtype=np.int64)
+        answer_ids = np.asarray(answer_ids, dtype=np.int64)
+        result = np.full(question_ids.shape, UNKNOWN, dtype=np.int8)
+        if not len(questions):
+            return result
+
+        position = np.minimum(np.searchsorted(questions, question_ids), len(questions) - 1)
+        known = questions[position] == question_ids
+        start, count = starts[position], counts[position]
+        correct = np.zeros(question_ids.shape, dtype=bool)
+        for slot in range(max_count):
+            index = np.minimum(start + slot, len(answers) - 1)
+            correct |= (slot < count) & (answers[index] == answer_ids)
+        result[known] = np.where(correct[known], CORRECT, WRONG)
+        return result
+
+    def grade(self, question_id, answer_id):
+        """``True``/``False`` for a known question, ``None`` for an unknown one. Pure in-memory lookup."""
+        code = self.grade_many([question_id], [answer_id])[0]
+        return None if code == UNKNOWN else bool(code == CORRECT)
+
+    def __len__(self):
+        return len(self._questions)
+
+
+answer_key = AnswerKey()
+
+
+# 📝 Batch grading of answer sheets
+def grade_sheets(sheets):
+    """
+    Grade answer sheets in one vectorized pass.
+
+    ``sheets`` is a list of lists of ``(question_id, answer_id)`` pairs.
+    Returns ``(correct, unknown)``: per-sheet counts as NumPy arrays.
+    """
+    lengths = np.fromiter((len(sheet) for sheet in sheets), dtype=np.int64, count=len(sheets))
+    total = int(lengths.sum())
+    # Flattened in C by chain(): this is most of the cost for a large batch.
+    pairs = np.fromiter(chain.from_iterable(chain.from_iterable(sheets)), dtype=np.int64, count=2 * total).reshape(-1, 2)
+    codes = answer_key.grade_many(pairs[:, 0], pairs[:, 1])
+    sheet_index = np.repeat(np.arange(len(sheets)), lengths)
+    correct = np.bincount(sheet_index, weights=codes == CORRECT, minlength=len(sheets)).astype(np.int64)
+    unknown = np.bincount(sheet_index, weights=codes == UNKNOWN, minlength=len(sheets)).astype(np.int64)
+    return correct, unknown
+
+
+def _is_id(value):
+    return type(value) is int and 0 < value <= _MAX_ID
+
+
+def validate_sheets(items):
+    """
+    Check answer-sheet payloads (``{"player_name": str, "answers": [[question_id, answer_id], ...]}``).
+
+    Returns ``(player_names, sheets, errors)``: the valid items and a list of
+    ``{"index": i, "errors": {...}}`` for the invalid ones.
+    """
+    player_names, sheets, errors = [], [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({"index": index, "errors": {"non_field_errors": ["Expected an object."]}})
+            continue
+        item_errors = {}
+        player_name = item.get("player_name")
+        if not isinstance(player_name, str) or not 1 <= len(player_name) <= 100:
+            item_errors["player_name"] = ["A name of 1 to 100 characters is required."]
+        answers = item.get("answers")
+        if not isinstance(answers, list) or not all(
+            type(pair) is list and len(pair) == 2 and _is_id(pair[0]) and _is_id(pair[1]) for pair in answers
+        ):
+            item_errors["answers"] = ["Expected a list of [question_id, answer_id] pairs."]
+        if item_errors:
+            errors.append({"index": index, "errors": item_errors})
+        else:
+            player_names.append(player_name)
+            sheets.append(answers)
+    return player_names, sheets, errors
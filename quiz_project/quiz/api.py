@@ -1,11 +1,13 @@
 from rest_framework import viewsets
 from .models import Question, Answer, Score
 from .serializers import QuestionSerializer, AnswerSerializer, ScoreSerializer
+from .pagination import QuestionCursorPagination
 
 class QuestionViewSet(viewsets.ModelViewSet):
     """API endpoint for managing questions"""
-    queryset = Question.objects.all()
+    queryset = Question.objects.with_answers()
     serializer_class = QuestionSerializer
+    pagination_class = QuestionCursorPagination
 
 class AnswerViewSet(viewsets.ModelViewSet):
     """API endpoint for managing answers"""
@@ -2,7 +2,7 @@ import openai
 import os
 import json
 from dotenv import load_dotenv
-from quiz.models import Question, Answer, QuizCategory
+from quiz.question_ingest import ingest_questions
 
 # Cargar variables de entorno una sola vez
 load_dotenv()
@@ -12,7 +12,7 @@ openai.api_key = os.environ.get("OPENAI_API_KEY")
 
 def generate_questions_from_openai(prompt, num_questions=5):
     try:
-        response = openai.ChatCompletion.create(
+        response = openai.OpenAI().chat.completions.create(
             model="gpt-3.5-turbo",  # Asegúrate de que este modelo exista
             messages=[
                 {"role": "system", "content": "You are a helpful assistant."},
@@ -21,7 +21,7 @@ def generate_questions_from_openai(prompt, num_questions=5):
             max_tokens=700,
             temperature=0.7
         )
-        content = response["choices"][0]["message"]["content"]
+        content = response.choices[0].message.content
 
         # Intentar parsear como JSON
         try:
@@ -31,44 +31,23 @@ def generate_questions_from_openai(prompt, num_questions=5):
             print("❌ Error: No se pudo parsear la respuesta JSON de OpenAI.")
             return []
 
-    except openai.error.OpenAIError as e:
+    except openai.OpenAIError as e:
         print(f"❌ Error de OpenAI: {e}")
         return []
 
 def save_questions_to_db(questions_data):
     """
-    Guarda preguntas y respuestas en la base de datos.
+    Guarda preguntas y respuestas en la base de datos (en bloque, en una transacción).
     :param questions_data: Lista de diccionarios con preguntas y respuestas.
+    :return: Número de preguntas nuevas guardadas.
     """
-    for question_data in questions_data:
-        category_name = question_data.get("category", "General Knowledge")
-        difficulty = question_data.get("difficulty", "easy")
-        question_text = question_data.get("question", "")
-
-        # Buscar o crear la categoría
-        category, _ = QuizCategory.objects.get_or_create(name=category_name)
-
-        # Evitar duplicados
-        if Question.objects.filter(text=question_text, quiz_category=category).exists():
-            print(f"⚠️ La pregunta '{question_text}' ya existe en la base de datos.")
-            continue
-
-        # Crear la pregunta
-        question = Question.objects.create(
-            text=question_text,
-            quiz_category=category,
-            difficulty=difficulty
-        )
-
-        # Guardar respuestas asociadas
-        for answer_data in question_data.get("answers", []):
-            Answer.objects.create(
-                question=question,
-                text=answer_data["text"],
-                is_correct=answer_data["is_correct"]
-            )
-
-        print(f"✅ Pregunta guardada: {question_text}")
+    report = ingest_questions(questions_data)
+    if report["skipped"]:
+        print(f"⚠️ {len(report['skipped'])} preguntas ya existían en la base de datos.")
+    if report["invalid"]:
+        print(f"❌ {len(report['invalid'])} preguntas inválidas descartadas: {report['invalid'][:3]}")
+    print(f"✅ {report['inserted']} preguntas guardadas.")
+    return report["inserted"]
 
 def main():
     # Prompt mejorado para asegurar salida JSON correcta
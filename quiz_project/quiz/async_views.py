@@ -0,0 +1,79 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from . import content_cache, rollups
+from .leaderboard import leaderboard
+from .models import Question, QuizCategory
+from .sampler import asample_questions
+from .serializers import QuestionSerializer, QuizCategorySerializer
+from .views import _parse_question_filters
+
+# ⚡ Async read endpoints
+#
+# Native coroutine views for the read-heavy routes, for the ASGI (daphne)
+# deployment: they await the async ORM and cache instead of occupying a
+# thread of the sync-to-async pool for the whole request the way the DRF
+# views do. They are public and return the same payloads as their sync
+# counterparts under /async/. DRF has no async views, so these are plain
+# Django views; serializers are only used to shape already loaded rows.
+
+
+def _error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+# 🎯 Random Questions
+@require_GET
+async def random_questions(request):
+    """Async ``get_random_questions``: same ``category``, ``difficulty`` and ``count`` filters."""
+    params = request.GET.copy()
+    category = params.get("category") or ""
+    if category and not category.isdigit():
+        # Resolved here so the shared parser does not query the database.
+        category_id = await QuizCategory.objects.filter(name=category).values_list("id", flat=True).afirst()
+        if category_id is None:
+            return _error(f"Unknown category '{category}'.")
+        params["category"] = str(category_id)
+    filters, error = _parse_question_filters(params)
+    if error:
+        return _error(error)
+    category_id, difficulty, count = filters
+
+    questions = await asample_questions(count, category_id=category_id, difficulty=difficulty)
+    if len(questions) < count:
+        return _error("Not enough questions available.")
+    return JsonResponse(QuestionSerializer(questions, many=True).data, safe=False)
+
+
+# 🏆 Ranking
+@require_GET
+async def ranking(request):
+    """Async ``get_ranking``: ``?window=day|week|month|all``."""
+    window = request.GET.get("window", "all")
+    if window == "all":
+        return JsonResponse(await leaderboard.atop(10), safe=False)
+    if window not in rollups.PERIODS:
+        return _error("window must be one of day, week, month, all.")
+    return JsonResponse(await rollups.atop(window, 10), safe=False)
+
+
+# 📚 Categories
+@require_GET
+async def categories(request):
+    async def render():
+        return QuizCategorySerializer([category async for category in QuizCategory.objects.order_by("id")], many=True).data
+
+    return JsonResponse(await content_cache.aget_or_set("categories", (), render), safe=False)
+
+
+# ❓ Question Detail
+@require_GET
+async def question_detail(request, question_id):
+    async def render():
+        question = await Question.objects.with_answers().filter(pk=question_id).afirst()
+        return QuestionSerializer(question).data if question is not None else None
+
+    data = await content_cache.aget_or_set("question", (question_id,), render)
+    if data is None:
+        return _error("Question not found.", status=404)
+    return JsonResponse(data)
@@ -0,0 +1,189 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+# 🗄️ Two-tier cache: per-process LRU (L1) in front of a shared backend (L2)
+class TwoTierCache(BaseCache):
+    """
+    Cache backend that serves hot keys from process memory.
+
+    Every read goes to a bounded LRU in this process first and falls back to
+    the shared cache named by ``OPTIONS['L2']`` (Redis in production, an
+    in-process cache for single-worker development). Writes go to both tiers.
+
+    L1 entries stay valid while a shared *epoch* counter in L2 is unchanged.
+    ``delete``, ``incr``, ``decr`` and ``clear`` bump the epoch, and each
+    process re-reads it at most every ``L1_CHECK_INTERVAL`` seconds, dropping
+    its whole L1 when it moved. Plain ``set`` does not bump it (most writes are
+    fills of new, versioned keys), so an overwritten key is seen by other
+    processes once their copy reaches ``L1_TIMEOUT``.
+
+    Options::
+
+        'OPTIONS': {
+            'L2': 'shared',            # alias of the shared cache in CACHES
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 5,           # seconds an L1 copy may be served
+            'L1_CHECK_INTERVAL': 0.5,  # seconds between epoch checks
+        }
+    """
+
+    EPOCH_KEY = "twotier:epoch"
+
+    def __init__(self, location, params):
+        options = params.get("OPTIONS", {})
+        super().__init__(params)
+        self._l2_alias = options.get("L2", "shared")
+        self._l1_max_entries = int(options.get("L1_MAX_ENTRIES", 1000))
+        self._l1_timeout = float(options.get("L1_TIMEOUT", 5))
+        self._check_interval = float(options.get("L1_CHECK_INTERVAL", 0.5))
+        self._l1 = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._checked_at = 0.0
+        self._stats = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    # 📊 Hit/miss counters
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "l1_entries": len(self._l1)}
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = 0
+
+    # 🧱 L1 helpers
+    def _sync_epoch(self):
+        now = time.monotonic()
+        if now - self._checked_at < self._check_interval:
+            return
+        epoch = self.l2.get(self.EPOCH_KEY)
+        with self._lock:
+            self._checked_at = now
+            if epoch != self._epoch:
+                self._l1.clear()
+                self._epoch = epoch
+
+    def _bump_epoch(self):
+        try:
+            epoch = self.l2.incr(self.EPOCH_KEY)
+        except ValueError:
+            # Seeded from the clock so a lost epoch never reappears at an old value.
+            self.l2.add(self.EPOCH_KEY, time.time_ns(), timeout=None)
+            epoch = self.l2.incr(self.EPOCH_KEY)
+        with self._lock:
+            self._l1.clear()
+            self._epoch = epoch
+            self._checked_at = time.monotonic()
+
+    def _l1_get(self, key):
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                self._stats["l1_misses"] += 1
+                return False, None
+            expires, payload = entry
+            if expires <= time.monotonic():
+                del self._l1[key]
+                self._stats["l1_misses"] += 1
+                return False, None
+            self._l1.move_to_end(key)
+            self._stats["l1_hits"] += 1
+        return True, pickle.loads(payload)
+
+    def _l1_set(self, key, value, timeout):
+        self._sync_epoch()
+        ttl = self._l1_timeout
+        if timeout is not None and timeout != DEFAULT_TIMEOUT:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._l1_delete(key)
+            return
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._l1[key] = (time.monotonic() + ttl, payload)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, key):
+        with self._lock:
+            self._l1.pop(key, None)
+
+    # 🔌 Cache API
+    def get(self, key, default=None, version=None):
+        self._sync_epoch()
+        l1_key = self.make_and_validate_key(key, version=version)
+        found, value = self._l1_get(l1_key)
+        if found:
+            return value
+        return self._l2_get(key, l1_key, default, version)
+
+    async def aget(self, key, default=None, version=None):
+        # An L1 hit between epoch checks is served on the event loop; anything
+        # touching L2 runs in a thread like the default async wrappers.
+        if time.monotonic() - self._checked_at >= self._check_interval:
+            return await super().aget(key, default, version=version)
+        l1_key = self.make_and_validate_key(key, version=version)
+        found, value = self._l1_get(l1_key)
+        if found:
+            return value
+        return await sync_to_async(self._l2_get)(key, l1_key, default, version)
+
+    def _l2_get(self, key, l1_key, default, version):
+        sentinel = object()
+        value = self.l2.get(key, sentinel, version=version)
+        with self._lock:
+            self._stats["l2_misses" if value is sentinel else "l2_hits"] += 1
+        if value is sentinel:
+            return default
+        self._l1_set(l1_key, value, None)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout=timeout, version=version)
+        self._l1_set(self.make_and_validate_key(key, version=version), value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._l1_set(self.make_and_validate_key(key, version=version), value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        deleted = self.l2.delete(key, version=version)
+        self._bump_epoch()
+        return deleted
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version=version)
+        self._bump_epoch()
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def has_key(self, key, version=None):
+        sentinel = object()
+        return self.get(key, sentinel, version=version) is not sentinel
+
+    def clear(self):
+        self.l2.clear()
+        self._bump_epoch()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
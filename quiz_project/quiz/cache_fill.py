@@ -0,0 +1,134 @@
+import asyncio
+import math
+import random
+import time
+
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import ImproperlyConfigured
+
+
+# 🚦 Single-flight cache fills with probabilistic early refresh
+#
+# Values are stored in an envelope with their logical expiry and how long they
+# took to compute, and kept physically for an extra grace period so a stale
+# copy is available while one caller recomputes:
+#
+# * Before expiry, each reader recomputes early with a probability that grows
+#   as expiry approaches and with the cost of the fill (XFetch), so hot keys
+#   are usually refreshed before they expire.
+# * Whoever wins a short ``add`` lock recomputes; everybody else gets the stale
+#   value, or waits for the winner's result if there is none yet. The lock
+#   needs an atomic ``add`` (Redis, or locmem within one process): it is taken
+#   in the shared tier of a ``TwoTierCache``, and a file-based cache, whose
+#   ``add`` is a check-then-write, is refused.
+
+_MARKER = "__single_flight__"
+
+
+def _lock_key(key):
+    return f"{key}:fill-lock"
+
+
+def _lock_cache(cache):
+    """The cache the fill lock is taken in: the shared tier, which must have an atomic ``add``."""
+    lock_cache = getattr(cache, "l2", cache)
+    if isinstance(lock_cache, FileBasedCache):
+        raise ImproperlyConfigured(
+            "Single-flight fills need a cache with an atomic add() (Redis, or locmem for a single process); "
+            "FileBasedCache is not atomic."
+        )
+    return lock_cache
+
+
+def get_or_fill(key, compute, timeout, cache=None, lock_timeout=30, wait=10.0, poll=0.05, beta=1.0, grace=None):
+    """
+    Return the cached value for ``key``, recomputing it with ``compute()`` at most once at a time.
+
+    ``timeout`` is the logical lifetime; stale copies are kept ``grace``
+    seconds longer (default: ``timeout``). Callers that lose the lock and
+    have no stale copy wait up to ``wait`` seconds for the winner, then
+    compute themselves rather than fail.
+    """
+    cache = cache or default_cache
+    grace = timeout if grace is None else grace
+    envelope = _unwrap(cache.get(key))
+
+    if envelope is not None and _fresh(envelope, beta):
+        return envelope[0]
+
+    if _lock_cache(cache).add(_lock_key(key), 1, timeout=lock_timeout):
+        return _fill(cache, key, compute, timeout, grace)
+
+    if envelope is not None:
+        return envelope[0]
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(poll)
+        envelope = _unwrap(cache.get(key))
+        if envelope is not None:
+            return envelope[0]
+    return _fill(cache, key, compute, timeout, grace, locked=False)
+
+
+def _fill(cache, key, compute, timeout, grace, locked=True):
+    started = time.time()
+    try:
+        value = compute()
+        delta = time.time() - started
+        cache.set(key, (_MARKER, value, started + delta + timeout, delta), timeout=timeout + grace)
+        return value
+    finally:
+        if locked:
+            # Expire the lock rather than delete it: a delete would flush the
+            # per-process tier of a TwoTierCache everywhere.
+            _lock_cache(cache).touch(_lock_key(key), 0)
+
+
+async def aget_or_fill(key, compute, timeout, cache=None, lock_timeout=30, wait=10.0, poll=0.05, beta=1.0, grace=None):
+    """``get_or_fill`` for async views: same envelopes and lock, ``compute`` is a coroutine function."""
+    cache = cache or default_cache
+    grace = timeout if grace is None else grace
+    envelope = _unwrap(await cache.aget(key))
+    if envelope is not None and _fresh(envelope, beta):
+        return envelope[0]
+
+    if await _lock_cache(cache).aadd(_lock_key(key), 1, timeout=lock_timeout):
+        return await _afill(cache, key, compute, timeout, grace)
+
+    if envelope is not None:
+        return envelope[0]
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        await asyncio.sleep(poll)
+        envelope = _unwrap(await cache.aget(key))
+        if envelope is not None:
+            return envelope[0]
+    return await _afill(cache, key, compute, timeout, grace, locked=False)
+
+
+async def _afill(cache, key, compute, timeout, grace, locked=True):
+    started = time.time()
+    try:
+        value = await compute()
+        delta = time.time() - started
+        await cache.aset(key, (_MARKER, value, started + delta + timeout, delta), timeout=timeout + grace)
+        return value
+    finally:
+        if locked:
+            await _lock_cache(cache).atouch(_lock_key(key), 0)
+
+
+def _fresh(envelope, beta):
+    _, expires_at, delta = envelope
+    # XFetch: -log(U) is exponentially distributed, so the refresh window
+    # scales with the fill cost and only rarely opens far from expiry.
+    return time.time() - delta * beta * math.log(1.0 - random.random()) < expires_at
+
+
+def _unwrap(stored):
+    if isinstance(stored, tuple) and len(stored) == 4 and stored[0] == _MARKER:
+        return stored[1:]
+    return None
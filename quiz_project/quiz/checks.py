@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends whose add/incr are atomic across processes.
+ATOMIC_SHARED_BACKENDS = (
+    "django.core.cache.backends.redis.RedisCache",
+    "django_redis.cache.RedisCache",
+)
+
+
+# 🩺 Deployment checks
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """The shared cache must be Redis once more than one worker runs."""
+    backend = settings.CACHES.get("shared", {}).get("BACKEND")
+    if backend in ATOMIC_SHARED_BACKENDS:
+        return []
+    return [Warning(
+        f"The 'shared' cache uses {backend}, which is not shared between processes or not atomic.",
+        hint="Set QUIZ_CACHE_REDIS_URL: single-flight fills, session cursors, rooms and presence "
+             "rely on atomic add/incr visible to every worker.",
+        id="quiz.W001",
+    )]
@@ -1,38 +1,162 @@
-import asyncio
 import json
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from . import rooms
+from .answer_key import answer_key
+from .sampler import question_index
+
 class QuizTimerConsumer(AsyncWebsocketConsumer):
+    """
+    Temporizador de una sala: ``ws/quiz/timer/<room_id>/``.
+
+    El servidor solo envía eventos al empezar, pausar, reanudar y terminar,
+    con el ``deadline`` (epoch en segundos) y ``server_time``; el cliente
+    hace la cuenta atrás localmente.
+
+    Los eventos de una sala se agrupan en una ventana corta y llegan en un
+    solo mensaje de grupo (``room_events``); ``presence`` lleva el número de
+    jugadores conectados.
+
+    Los jugadores autenticados (sesión o ``?token=<JWT>``, ver
+    ``quiz/ws_auth.py``) responden por el mismo socket (``submit_answer``),
+    solo a las preguntas de la ronda: se corrige contra la clave de respuestas
+    en memoria, se acumula en la caché compartida y las puntuaciones se
+    guardan de una vez al terminar la ronda.
+    """
+
     async def connect(self):
-        self.room_group_name = "quiz_timer"
+        self.room_id = self.scope["url_route"]["kwargs"].get("room_id", "default")
+        self.room_group_name = rooms.group_name(self.room_id)
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
 
+        # Quien llega tarde recibe el estado actual y sigue la cuenta atrás por su cuenta
+        # (antes de la presencia, que son varias idas y vueltas a la caché)
+        state = await rooms.get_state(self.room_id)
+        if state is not None:
+            if state["status"] == rooms.RUNNING:
+                rooms.ensure_scheduler(self.room_id, self.channel_layer)
+            await self.send_event("state", state)
+
+        players = await rooms.update_presence(self.room_id, 1)
+        rooms.broadcast(self.room_id, self.channel_layer, rooms.PRESENCE, {"players": players})
+
     async def disconnect(self, close_code):
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        players = await rooms.update_presence(self.room_id, -1)
+        rooms.broadcast(self.room_id, self.channel_layer, rooms.PRESENCE, {"players": players})
 
     async def receive(self, text_data):
-        """Recibe mensajes del cliente (si es necesario)."""
-        data = json.loads(text_data)
-        action = data.get("action")
+        """Recibe mensajes del cliente: start_timer, pause_timer, resume_timer, stop_timer, get_state, submit_answer."""
+        try:
+            data = json.loads(text_data)
+        except ValueError:
+            return await self.send_error("Invalid JSON.")
+        action = data.get("action") if isinstance(data, dict) else None
 
         if action == "start_timer":
-            await self.start_countdown()
-
-    async def start_countdown(self):
-        """Inicia la cuenta atrás de 30 segundos y envía actualizaciones cada segundo."""
-        for seconds_remaining in range(30, -1, -1):
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "send_timer",
-                    "seconds_remaining": seconds_remaining
-                }
-            )
-            await asyncio.sleep(1)
-
-    async def send_timer(self, event):
-        """Envía la cuenta atrás a los clientes."""
+            duration = data.get("duration", rooms.DEFAULT_DURATION)
+            if not isinstance(duration, int) or not 1 <= duration <= rooms.MAX_DURATION:
+                return await self.send_error(f"duration must be 1..{rooms.MAX_DURATION} seconds.")
+            question_ids, error = await self.round_questions(data)
+            if error:
+                return await self.send_error(error)
+            state = await rooms.start(self.room_id, duration, question_ids)
+            if state is None:
+                # Ya hay una ronda en marcha: no se crea otro bucle, solo se informa
+                return await self.send_event("state", await rooms.get_state(self.room_id))
+            await self.broadcast("started", state)
+        elif action == "pause_timer":
+            state = await rooms.pause(self.room_id)
+            if state is not None:
+                await self.broadcast("paused", state)
+        elif action == "resume_timer":
+            state = await rooms.resume(self.room_id)
+            if state is not None:
+                await self.broadcast("resumed", state)
+        elif action == "stop_timer":
+            state = await rooms.end(self.room_id)
+            if state is not None:
+                # Solo quien termina la ronda guarda las puntuaciones, una vez
+                await rooms.persist_scores(self.room_id, state["round"])
+                await self.broadcast("ended", state)
+        elif action == "get_state":
+            await self.send_event("state", await rooms.get_state(self.room_id))
+        elif action == "submit_answer":
+            await self.submit_answer(data)
+
+    async def round_questions(self, data):
+        """Preguntas de la ronda: ``question_ids`` explícitas o ``count`` al azar; sin ninguna, solo temporizador."""
+        question_ids, count = data.get("question_ids"), data.get("count")
+        limit = rooms.MAX_ROUND_QUESTIONS
+        if question_ids is not None:
+            if not isinstance(question_ids, list) or not 1 <= len(question_ids) <= limit \
+                    or not all(type(question_id) is int for question_id in question_ids):
+                return None, f"question_ids must be a list of 1..{limit} integers."
+            return question_ids, None
+        if count is None:
+            return [], None
+        if type(count) is not int or not 1 <= count <= limit:
+            return None, f"count must be 1..{limit}."
+        question_ids = await question_index.asample_ids(count)
+        if len(question_ids) < count:
+            return None, "Not enough questions available."
+        return question_ids, None
+
+    async def submit_answer(self, data):
+        """Corrige una respuesta sin tocar la base de datos y devuelve la puntuación acumulada."""
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            return await self.send_error("Authentication required to answer.")
+        question_id, answer_id = data.get("question_id"), data.get("answer_id")
+        if type(question_id) is not int or type(answer_id) is not int:
+            return await self.send_error("question_id and answer_id must be integers.")
+
+        state = await rooms.get_state(self.room_id)
+        if not state or state["status"] != rooms.RUNNING or rooms.public_state(state)["remaining"] <= 0:
+            return await self.send_error("No round is running in this room.")
+        if question_id not in state.get("question_ids", ()):
+            return await self.send_error("Question is not part of this round.")
+
+        if answer_key.needs_check():
+            await database_sync_to_async(answer_key.refresh)()
+        correct = answer_key.grade(question_id, answer_id)
+        if correct is None:
+            return await self.send_error("Unknown question.")
+
+        score = await rooms.record_answer(
+            self.room_id, state["round"], user.pk, user.get_username()[:100], question_id, correct,
+        )
+        if score is None:
+            return await self.send_error("Question already answered in this round.")
         await self.send(text_data=json.dumps({
-            "seconds_remaining": event["seconds_remaining"]
+            "event": "answer_result", "question_id": question_id, "correct": correct, "score": score,
         }))
+
+    async def send_error(self, message):
+        await self.send(text_data=json.dumps({"error": message}))
+
+    async def broadcast(self, event, state):
+        if state["status"] == rooms.RUNNING:
+            rooms.ensure_scheduler(self.room_id, self.channel_layer)
+        else:
+            rooms.cancel_scheduler(self.room_id)
+        rooms.broadcast(self.room_id, self.channel_layer, event, rooms.public_state(state))
+
+    async def send_event(self, event, state):
+        await self.timer_event({"event": event, "state": rooms.public_state(state)})
+
+    async def room_events(self, message):
+        """Reparte a este cliente los eventos agrupados de la sala, en orden."""
+        for event, state in message["events"]:
+            await self.timer_event({"event": event, "state": state})
+
+    async def timer_event(self, event):
+        """Envía un evento del temporizador a este cliente."""
+        state = event["state"]
+        payload = {"event": event["event"], **state}
+        if "remaining" in state:
+            # Compatibilidad con clientes que solo leen los segundos restantes
+            payload["seconds_remaining"] = int(state["remaining"])
+        await self.send(text_data=json.dumps(payload))
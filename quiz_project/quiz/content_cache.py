@@ -0,0 +1,87 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from .cache_fill import aget_or_fill, get_or_fill
+
+
+# 🧮 Versioned cache for quiz content
+#
+# Every cached payload derived from questions, answers or categories embeds a
+# generation counter in its key: the global one for payloads that span
+# categories, or one category's counter for payloads scoped to it. A change
+# bumps the counters instead of deleting entries, so invalidation is O(1)
+# however many entries exist; stale ones simply stop being read and expire.
+
+_GLOBAL_KEY = "quiz:gen:global"
+_CATEGORY_KEY = "quiz:gen:category:{}"
+DEFAULT_TIMEOUT = 3600
+
+
+def _counter_key(category_id):
+    return _GLOBAL_KEY if category_id is None else _CATEGORY_KEY.format(category_id)
+
+
+def generation(category_id=None):
+    """Current generation of the global (or one category's) content."""
+    key = _counter_key(category_id)
+    value = cache.get(key)
+    if value is None:
+        # Seed from the clock so a counter evicted from the cache can never
+        # come back at a value that older entries were keyed with.
+        cache.add(key, time.time_ns(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+async def ageneration(category_id=None):
+    key = _counter_key(category_id)
+    value = await cache.aget(key)
+    if value is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        value = await cache.aget(key)
+    return value
+
+
+def generations(category_ids):
+    """Current generation of many categories, read with one ``get_many``."""
+    keys = {category_id: _counter_key(category_id) for category_id in category_ids}
+    found = cache.get_many(keys.values())
+    return {
+        category_id: found[key] if key in found else generation(category_id)
+        for category_id, key in keys.items()
+    }
+
+
+def bump(*category_ids):
+    """Invalidate everything cached for the given categories and every cross-category entry."""
+    for key in {_counter_key(None), *(_counter_key(category_id) for category_id in category_ids if category_id)}:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def make_key(name, *parts, category_id=None, generation_value=None):
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    scope = "all" if category_id is None else f"c{category_id}"
+    if generation_value is None:
+        generation_value = generation(category_id)
+    return f"quiz:{name}:{scope}:g{generation_value}:{digest}"
+
+
+def get_or_set(name, parts, compute, category_id=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Return the cached value for ``(name, parts)`` at the current generation.
+
+    Misses are filled single-flight (see ``quiz/cache_fill.py``), so an
+    invalidation does not send every concurrent request to the database.
+    """
+    return get_or_fill(make_key(name, *parts, category_id=category_id), compute, timeout=timeout)
+
+
+async def aget_or_set(name, parts, compute, category_id=None, timeout=DEFAULT_TIMEOUT):
+    """``get_or_set`` for async views: same keys and entries; ``compute`` is a coroutine function."""
+    key = make_key(name, *parts, category_id=category_id, generation_value=await ageneration(category_id))
+    return await aget_or_fill(key, compute, timeout=timeout)
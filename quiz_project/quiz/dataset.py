@@ -0,0 +1,166 @@
+import itertools
+import random
+from array import array
+from datetime import timedelta
+from functools import partial
+from multiprocessing import Pool
+
+from django.db import connection, transaction
+from django.utils import timezone
+from faker import Faker
+
+from . import content_cache, rollups
+from .leaderboard import leaderboard
+from .models import Answer, Question, Score
+from .hashing import text_hash
+from .question_ingest import existing_hashes, insert_rows, resolve_categories
+from .sampler import question_index
+
+# 🧪 Deterministic synthetic datasets for load testing
+#
+# Every chunk of rows is generated from its own RNG seeded with
+# ``(seed, kind, chunk number)``, so a given seed produces the same rows
+# whatever the chunk count, the number of worker processes or the order in
+# which chunks finish. Dates are offsets from the time of the run.
+
+DIFFICULTY_WEIGHTS = {Question.EASY: 0.5, Question.MEDIUM: 0.35, Question.HARD: 0.15}
+
+
+def _rng(seed, kind, chunk):
+    return random.Random(f"{seed}:{kind}:{chunk}")
+
+
+def _faker(seed, kind, chunk):
+    fake = Faker()
+    fake.seed_instance(f"{seed}:{kind}:{chunk}")
+    return fake
+
+
+def _zipf_cum_weights(n, s):
+    """Cumulative weights for ranks 1..n with P(rank) ∝ 1 / rank ** s."""
+    return list(itertools.accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+
+def category_names(seed, count):
+    fake = _faker(seed, "categories", 0)
+    names = []
+    for number in range(count):
+        name = fake.word().capitalize()
+        names.append(name if name not in names else f"{name} {number}")
+    return names
+
+
+def question_chunk(args):
+    """Text for questions ``start .. start + size``: ``[(category_rank, difficulty, text, answers)]``."""
+    seed, chunk, start, size, categories, answers_per_question = args
+    rng = _rng(seed, "questions", chunk)
+    fake = _faker(seed, "questions", chunk)
+    # Category sizes follow a Zipf law: a few big categories, a long tail.
+    ranks = rng.choices(range(categories), cum_weights=_zipf_cum_weights(categories, 1.0), k=size)
+    difficulties = rng.choices(list(DIFFICULTY_WEIGHTS), weights=list(DIFFICULTY_WEIGHTS.values()), k=size)
+    rows = []
+    for offset in range(size):
+        # The number keeps texts unique within a category, like real questions.
+        text = f"{fake.sentence(nb_words=8)[:-1]}? #{start + offset + 1}"
+        correct = rng.randrange(answers_per_question)
+        answers = [(fake.sentence(nb_words=4)[:-1], i == correct) for i in range(answers_per_question)]
+        rows.append((ranks[offset], difficulties[offset], text, answers))
+    return rows
+
+
+def _chunks(total, chunk_size):
+    for chunk, start in enumerate(range(0, total, chunk_size)):
+        yield chunk, start, min(chunk_size, total - start)
+
+
+def generate_questions(seed, count, categories=50, answers_per_question=4, chunk_size=10000, workers=1, log=print):
+    """Insert ``count`` questions (and their answers) in chunks; returns the touched category ids."""
+    names = category_names(seed, categories)
+    category_ids = resolve_categories(set(names))
+    ids_by_rank = [category_ids[name] for name in names]
+    tasks = (
+        (seed, chunk, start, size, categories, answers_per_question)
+        for chunk, start, size in _chunks(count, chunk_size)
+    )
+
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        # imap keeps chunk order, so ids are assigned the same way every run.
+        chunks = pool.imap(question_chunk, tasks) if pool else map(question_chunk, tasks)
+        done = 0
+        for rows in chunks:
+            keyed = [((ids_by_rank[row[0]], text_hash(row[2])), row) for row in rows]
+            with transaction.atomic():
+                # Rerunning a seed skips the questions it already created.
+                existing = existing_hashes({key for key, _ in keyed})
+                fresh = [(key, row) for key, row in keyed if key not in existing]
+                questions = Question.objects.bulk_create([
+                    Question(quiz_category_id=category_id, difficulty=difficulty, text=text, content_hash=content_hash)
+                    for (category_id, content_hash), (_, difficulty, text, _) in fresh
+                ])
+                insert_rows(
+                    Answer, ("question", "text", "is_correct"),
+                    (
+                        (question.id, text, is_correct)
+                        for question, (_, (_, _, _, answers)) in zip(questions, fresh)
+                        for text, is_correct in answers
+                    ),
+                )
+                # bulk_create skips the signals: index each chunk once it is committed.
+                indexed = [(question.id, question.quiz_category_id, question.difficulty) for question in questions]
+                transaction.on_commit(partial(question_index.add_many, indexed))
+            done += len(rows)
+            log(f"  preguntas: {done}/{count}")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return set(ids_by_rank)
+
+
+def generate_scores(seed, count, players=10000, days=90, chunk_size=50000, log=print):
+    """
+    Insert ``count`` scores from ``players`` players over the last ``days`` days.
+
+    Player activity is Zipf-distributed (a few players play most games),
+    points are drawn around a per-player skill, and games get more frequent
+    towards the present. About 80% of scores reference a random question.
+    """
+    fake = _faker(seed, "players", 0)
+    names = [f"{fake.user_name()}{number}" for number in range(players)]
+    skill_rng = _rng(seed, "skills", 0)
+    skills = [min(95.0, max(5.0, skill_rng.gauss(50, 15))) for _ in range(players)]
+    activity = _zipf_cum_weights(players, 0.8)
+    question_ids = array("q", Question.objects.order_by("id").values_list("id", flat=True).iterator())
+    now = timezone.now()
+    date_field = Score._meta.get_field("date")
+
+    done = 0
+    for chunk, _, size in _chunks(count, chunk_size):
+        rng = _rng(seed, "scores", chunk)
+        rows = []
+        for player in rng.choices(range(players), cum_weights=activity, k=size):
+            points = int(min(100, max(0, rng.gauss(skills[player], 12))))
+            date = date_field.get_db_prep_save(now - timedelta(days=rng.triangular(0, days, 0)), connection)
+            question_id = question_ids[rng.randrange(len(question_ids))] if question_ids and rng.random() < 0.8 else None
+            rows.append((names[player], points, date, question_id))
+        with transaction.atomic():
+            # Raw inserts: bulk_create would overwrite the dates (auto_now_add).
+            insert_rows(Score, ("player_name", "points", "date", "question"), rows)
+        done += size
+        log(f"  puntuaciones: {done}/{count}")
+
+
+def generate(seed=0, questions=0, categories=50, answers_per_question=4, scores=0, players=10000, days=90,
+             chunk_size=10000, workers=1, rollup=True, log=print):
+    """Generate a dataset and bring the derived state (sampler, caches, rankings) up to date."""
+    touched = set()
+    if questions:
+        touched = generate_questions(seed, questions, categories, answers_per_question, chunk_size, workers, log)
+        content_cache.bump(*touched)
+    if scores:
+        generate_scores(seed, scores, players, days, max(chunk_size, 50000), log)
+        if rollup:
+            log("  recalculando rollups...")
+            rollups.backfill()
+        leaderboard.invalidate()
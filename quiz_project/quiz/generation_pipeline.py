@@ -0,0 +1,233 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import namedtuple
+
+# ⚡ Concurrent, rate-limited question generation
+#
+# Categories are split into batches of ``batch_size`` questions, one prompt per
+# batch. Batches run concurrently (at most ``concurrency`` in flight) behind a
+# token-bucket limiter for requests and tokens per minute, and failed or
+# unparseable responses are retried with exponential backoff.
+#
+# This module does not import Django so standalone scripts (``puebra.py``) can
+# use it; saving the results is left to the caller.
+
+logger = logging.getLogger(__name__)
+
+TOKENS_PER_QUESTION = 120
+
+Batch = namedtuple("Batch", "category difficulty count prompt max_tokens")
+
+
+def build_prompt(category, difficulty, num_questions):
+    """Prompt que pide preguntas de opción múltiple en formato JSON."""
+    return f"""
+    Generate {num_questions} multiple-choice questions on {category}.
+    Each question should have 4 possible answers, with one correct answer.
+    Format the response as a JSON array with the following structure:
+    [
+      {{
+        "question": "Example question?",
+        "answers": [
+          {{"text": "Option 1", "is_correct": true}},
+          {{"text": "Option 2", "is_correct": false}},
+          {{"text": "Option 3", "is_correct": false}},
+          {{"text": "Option 4", "is_correct": false}}
+        ],
+        "difficulty": "{difficulty}",
+        "category": "{category}"
+      }}
+    ]
+    """
+
+
+def parse_questions(content, batch):
+    """Parse a JSON array of questions, filling in the batch's category and difficulty."""
+    data = json.loads(content)
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of questions.")
+    questions = []
+    for item in data[:batch.count]:
+        if not item.get("question") or not item.get("answers"):
+            continue
+        item.setdefault("category", batch.category)
+        item.setdefault("difficulty", batch.difficulty)
+        questions.append(item)
+    return questions
+
+
+# 🪣 Rate limiting
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at ``per_minute / 60`` per second.
+
+    Waiters are served in arrival order; a request larger than the bucket is
+    clamped to its capacity so it can still go through. ``clock`` and
+    ``sleep`` can be replaced (e.g. by a fake clock in tests).
+    """
+
+    def __init__(self, per_minute, capacity=None, clock=time.monotonic, sleep=asyncio.sleep):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await self.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def settle(self, reserved, used):
+        """Correct a reservation once the real usage is known (may go negative)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + reserved - used)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits; ``None`` disables either."""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    async def acquire(self, estimated_tokens):
+        if self.requests:
+            await self.requests.acquire(1)
+        if self.tokens:
+            await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens, used_tokens):
+        if self.tokens and used_tokens is not None:
+            self.tokens.settle(estimated_tokens, used_tokens)
+
+
+# 🤖 LLM clients: ``await client.complete(batch)`` -> (content, tokens_used)
+class OpenAIClient:
+    """Chat completions through the ``openai`` v1 async client (``OPENAI_API_KEY`` if no ``api_key``)."""
+
+    def __init__(self, model="gpt-3.5-turbo", temperature=0.7, api_key=None):
+        import openai
+
+        # Retries are ours (with backoff behind the rate limiter), not the SDK's.
+        self.client = openai.AsyncOpenAI(api_key=api_key, max_retries=0)
+        self.model = model
+        self.temperature = temperature
+
+    async def complete(self, batch):
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": batch.prompt},
+            ],
+            max_tokens=batch.max_tokens,
+            temperature=self.temperature,
+        )
+        used = response.usage.total_tokens if response.usage else None
+        return response.choices[0].message.content, used
+
+
+class FakeLLM:
+    """
+    Offline stand-in that answers like the real API after ``latency`` seconds.
+
+    ``failure_rate`` makes a share of calls raise, to exercise retries.
+    ``max_in_flight`` records the highest number of concurrent calls seen.
+    """
+
+    def __init__(self, latency=0.5, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.in_flight = self.max_in_flight = 0
+
+    async def complete(self, batch):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if self.random.random() < self.failure_rate:
+            raise RuntimeError("Fake LLM: simulated rate limit (429).")
+        questions = []
+        for _ in range(batch.count):
+            number = self.random.randrange(10 ** 9)
+            correct = self.random.randrange(4)
+            questions.append({
+                "question": f"[{batch.category}] Synthetic question #{number}?",
+                "answers": [{"text": f"Option {i + 1}", "is_correct": i == correct} for i in range(4)],
+                "difficulty": batch.difficulty,
+                "category": batch.category,
+            })
+        return json.dumps(questions), TOKENS_PER_QUESTION * batch.count
+
+
+# 🚀 Pipeline
+def plan_batches(categories, per_category, difficulty="easy", batch_size=10):
+    batches = []
+    for category in categories:
+        remaining = per_category
+        while remaining > 0:
+            count = min(batch_size, remaining)
+            batches.append(Batch(
+                category, difficulty, count,
+                build_prompt(category, difficulty, count),
+                TOKENS_PER_QUESTION * count + 100,
+            ))
+            remaining -= count
+    return batches
+
+
+async def _run_batch(batch, client, limiter, semaphore, max_retries, backoff):
+    estimated = len(batch.prompt) // 4 + batch.max_tokens
+    for attempt in range(max_retries + 1):
+        async with semaphore:
+            await limiter.acquire(estimated)
+            try:
+                content, used = await client.complete(batch)
+                limiter.settle(estimated, used)
+                return parse_questions(content, batch)
+            except Exception as e:
+                error = e
+        if attempt < max_retries:
+            logger.warning("Batch for %r failed (attempt %d of %d): %s", batch.category, attempt + 1, max_retries + 1, error)
+            # Full jitter keeps retries from many batches from lining up again.
+            await asyncio.sleep(random.uniform(0, backoff * 2 ** attempt))
+    logger.error("Batch for %r dropped after %d attempts: %s", batch.category, max_retries + 1, error, exc_info=error)
+    return []
+
+
+async def generate_async(categories, per_category, client, difficulty="easy", batch_size=10,
+                         concurrency=8, requests_per_minute=None, tokens_per_minute=None,
+                         max_retries=5, backoff=1.0):
+    """Generate ``per_category`` questions for every category; returns the question dicts."""
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    semaphore = asyncio.Semaphore(concurrency)
+    batches = plan_batches(categories, per_category, difficulty, batch_size)
+    results = await asyncio.gather(*(
+        _run_batch(batch, client, limiter, semaphore, max_retries, backoff) for batch in batches
+    ))
+    return [question for questions in results for question in questions]
+
+
+def generate(categories, per_category, client, **options):
+    """Synchronous wrapper around ``generate_async`` for scripts and commands."""
+    return asyncio.run(generate_async(categories, per_category, client, **options))
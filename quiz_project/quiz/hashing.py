@@ -0,0 +1,13 @@
+import hashlib
+import unicodedata
+
+
+# #️⃣ Normalized question hashes (duplicate detection)
+def normalize_text(text):
+    """Case-, width- and whitespace-insensitive form of a question, for duplicate matching."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def text_hash(text):
+    """SHA-1 hex digest of ``normalize_text(text)`` (stored in ``Question.content_hash``)."""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
@@ -0,0 +1,122 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .generation_pipeline import OpenAIClient, generate
+from .models import GenerationJob
+from .question_ingest import ingest_questions
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=5)
+MAX_ATTEMPTS = 3
+
+
+# 📬 Database-backed queue for OpenAI question generation
+def enqueue(category, difficulty, num_questions):
+    return GenerationJob.objects.create(category=category, difficulty=difficulty, num_questions=num_questions)
+
+
+def claim_next():
+    """
+    Atomically take the oldest runnable job, or return ``None``.
+
+    A job is runnable when it is pending, or running with an expired lease
+    (its worker died). The claim is a conditional UPDATE, so concurrent
+    workers never run the same job twice.
+    """
+    now = timezone.now()
+    # Jobs whose worker died on their last attempt will never be retried.
+    GenerationJob.objects.filter(
+        status=GenerationJob.RUNNING, locked_until__lt=now, attempts__gte=MAX_ATTEMPTS,
+    ).update(status=GenerationJob.FAILED, locked_until=None, error="Worker lease expired.", finished_at=now)
+
+    runnable = GenerationJob.objects.filter(
+        Q(status=GenerationJob.PENDING) | Q(status=GenerationJob.RUNNING, locked_until__lt=now)
+    )
+    for job_id in runnable.order_by("id").values_list("id", flat=True)[:5]:
+        claimed = runnable.filter(id=job_id).update(
+            status=GenerationJob.RUNNING,
+            locked_until=now + LEASE,
+            started_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return GenerationJob.objects.get(id=job_id)
+    return None
+
+
+def make_client():
+    """LLM client for one job (a fresh one: ``generate`` runs each job on its own event loop)."""
+    return OpenAIClient(api_key=settings.OPENAI_API_KEY)
+
+
+def _finish(job, **fields):
+    """
+    Record a job's outcome if this worker still holds its lease.
+
+    A worker whose lease expired may have had the job reclaimed by another
+    one (which bumped ``attempts``); it must not overwrite that run's state.
+    """
+    owned = GenerationJob.objects.filter(id=job.id, status=GenerationJob.RUNNING, attempts=job.attempts)
+    if owned.update(locked_until=None, **fields):
+        return True
+    logger.warning("Generation job %s lost its lease; its result was discarded.", job.id)
+    return False
+
+
+def run_job(job):
+    """Generate and store the questions for one claimed job."""
+    try:
+        # The job itself is retried up to MAX_ATTEMPTS, so each run retries batches less.
+        questions = generate(
+            [job.category], job.num_questions, make_client(), difficulty=job.difficulty, max_retries=2,
+        )
+        if not questions:
+            raise RuntimeError("OpenAI returned no usable questions.")
+        with transaction.atomic():
+            # Lock the job row so a worker that reclaims it waits for this commit.
+            if not GenerationJob.objects.select_for_update().filter(
+                id=job.id, status=GenerationJob.RUNNING, attempts=job.attempts,
+            ).exists():
+                logger.warning("Generation job %s lost its lease; its questions were not saved.", job.id)
+                return False
+            report = ingest_questions(questions)
+            return _finish(
+                job,
+                status=GenerationJob.DONE,
+                error="",
+                result={"generated": len(questions), "saved": report["inserted"]},
+                finished_at=timezone.now(),
+            )
+    except Exception as e:
+        logger.exception("Generation job %s failed", job.id)
+        retry = job.attempts < MAX_ATTEMPTS
+        _finish(
+            job,
+            status=GenerationJob.PENDING if retry else GenerationJob.FAILED,
+            error=str(e),
+            finished_at=None if retry else timezone.now(),
+        )
+        return False
+
+
+def work(once=False, sleep=2.0, max_jobs=None):
+    """Run jobs until the queue is empty (``once``) or forever; returns how many ran."""
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        close_old_connections()
+        job = claim_next()
+        if job is None:
+            if once:
+                break
+            time.sleep(sleep)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
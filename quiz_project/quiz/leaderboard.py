@@ -0,0 +1,365 @@
+import random
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+
+from .models import Score
+
+
+# 🪜 Indexable skiplist
+class _Node:
+    __slots__ = ("value", "next", "width")
+
+    def __init__(self, value, levels):
+        self.value = value
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+class SkipList:
+    """
+    Sorted container with O(log n) insert, remove, rank and positional access.
+
+    Each forward link stores how many elements it skips (its width), so the
+    rank of a value is the sum of the widths walked to reach it. The end of
+    every level counts as position ``len + 1``.
+    """
+
+    LEVELS = 24  # Comfortable for tens of millions of entries
+
+    def __init__(self):
+        self._head = _Node(None, self.LEVELS)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not None:
+            yield node.value
+            node = node.next[0]
+
+    def _random_level(self):
+        level = 1
+        while level < self.LEVELS and random.random() < 0.5:
+            level += 1
+        return level
+
+    def _chain(self, value):
+        """Last node before ``value`` on each level, and the steps taken to reach it."""
+        chain = [None] * self.LEVELS
+        steps = [0] * self.LEVELS
+        node = self._head
+        for level in reversed(range(self.LEVELS)):
+            while node.next[level] is not None and node.next[level].value < value:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        return chain, steps
+
+    def insert(self, value):
+        chain, steps = self._chain(value)
+        levels = self._random_level()
+        new = _Node(value, levels)
+        walked = 0
+        for level in range(levels):
+            previous = chain[level]
+            new.next[level] = previous.next[level]
+            previous.next[level] = new
+            new.width[level] = previous.width[level] - walked
+            previous.width[level] = walked + 1
+            walked += steps[level]
+        for level in range(levels, self.LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, value):
+        chain, _ = self._chain(value)
+        target = chain[0].next[0]
+        if target is None or target.value != value:
+            raise KeyError(value)
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), self.LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def index(self, value):
+        """Return the 0-based position of ``value``."""
+        position = 0
+        node = self._head
+        for level in reversed(range(self.LEVELS)):
+            while node.next[level] is not None and node.next[level].value <= value:
+                position += node.width[level]
+                node = node.next[level]
+        if node is self._head or node.value != value:
+            raise KeyError(value)
+        return position - 1
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        node = self._head
+        remaining = index + 1
+        for level in reversed(range(self.LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node.value
+
+    def slice(self, start, stop):
+        """Return the values at positions ``start`` to ``stop`` (exclusive)."""
+        start = max(start, 0)
+        stop = min(stop, self._size)
+        if start >= stop:
+            return []
+        values = []
+        node = self._head
+        remaining = start + 1
+        for level in reversed(range(self.LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        while node is not None and len(values) < stop - start:
+            values.append(node.value)
+            node = node.next[0]
+        return values
+
+
+# 🏆 Materialized leaderboard
+def _shared_cache():
+    # Straight to the shared tier: a counter bumped on every new best must not
+    # flush every process's L1 the way ``incr`` on the two-tier cache does.
+    return getattr(cache, "l2", cache)
+
+
+class Leaderboard:
+    """
+    Best score per player, kept sorted for top-N, rank and neighbourhood lookups.
+
+    Entries are ordered by ``(-points, player_name)`` so ties rank
+    alphabetically. The board is built lazily from ``Score`` with one grouped
+    query and maintained from the ``Score`` signals in ``quiz/signals.py``.
+
+    Every process keeps its own board. Each change is also published to the
+    shared cache as a numbered delta (``SEQUENCE_KEY`` counts them), and the
+    other processes apply the deltas they have not seen before answering, so
+    scores saved by another worker show up without a rebuild. A full rebuild
+    only happens when a board is first used, after ``rebuild_leaderboard``
+    bumps ``VERSION_KEY``, or when a process is missing deltas (too far behind,
+    or one never arrived within ``GAP_TIMEOUT`` seconds). The rebuild query
+    runs outside the lock.
+    """
+
+    VERSION_KEY = "leaderboard:version"
+    SEQUENCE_KEY = "leaderboard:sequence"
+    DELTA_TIMEOUT = 3600
+    MAX_CATCH_UP = 10000
+    GAP_TIMEOUT = 5
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._best = None
+        self._entries = None
+        self._version = None
+        self._sequence = 0
+        self._gap = None
+
+    @staticmethod
+    def _delta_key(sequence):
+        return f"leaderboard:delta:{sequence}"
+
+    # 🔄 Build / invalidate
+    def rebuild(self):
+        # Read the shared state first: deltas published during the query are
+        # applied again afterwards, which is harmless.
+        state = _shared_cache().get_many([self.VERSION_KEY, self.SEQUENCE_KEY])
+        best = dict(
+            Score.objects.values("player_name").annotate(best=Max("points")).values_list("player_name", "best")
+        )
+        entries = SkipList()
+        for player_name, points in best.items():
+            entries.insert((-points, player_name))
+        with self._lock:
+            self._best = best
+            self._entries = entries
+            self._version = state.get(self.VERSION_KEY)
+            self._sequence = state.get(self.SEQUENCE_KEY, 0)
+            self._gap = None
+        return len(best)
+
+    def invalidate(self):
+        """Drop this board and ask every other process to rebuild theirs."""
+        shared = _shared_cache()
+        try:
+            shared.incr(self.VERSION_KEY)
+        except ValueError:
+            shared.set(self.VERSION_KEY, 1, timeout=None)
+        with self._lock:
+            self._entries = None
+
+    # 🔁 Catching up with other processes
+    def _missing(self, state):
+        """Delta keys to read for the shared ``state``, or ``None`` if only a rebuild will do."""
+        with self._lock:
+            if self._entries is None or state.get(self.VERSION_KEY) != self._version:
+                return None
+            latest = state.get(self.SEQUENCE_KEY, 0)
+            if latest - self._sequence > self.MAX_CATCH_UP:
+                return None
+            return [self._delta_key(sequence) for sequence in range(self._sequence + 1, latest + 1)]
+
+    def _apply(self, state, deltas):
+        """Apply the fetched ``deltas`` in order; ``False`` if the board must be rebuilt."""
+        with self._lock:
+            if self._entries is None or state.get(self.VERSION_KEY) != self._version:
+                return False
+            for sequence in range(self._sequence + 1, state.get(self.SEQUENCE_KEY, 0) + 1):
+                changes = deltas.get(self._delta_key(sequence))
+                if changes is None:
+                    # Numbered but not written yet, or lost (expired, writer died).
+                    now = time.monotonic()
+                    if self._gap is None or self._gap[0] != sequence:
+                        self._gap = (sequence, now)
+                    elif now - self._gap[1] > self.GAP_TIMEOUT:
+                        return False
+                    return True
+                for player_name, points, exact in changes:
+                    self._change(player_name, points, exact)
+                self._sequence = sequence
+            return True
+
+    def _sync(self):
+        shared = _shared_cache()
+        while True:
+            state = shared.get_many([self.VERSION_KEY, self.SEQUENCE_KEY])
+            keys = self._missing(state)
+            if keys is not None and self._apply(state, shared.get_many(keys) if keys else {}):
+                return
+            self.rebuild()
+
+    async def _async_sync(self):
+        shared = _shared_cache()
+        while True:
+            state = await shared.aget_many([self.VERSION_KEY, self.SEQUENCE_KEY])
+            keys = self._missing(state)
+            if keys is not None and self._apply(state, await shared.aget_many(keys) if keys else {}):
+                return
+            await sync_to_async(self.rebuild)()
+
+    def _publish(self, changes):
+        def publish():
+            shared = _shared_cache()
+            shared.add(self.SEQUENCE_KEY, 0, timeout=None)
+            shared.set(self._delta_key(shared.incr(self.SEQUENCE_KEY)), changes, timeout=self.DELTA_TIMEOUT)
+        # Other processes must not rank a score that is rolled back.
+        transaction.on_commit(publish)
+
+    # ✏️ Incremental maintenance
+    def submit(self, player_name, points):
+        """Record a score; only a new personal best moves the player."""
+        self.submit_many([(player_name, points)])
+
+    def submit_many(self, scores):
+        """Record ``(player_name, points)`` pairs, published to the other processes as one delta."""
+        best = {}
+        for player_name, points in scores:
+            if player_name not in best or points > best[player_name]:
+                best[player_name] = points
+        with self._lock:
+            if self._entries is not None:
+                best = {
+                    player_name: points for player_name, points in best.items()
+                    if self._best.get(player_name) is None or points > self._best[player_name]
+                }
+                for player_name, points in best.items():
+                    self._set(player_name, points)
+        if best:
+            self._publish([(player_name, points, False) for player_name, points in best.items()])
+
+    def refresh_player(self, player_name):
+        """Recompute one player's best score (e.g. after a score is deleted)."""
+        points = Score.objects.filter(player_name=player_name).aggregate(best=Max("points"))["best"]
+        with self._lock:
+            if self._entries is not None:
+                self._set(player_name, points)
+        self._publish([(player_name, points, True)])
+
+    def _change(self, player_name, points, exact):
+        current = self._best.get(player_name)
+        if exact or (points is not None and (current is None or points > current)):
+            self._set(player_name, points)
+
+    def _set(self, player_name, points):
+        current = self._best.pop(player_name, None)
+        if current is not None:
+            self._entries.remove((-current, player_name))
+        if points is not None:
+            self._best[player_name] = points
+            self._entries.insert((-points, player_name))
+
+    # 🔍 Queries
+    @staticmethod
+    def _row(position, entry):
+        negative_points, player_name = entry
+        return {"rank": position + 1, "player_name": player_name, "points": -negative_points}
+
+    def _read(self, query):
+        # Loop: another thread may invalidate the board between the sync and the lock.
+        while True:
+            self._sync()
+            with self._lock:
+                if self._entries is not None:
+                    return query()
+
+    async def _aread(self, query):
+        while True:
+            await self._async_sync()
+            with self._lock:
+                if self._entries is not None:
+                    return query()
+
+    def _top(self, n):
+        return [self._row(position, entry) for position, entry in enumerate(self._entries.slice(0, n))]
+
+    def top(self, n=10):
+        return self._read(lambda: self._top(n))
+
+    async def atop(self, n=10):
+        """``top`` for async views; a rebuild, if needed, runs in a thread."""
+        return await self._aread(lambda: self._top(n))
+
+    def rank(self, player_name):
+        """Return the player's row, or ``None`` if they have no score."""
+        def query():
+            points = self._best.get(player_name)
+            if points is None:
+                return None
+            entry = (-points, player_name)
+            return self._row(self._entries.index(entry), entry)
+        return self._read(query)
+
+    def around(self, player_name, radius=5):
+        """Return the player's row with up to ``radius`` neighbours on each side."""
+        def query():
+            points = self._best.get(player_name)
+            if points is None:
+                return []
+            position = self._entries.index((-points, player_name))
+            start = max(position - radius, 0)
+            entries = self._entries.slice(start, position + radius + 1)
+            return [self._row(start + offset, entry) for offset, entry in enumerate(entries)]
+        return self._read(query)
+
+    def __len__(self):
+        return self._read(lambda: len(self._entries))
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,16 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from quiz import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the daily, weekly and monthly score rollups from the Score table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=date.fromisoformat, default=None, help="Only rebuild periods from this date on (YYYY-MM-DD).")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per bulk insert.")
+
+    def handle(self, *args, **options):
+        written = rollups.backfill(since=options["since"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Se escribieron {written} filas de rollup."))
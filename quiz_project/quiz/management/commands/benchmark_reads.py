@@ -0,0 +1,114 @@
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from quiz.models import Question
+
+# (name, sync DRF route, async route); {question} is a real question id
+ENDPOINTS = (
+    ("random", "/api/questions/random/?count=10", "/api/async/questions/random/?count=10"),
+    ("ranking", "/api/scores/ranking/", "/api/async/ranking/"),
+    ("categories", "/api/api/categories/", "/api/async/categories/"),
+    ("question", "/api/api/questions/{question}/", "/api/async/questions/{question}/"),
+)
+
+
+def asgi_getter(application):
+    """GET straight into the ASGI application, the way daphne calls it (no sockets involved)."""
+    async def get(path):
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+            "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+        }
+        body_sent = False
+        status = None
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()  # the client never disconnects
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await application(scope, receive, send)
+        return status
+
+    return get
+
+
+async def _run(get, path, requests, concurrency):
+    """Send ``requests`` GETs with ``concurrency`` connections; returns (seconds, latencies, errors)."""
+    latencies, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            status = await get(path)
+            latencies.append(time.perf_counter() - started)
+            errors += status != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+class Command(BaseCommand):
+    help = "Compara el throughput de las vistas de lectura síncronas (DRF) y async bajo ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Peticiones por endpoint y variante.")
+        parser.add_argument("--concurrency", type=int, default=200, help="Conexiones simultáneas.")
+        parser.add_argument("--endpoint", action="append", choices=[name for name, _, _ in ENDPOINTS],
+                            help="Solo estos endpoints (repetible).")
+        parser.add_argument("--base-url", help="Servidor ya arrancado (p. ej. daphne en http://localhost:8000). "
+                                               "Por defecto la aplicación ASGI se llama en este proceso.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+        question_id = Question.objects.order_by("id").values_list("id", flat=True).first()
+        if question_id is None:
+            raise CommandError("No hay preguntas: ejecuta generate_dataset antes.")
+        asyncio.run(self.benchmark(options, question_id))
+
+    async def benchmark(self, options, question_id):
+        if options["base_url"]:
+            import httpx
+
+            client = httpx.AsyncClient(base_url=options["base_url"], limits=httpx.Limits(max_connections=options["concurrency"]))
+
+            async def get(path):
+                return (await client.get(path)).status_code
+        else:
+            from quiz_project.asgi import application
+
+            client, get = None, asgi_getter(application)
+
+        selected = options["endpoint"]
+        try:
+            for name, sync_path, async_path in ENDPOINTS:
+                if selected and name not in selected:
+                    continue
+                for variant, path in (("sync", sync_path), ("async", async_path)):
+                    path = path.format(question=question_id)
+                    await _run(get, path, min(options["concurrency"], options["requests"]), options["concurrency"])  # warm-up
+                    seconds, latencies, errors = await _run(get, path, options["requests"], options["concurrency"])
+                    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+                    self.stdout.write(
+                        f"{name:<11} {variant:<5} {options['requests'] / seconds:8.0f} req/s   "
+                        f"p50 {quantiles[49] * 1000:7.1f} ms   p99 {quantiles[98] * 1000:7.1f} ms"
+                        + (f"   {errors} errores" if errors else "")
+                    )
+        finally:
+            if client is not None:
+                await client.aclose()
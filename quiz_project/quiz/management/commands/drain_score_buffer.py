@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from quiz.score_ingest import drain_spool, score_buffer
+
+
+class Command(BaseCommand):
+    help = "Writes every buffered or journaled score that has not reached the database yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spool-dir", type=str, default=None, help="Journal directory (defaults to QUIZ_SCORE_SPOOL_DIR).")
+        parser.add_argument("--include-live", action="store_true", help="Also drain journals of running processes (only when all workers are stopped).")
+
+    def handle(self, *args, **options):
+        spool_dir = options["spool_dir"] or score_buffer.spool_dir
+        flushed = score_buffer.flush()
+        files, scores = drain_spool(spool_dir, include_live=options["include_live"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Se guardaron {flushed + scores} puntuaciones ({files} ficheros de journal recuperados)."
+        ))
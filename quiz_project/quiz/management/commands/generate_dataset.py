@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from quiz.dataset import generate
+
+
+class Command(BaseCommand):
+    help = "Generates a deterministic synthetic dataset (questions, answers, scores) for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Same seed, same dataset.")
+        parser.add_argument("--questions", type=int, default=10000)
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--answers-per-question", type=int, default=4)
+        parser.add_argument("--scores", type=int, default=0)
+        parser.add_argument("--players", type=int, default=10000)
+        parser.add_argument("--days", type=int, default=90, help="Scores are spread over the last N days.")
+        parser.add_argument("--chunk-size", type=int, default=10000, help="Rows generated and inserted per transaction.")
+        parser.add_argument("--workers", type=int, default=1, help="Processes generating question text.")
+        parser.add_argument("--skip-rollups", action="store_true", help="Do not backfill the score rollups afterwards.")
+
+    def handle(self, *args, **options):
+        for name in ("categories", "answers_per_question", "players", "days", "chunk_size", "workers"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1.")
+
+        started = time.perf_counter()
+        generate(
+            seed=options["seed"],
+            questions=options["questions"],
+            categories=options["categories"],
+            answers_per_question=options["answers_per_question"],
+            scores=options["scores"],
+            players=options["players"],
+            days=options["days"],
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            rollup=not options["skip_rollups"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Dataset generado en {time.perf_counter() - started:.1f}s."))
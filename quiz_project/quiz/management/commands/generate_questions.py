@@ -1,50 +1,64 @@
-from django.core.management.base import BaseCommand
-import openai
-from quiz.models import Question, Answer, QuizCategory
-from quiz.app_add_generate_questions_with_api_openai import generate_questions_from_openai, save_questions_to_db
 import os
+import time
+
+from django.core.management.base import BaseCommand
+from quiz.app_add_generate_questions_with_api_openai import save_questions_to_db
+from quiz.generation_pipeline import FakeLLM, OpenAIClient, generate
+from quiz.jobs import enqueue
 
 class Command(BaseCommand):
     help = "Generates multiple-choice questions from OpenAI and saves them to the database."
 
     def add_arguments(self, parser):
-        parser.add_argument("--category", type=str, default="General Knowledge", help="Category of the questions.")
+        parser.add_argument("--category", type=str, default="General Knowledge", help="Category of the questions (comma-separated for several).")
         parser.add_argument("--difficulty", type=str, choices=["easy", "medium", "hard"], default="easy", help="Difficulty level.")
-        parser.add_argument("--num_questions", type=int, default=5, help="Number of questions to generate.")
+        parser.add_argument("--num_questions", type=int, default=5, help="Number of questions to generate per category.")
+        parser.add_argument("--enqueue", action="store_true", help="Queue a generation job for run_generation_jobs instead of calling OpenAI inline.")
+        parser.add_argument("--batch-size", type=int, default=10, help="Questions requested per prompt.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Maximum prompts in flight.")
+        parser.add_argument("--rpm", type=int, default=None, help="Requests-per-minute limit.")
+        parser.add_argument("--tpm", type=int, default=None, help="Tokens-per-minute limit.")
+        parser.add_argument("--fake", action="store_true", help="Use the offline fake LLM (for benchmarks).")
+        parser.add_argument("--fake-latency", type=float, default=0.5, help="Seconds per fake LLM call.")
+        parser.add_argument("--dry-run", action="store_true", help="Generate without saving to the database.")
 
     def handle(self, *args, **options):
-        category = options["category"]
+        categories = [name.strip() for name in options["category"].split(",") if name.strip()]
         difficulty = options["difficulty"]
         num_questions = options["num_questions"]
 
-        openai.api_key = os.getenv('OPENAI_API_KEY')
-        if not openai.api_key:
-            self.stdout.write(self.style.ERROR("Error: OPENAI_API_KEY no está configurada."))
+        if options["enqueue"]:
+            for category in categories:
+                job = enqueue(category, difficulty, num_questions)
+                self.stdout.write(self.style.SUCCESS(f"Trabajo de generación #{job.id} encolado."))
             return
 
-        prompt = f"""
-        Generate {num_questions} multiple-choice questions on {category}.
-        Each question should have 4 possible answers, with one correct answer.
-        Format the response as a JSON array with the following structure:
-        [
-          {{
-            "question": "Example question?",
-            "answers": [
-              {{"text": "Option 1", "is_correct": true}},
-              {{"text": "Option 2", "is_correct": false}},
-              {{"text": "Option 3", "is_correct": false}},
-              {{"text": "Option 4", "is_correct": false}}
-            ],
-            "difficulty": "{difficulty}",
-            "category": "{category}"
-          }}
-        ]
-        """
-
-        questions = generate_questions_from_openai(prompt, num_questions)
-
-        if questions:
-            save_questions_to_db(questions)
-            self.stdout.write(self.style.SUCCESS(f"Se generaron y guardaron {len(questions)} preguntas en la categoría '{category}' con dificultad '{difficulty}'"))
+        if options["fake"]:
+            client = FakeLLM(latency=options["fake_latency"])
         else:
+            api_key = os.getenv('OPENAI_API_KEY')
+            if not api_key:
+                self.stdout.write(self.style.ERROR("Error: OPENAI_API_KEY no está configurada."))
+                return
+            client = OpenAIClient(api_key=api_key)
+
+        started = time.perf_counter()
+        questions = generate(
+            categories, num_questions, client,
+            difficulty=difficulty,
+            batch_size=options["batch_size"],
+            concurrency=options["concurrency"],
+            requests_per_minute=options["rpm"],
+            tokens_per_minute=options["tpm"],
+        )
+        elapsed = time.perf_counter() - started
+
+        if not questions:
             self.stdout.write(self.style.ERROR("No se generaron preguntas."))
+            return
+
+        self.stdout.write(f"⏱️ {len(questions)} preguntas generadas en {elapsed:.2f}s ({len(questions) / elapsed:.1f}/s).")
+        if options["dry_run"]:
+            return
+        saved = save_questions_to_db(questions)
+        self.stdout.write(self.style.SUCCESS(f"Se generaron y guardaron {saved} preguntas en {len(categories)} categoría(s) con dificultad '{difficulty}'"))
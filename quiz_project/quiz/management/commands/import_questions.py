@@ -0,0 +1,34 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from quiz.question_ingest import ingest_questions
+
+
+class Command(BaseCommand):
+    help = "Imports generated questions from a JSON array or JSON Lines file in one transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSON (array) or JSONL file with question objects.")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per INSERT.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], encoding="utf-8") as f:
+                if options["path"].endswith(".jsonl"):
+                    items = [json.loads(line) for line in f if line.strip()]
+                else:
+                    items = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"No se pudo leer {options['path']}: {e}")
+
+        started = time.perf_counter()
+        report = ingest_questions(items, batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+
+        for problem in report["invalid"][:10]:
+            self.stdout.write(self.style.WARNING(f"Fila {problem['index']}: {problem['errors']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['inserted']} insertadas, {len(report['skipped'])} duplicadas, "
+            f"{len(report['invalid'])} inválidas en {elapsed:.2f}s."
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from quiz.question_bank import BANK_PATH, load_bank, read_bank
+
+
+class Command(BaseCommand):
+    help = "Upserts the curated question bank (quiz/data/question_bank.json) or another bank file; reruns are no-ops."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default=str(BANK_PATH), help="JSON file, or Python file in the tuple format of quiz/ad.py.")
+
+    def handle(self, *args, **options):
+        try:
+            bank = read_bank(options["path"])
+        except (OSError, SyntaxError, ValueError) as e:
+            raise CommandError(f"No se pudo leer el banco {options['path']}: {e}")
+
+        report = load_bank(bank)
+        for problem in report["invalid"][:10]:
+            self.stdout.write(self.style.WARNING(f"Entrada {problem['index']}: {problem['errors']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['inserted']} nuevas, {report['updated']} actualizadas, {report['unchanged']} sin cambios, "
+            f"{report['duplicate']} repetidas, {len(report['invalid'])} inválidas."
+        ))
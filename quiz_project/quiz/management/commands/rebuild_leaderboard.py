@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from quiz.leaderboard import leaderboard
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the materialized leaderboard from the Score table."
+
+    def handle(self, *args, **options):
+        # Bump the shared version so every worker reloads its board on next use
+        leaderboard.invalidate()
+        players = leaderboard.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Leaderboard rebuilt with {players} players."))
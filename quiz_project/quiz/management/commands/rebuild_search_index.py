@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from quiz.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index over questions and answers."
+
+    def handle(self, *args, **options):
+        if rebuild_index():
+            self.stdout.write(self.style.SUCCESS("Índice de búsqueda reconstruido."))
+        else:
+            self.stdout.write(self.style.WARNING("La búsqueda de texto completo requiere SQLite FTS5; no hay nada que reconstruir."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from quiz.jobs import work
+
+
+class Command(BaseCommand):
+    help = "Runs queued OpenAI question-generation jobs (worker process)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty instead of polling.")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds to wait between polls of an empty queue.")
+        parser.add_argument("--max-jobs", type=int, default=None, help="Exit after running this many jobs.")
+
+    def handle(self, *args, **options):
+        processed = work(once=options["once"], sleep=options["sleep"], max_jobs=options["max_jobs"])
+        self.stdout.write(self.style.SUCCESS(f"Se procesaron {processed} trabajos de generación."))
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_remove_answer_unique_correct_answer_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('bucket', models.DateField()),
+                ('player_name', models.CharField(max_length=100)),
+                ('best_points', models.IntegerField()),
+                ('total_points', models.BigIntegerField(default=0)),
+                ('games', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'bucket', '-best_points', 'player_name'], name='score_rollup_ranking_idx')],
+                'constraints': [models.UniqueConstraint(fields=('period', 'bucket', 'player_name'), name='unique_score_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:10
+
+import hashlib
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Frozen copy of quiz.hashing.text_hash, so later changes there cannot alter this migration.
+def text_hash(text):
+    normalized = " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def backfill_content_hash(apps, schema_editor):
+    """
+    Hash every existing question in id order.
+
+    When a category already holds normalized duplicates, the oldest copy gets
+    the hash and the later ones keep NULL, which the partial unique index
+    ignores: nothing is deleted, and the duplicates can be cleaned up by hand.
+    """
+    Question = apps.get_model('quiz', 'Question')
+    seen = set()
+    batch = []
+    for question in Question.objects.order_by('id').only('id', 'quiz_category_id', 'text').iterator(chunk_size=2000):
+        key = (question.quiz_category_id, text_hash(question.text))
+        if key in seen:
+            continue
+        seen.add(key)
+        question.content_hash = key[1]
+        batch.append(question)
+        if len(batch) >= 2000:
+            Question.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    Question.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_generationjob'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='question',
+            name='question_category_text_idx',
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=40, null=True),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='question',
+            constraint=models.UniqueConstraint(condition=models.Q(('content_hash__isnull', False)), fields=('quiz_category', 'content_hash'), name='unique_question_content_per_category'),
+        ),
+    ]
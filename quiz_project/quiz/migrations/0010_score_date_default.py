@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_question_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='score',
+            name='date',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
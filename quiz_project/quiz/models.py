@@ -1,4 +1,8 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
+
+from .hashing import text_hash
 
 class QuizCategory(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -6,6 +10,11 @@ class QuizCategory(models.Model):
     def __str__(self):
         return self.name
 
+class QuestionQuerySet(models.QuerySet):
+    def with_answers(self):
+        """Join the category and batch-load answers (2 queries for any page size)."""
+        return self.select_related('quiz_category').prefetch_related('answers')
+
 class Question(models.Model):
     # Define difficulty levels
     EASY = 'easy'
@@ -27,10 +36,36 @@ class Question(models.Model):
         choices=DIFFICULTY_CHOICES, 
         default=EASY
     )
+    # SHA-1 of the normalized text (see quiz/hashing.py), set on save.
+    # NULL only for pre-existing duplicates kept by migration 0009.
+    content_hash = models.CharField(max_length=40, null=True, editable=False)
+
+    objects = QuestionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Random sampling / filtering by category and difficulty
+            models.Index(fields=['quiz_category', 'difficulty'], name='question_category_diff_idx'),
+        ]
+        constraints = [
+            # Duplicate check on ingestion: one normalized text per category
+            models.UniqueConstraint(
+                fields=['quiz_category', 'content_hash'],
+                condition=models.Q(content_hash__isnull=False),
+                name='unique_question_content_per_category',
+            ),
+        ]
 
     def __str__(self):
         return self.text
 
+    def clean(self):
+        # Mensaje claro en el admin en lugar de un IntegrityError
+        if self.text and self.quiz_category_id:
+            duplicates = Question.objects.filter(quiz_category_id=self.quiz_category_id, content_hash=text_hash(self.text))
+            if duplicates.exclude(pk=self.pk).exists():
+                raise ValidationError({'text': 'Ya existe una pregunta con este texto en esta categoría.'})
+
 class Answer(models.Model):
     question = models.ForeignKey(
         Question, 
@@ -47,8 +82,79 @@ class Answer(models.Model):
 class Score(models.Model):
     player_name = models.CharField(max_length=100)
     points = models.IntegerField()
-    date = models.DateTimeField(auto_now_add=True)
+    # Set when the score is accepted, so write-behind and replayed scores keep their real time.
+    date = models.DateTimeField(default=timezone.now, editable=False)
     question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="scores", null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Rankings and "latest scores" listings
+            models.Index(fields=['-points'], name='score_points_idx'),
+            models.Index(fields=['-date'], name='score_date_idx'),
+            # Per-player lookups: best score (leaderboard) and date ranges (rollups)
+            models.Index(fields=['player_name', '-points'], name='score_player_points_idx'),
+            models.Index(fields=['player_name', 'date'], name='score_player_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.player_name} - {self.points}"
+
+class ScoreRollup(models.Model):
+    """Best and total points per player within one day, week or month."""
+    DAY = 'day'
+    WEEK = 'week'
+    MONTH = 'month'
+    PERIOD_CHOICES = [
+        (DAY, 'Day'),
+        (WEEK, 'Week'),
+        (MONTH, 'Month'),
+    ]
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    bucket = models.DateField()  # First day of the period
+    player_name = models.CharField(max_length=100)
+    best_points = models.IntegerField()
+    total_points = models.BigIntegerField(default=0)
+    games = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'bucket', 'player_name'], name='unique_score_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'bucket', '-best_points', 'player_name'], name='score_rollup_ranking_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_name} - {self.best_points} ({self.period} {self.bucket})"
+
+class GenerationJob(models.Model):
+    """A queued request to generate questions with OpenAI, run by `run_generation_jobs`."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    category = models.CharField(max_length=255, default='General Knowledge')
+    difficulty = models.CharField(max_length=10, choices=Question.DIFFICULTY_CHOICES, default=Question.EASY)
+    num_questions = models.PositiveIntegerField(default=5)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    locked_until = models.DateTimeField(null=True, blank=True)  # Worker lease
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='generation_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.category} x{self.num_questions} ({self.status})"
@@ -0,0 +1,43 @@
+from urllib.parse import parse_qs, urlsplit
+
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+# 📄 Keyset pagination on the primary key
+class QuestionCursorPagination(CursorPagination):
+    """
+    Cursor pagination ordered by ``id``.
+
+    Each page is a ``WHERE id > <cursor> ORDER BY id LIMIT n`` range scan on the
+    primary key, so deep pages cost the same as the first one and no
+    ``COUNT(*)`` is issued.
+    """
+    ordering = 'id'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    # 🧮 Cacheable pages
+    def page_key(self, request):
+        """What selects the page: the decoded cursor and the page size, whatever else is in the URL."""
+        cursor = self.decode_cursor(request)
+        return (tuple(cursor) if cursor else None, self.get_page_size(request))
+
+    def cacheable_data(self, data):
+        """Paginated response data with the next/previous links reduced to their cursor tokens."""
+        return {**data, 'next': self._token(data['next']), 'previous': self._token(data['previous'])}
+
+    def with_links(self, data, request):
+        """Turn the tokens of ``cacheable_data`` back into links for this request."""
+        url = request.build_absolute_uri()
+        return {
+            **data,
+            'next': data['next'] and replace_query_param(url, self.cursor_query_param, data['next']),
+            'previous': data['previous'] and replace_query_param(url, self.cursor_query_param, data['previous']),
+        }
+
+    def _token(self, link):
+        if link is None:
+            return None
+        return parse_qs(urlsplit(link).query).get(self.cursor_query_param, [None])[0]
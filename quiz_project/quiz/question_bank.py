@@ -0,0 +1,117 @@
+import ast
+import json
+from pathlib import Path
+
+from django.db import transaction
+
+from . import content_cache
+from .ad import BANK_PATH  # noqa: F401 (ruta por defecto de load_question_bank)
+from .hashing import text_hash
+from .models import Answer, Question
+from .question_ingest import chunked, clean_question, ingest_questions, insert_rows, resolve_categories
+
+
+# 📚 Curated question bank: {"Category": [(question, [(answer, is_correct), ...]), ...]}
+def read_bank(path):
+    """
+    Read a bank from a JSON file or a Python file in the tuple format of ``quiz/ad.py``.
+
+    Python files are parsed with ``ast.literal_eval``, never executed; the
+    first top-level dict literal (or ``name = {...}`` assignment) is the bank.
+    """
+    path = Path(path)
+    source = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        return json.loads(source)
+    for node in ast.parse(source).body:
+        value = node.value if isinstance(node, (ast.Assign, ast.Expr)) else None
+        if isinstance(value, ast.Dict):
+            return ast.literal_eval(value)
+    raise ValueError(f"{path} does not contain a dict literal.")
+
+
+def _item(category, entry):
+    try:
+        text, answers = entry
+        return {
+            "category": category,
+            "question": text,
+            "answers": [{"text": answer, "is_correct": is_correct} for answer, is_correct in answers],
+        }
+    except (TypeError, ValueError):
+        return {"category": category}
+
+
+def _stored_answers(question_ids):
+    answers = {}
+    for chunk in chunked(question_ids):
+        for question_id, text, is_correct in (
+            Answer.objects.filter(question_id__in=chunk).order_by("id").values_list("question_id", "text", "is_correct")
+        ):
+            answers.setdefault(question_id, []).append((text, is_correct))
+    return answers
+
+
+def load_bank(bank):
+    """
+    Upsert a question bank in bulk and return a report.
+
+    Stored questions are matched on the ``(category, content_hash)`` index, so
+    reloading an unchanged bank writes nothing. New questions go through
+    ``ingest_questions``; matched questions whose answers changed get their
+    answers replaced. Repeats within the bank count as ``duplicate``.
+    """
+    report = {"inserted": 0, "updated": 0, "unchanged": 0, "duplicate": 0, "invalid": []}
+    cleaned = []
+    for index, item in enumerate(_item(category, entry) for category, entries in bank.items() for entry in entries):
+        result = clean_question(item)
+        if isinstance(result, dict):
+            report["invalid"].append({"index": index, "errors": result})
+        else:
+            cleaned.append(result)
+
+    with transaction.atomic():
+        category_ids = resolve_categories({category for category, _, _, _ in cleaned})
+        keyed = [((category_ids[category], text_hash(text)), (category, text, difficulty, answers))
+                 for category, text, difficulty, answers in cleaned]
+        stored = {}
+        for chunk in chunked({content_hash for (_, content_hash), _ in keyed}):
+            for question_id, category_id, content_hash in (
+                Question.objects.filter(quiz_category_id__in=set(category_ids.values()), content_hash__in=chunk)
+                .values_list("id", "quiz_category_id", "content_hash")
+            ):
+                stored[(category_id, content_hash)] = question_id
+
+        new_items, matched, seen = [], {}, set()
+        for key, (category, text, difficulty, answers) in keyed:
+            if key in seen:
+                report["duplicate"] += 1
+                continue
+            seen.add(key)
+            if key in stored:
+                matched[stored[key]] = (key[0], answers)
+            else:
+                new_items.append({
+                    "category": category, "question": text, "difficulty": difficulty,
+                    "answers": [{"text": answer, "is_correct": is_correct} for answer, is_correct in answers],
+                })
+
+        report["inserted"] = ingest_questions(new_items)["inserted"]
+
+        current = _stored_answers(list(matched))
+        changed = {
+            question_id: answers for question_id, (_, answers) in matched.items()
+            if current.get(question_id) != answers
+        }
+        if changed:
+            for chunk in chunked(changed):
+                Answer.objects.filter(question_id__in=chunk).delete()
+            insert_rows(
+                Answer, ("question", "text", "is_correct"),
+                ((question_id, text, is_correct) for question_id, answers in changed.items() for text, is_correct in answers),
+            )
+            touched = {matched[question_id][0] for question_id in changed}
+            transaction.on_commit(lambda: content_cache.bump(*touched))
+        report["updated"] = len(changed)
+        report["unchanged"] = len(matched) - len(changed)
+    return report
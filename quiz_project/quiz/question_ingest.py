@@ -0,0 +1,168 @@
+from django.db import IntegrityError, connection, transaction
+
+from . import content_cache
+from .hashing import text_hash
+from .models import Answer, Question, QuizCategory
+from .sampler import question_index
+
+DEFAULT_CATEGORY = "General Knowledge"
+DIFFICULTIES = {choice for choice, _ in Question.DIFFICULTY_CHOICES}
+# Keeps every ``IN (...)`` lookup under SQLite's bound-parameter limit.
+LOOKUP_CHUNK = 900
+
+
+# 📥 Bulk question ingestion
+def clean_question(item):
+    """Return ``(category, text, difficulty, answers)`` for a generated question, or a dict of errors."""
+    if not isinstance(item, dict):
+        return {"non_field_errors": ["Expected an object."]}
+    errors = {}
+    text = item.get("question", item.get("text"))
+    if not isinstance(text, str) or not text.strip():
+        errors["question"] = ["This field is required."]
+    category = item.get("category") or DEFAULT_CATEGORY
+    if not isinstance(category, str) or not category.strip() or len(category) > 255:
+        errors["category"] = ["Must be a non-blank name of at most 255 characters."]
+    difficulty = item.get("difficulty") or Question.EASY
+    # Type first: an unhashable value (list, dict) would make the set lookup raise.
+    if not isinstance(difficulty, str) or difficulty not in DIFFICULTIES:
+        errors["difficulty"] = [f"Must be one of: {', '.join(sorted(DIFFICULTIES))}."]
+
+    answers = item.get("answers")
+    if not isinstance(answers, list) or not answers:
+        errors["answers"] = ["At least one answer is required."]
+    elif not all(isinstance(a, dict) and isinstance(a.get("text"), str) and a["text"].strip() for a in answers):
+        errors["answers"] = ["Every answer needs a non-empty text."]
+    elif not any(a.get("is_correct") is True for a in answers):
+        errors["answers"] = ["At least one answer must be correct."]
+
+    if errors:
+        return errors
+    return category.strip(), text.strip(), difficulty, [(a["text"].strip(), a.get("is_correct") is True) for a in answers]
+
+
+def chunked(values, size=LOOKUP_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def resolve_categories(names):
+    """Map category names to ids, creating the missing ones in bulk."""
+    ids = {}
+    for chunk in chunked(names):
+        ids.update(QuizCategory.objects.filter(name__in=chunk).values_list("name", "id"))
+    missing = [QuizCategory(name=name) for name in names if name not in ids]
+    if missing:
+        QuizCategory.objects.bulk_create(missing, ignore_conflicts=True)
+        for chunk in chunked(category.name for category in missing):
+            ids.update(QuizCategory.objects.filter(name__in=chunk).values_list("name", "id"))
+    return ids
+
+
+def existing_hashes(keys):
+    """
+    Return the ``(category_id, content_hash)`` pairs among ``keys`` that are already stored.
+
+    Served by the unique ``(quiz_category, content_hash)`` index, so the cost
+    depends on the batch, not on the size of the bank.
+    """
+    existing = set()
+    category_ids = {category_id for category_id, _ in keys}
+    for chunk in chunked({content_hash for _, content_hash in keys}):
+        existing.update(
+            Question.objects.filter(quiz_category_id__in=category_ids, content_hash__in=chunk)
+            .values_list("quiz_category_id", "content_hash")
+        )
+    return existing & keys
+
+
+def insert_rows(model, field_names, rows):
+    """
+    Insert tuples of database-ready values into ``model``'s table with one ``executemany``.
+
+    For write-only bulk paths (answers, synthetic data): it skips building
+    model instances, which dominates ``bulk_create`` at this scale, and with
+    them ``pre_save`` hooks such as ``auto_now_add``.
+    """
+    quote = connection.ops.quote_name
+    fields = [model._meta.get_field(name) for name in field_names]
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, list(rows))
+
+
+def ingest_questions(items, batch_size=2000):
+    """
+    Validate, dedupe and insert generated questions in one transaction.
+
+    ``items`` are dicts shaped like the OpenAI output (``question``,
+    ``answers``, ``difficulty``, ``category``). Categories are resolved with
+    one lookup, duplicates (same normalized text in the same category, in the
+    batch or already stored) are found with one content-hash lookup, then
+    questions are written with ``bulk_create`` and their answers with one
+    ``executemany``. Returns a report::
+
+        {"inserted": 3, "skipped": [{"index": 4, "reason": "duplicate"}],
+         "invalid": [{"index": 7, "errors": {...}}]}
+    """
+    report = {"inserted": 0, "skipped": [], "invalid": []}
+    cleaned = []
+    for index, item in enumerate(items):
+        result = clean_question(item)
+        if isinstance(result, dict):
+            report["invalid"].append({"index": index, "errors": result})
+        else:
+            cleaned.append((index, *result))
+    if not cleaned:
+        return report
+
+    try:
+        _insert_cleaned(cleaned, report, batch_size)
+    except IntegrityError:
+        # A concurrent import stored some of these questions after our lookup;
+        # the retry sees them and skips them.
+        report["skipped"] = []
+        _insert_cleaned(cleaned, report, batch_size)
+    return report
+
+
+def _insert_cleaned(cleaned, report, batch_size):
+    with transaction.atomic():
+        category_ids = resolve_categories({category for _, category, _, _, _ in cleaned})
+        keyed = []
+        for row in cleaned:
+            _, category, text, _, _ = row
+            keyed.append(((category_ids[category], text_hash(text)), row))
+        seen = existing_hashes({key for key, _ in keyed})
+
+        questions, answer_rows = [], []
+        for key, (index, _, text, difficulty, answers) in keyed:
+            if key in seen:
+                report["skipped"].append({"index": index, "reason": "duplicate"})
+                continue
+            seen.add(key)
+            questions.append(Question(quiz_category_id=key[0], text=text, difficulty=difficulty, content_hash=key[1]))
+            answer_rows.append(answers)
+
+        Question.objects.bulk_create(questions, batch_size=batch_size)
+        insert_rows(
+            Answer, ("question", "text", "is_correct"),
+            (
+                (question.id, text, is_correct)
+                for question, answers in zip(questions, answer_rows)
+                for text, is_correct in answers
+            ),
+        )
+        report["inserted"] = len(questions)
+
+        if questions:
+            # bulk_create skips the model signals that keep these in sync.
+            touched = {question.quiz_category_id for question in questions}
+            indexed = [(question.id, question.quiz_category_id, question.difficulty) for question in questions]
+            transaction.on_commit(lambda: question_index.add_many(indexed))
+            transaction.on_commit(lambda: content_cache.bump(*touched))
@@ -0,0 +1,126 @@
+import random
+import secrets
+import struct
+from array import array
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .sampler import fetch_questions, question_index
+
+
+# 🃏 Per-player quiz sessions
+#
+# A session is stored as one compact bytes blob in the cache:
+#   <seed: uint64><question ids: int64 * n>
+# Ten questions take 88 bytes, so thousands of concurrent sessions fit in a
+# few MB of cache instead of one serialized payload per player. The cursor
+# is a separate integer key advanced with ``incr``, so two concurrent
+# ``next`` calls always get different questions.
+
+_HEADER = struct.Struct("<Q")
+_KEY_PREFIX = "quiz_session:"
+
+
+class QuizSession:
+    """A seeded deck of question IDs and the position of the next question."""
+
+    def __init__(self, session_id, seed, question_ids, cursor=0):
+        self.session_id = session_id
+        self.seed = seed
+        self.question_ids = question_ids
+        self.cursor = cursor
+
+    @property
+    def remaining(self):
+        return len(self.question_ids) - self.cursor
+
+    def pack(self):
+        return _HEADER.pack(self.seed) + self.question_ids.tobytes()
+
+    @classmethod
+    def unpack(cls, session_id, blob, cursor=0):
+        (seed,) = _HEADER.unpack_from(blob)
+        question_ids = array("q")
+        question_ids.frombytes(blob[_HEADER.size:])
+        return cls(session_id, seed, question_ids, cursor)
+
+
+def _cache():
+    # Sessions are rewritten on every answer, so they bypass any per-process tier.
+    return caches[getattr(settings, "QUIZ_SESSION_CACHE", "default")]
+
+
+def _key(session_id):
+    return f"{_KEY_PREFIX}{session_id}"
+
+
+def _cursor_key(session_id):
+    return f"{_KEY_PREFIX}{session_id}:cursor"
+
+
+def _timeout():
+    return getattr(settings, "QUIZ_SESSION_TTL", 3600)
+
+
+def create_session(count, category_id=None, difficulty=None, seed=None):
+    """
+    Deal a new deck of ``count`` questions and store it in the cache.
+
+    Returns ``None`` if the bank has fewer than ``count`` matching questions.
+    """
+    if seed is None:
+        seed = secrets.randbits(53)  # Safe to round-trip through JSON/JavaScript
+    ids = question_index.sample_ids(count, category_id, difficulty, rng=random.Random(seed))
+    if len(ids) < count:
+        return None
+    session = QuizSession(secrets.token_urlsafe(12), seed, array("q", ids))
+    save_session(session)
+    return session
+
+
+def get_session(session_id):
+    stored = _cache().get_many([_key(session_id), _cursor_key(session_id)])
+    blob = stored.get(_key(session_id))
+    if blob is None:
+        return None
+    return QuizSession.unpack(session_id, blob, stored.get(_cursor_key(session_id), 0))
+
+
+def save_session(session):
+    _cache().set_many(
+        {_key(session.session_id): session.pack(), _cursor_key(session.session_id): session.cursor},
+        timeout=_timeout(),
+    )
+
+
+def next_question(session):
+    """
+    Return the next question in the deck and advance the cursor.
+
+    The cursor is claimed with an atomic ``incr``, so concurrent calls for the
+    same session never serve the same position twice.
+    """
+    cache = _cache()
+    total = len(session.question_ids)
+    while True:
+        try:
+            position = cache.incr(_cursor_key(session.session_id))
+        except ValueError:
+            return None  # expired meanwhile
+        session.cursor = min(position, total)
+        if position > total:
+            return None
+        questions = fetch_questions([session.question_ids[position - 1]])
+        if questions:
+            # Sliding expiry: an active session stays alive.
+            cache.touch(_key(session.session_id), _timeout())
+            cache.touch(_cursor_key(session.session_id), _timeout())
+            return questions[0]
+        # Deleted since the deck was dealt: move on to the next one.
+
+
+def page_questions(session, page, page_size):
+    """Return one page of the deck without moving the cursor."""
+    start = (page - 1) * page_size
+    return fetch_questions(list(session.question_ids[start:start + page_size]))
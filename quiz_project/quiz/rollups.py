@@ -0,0 +1,162 @@
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Max, Sum
+from django.db.models.functions import Greatest, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Score, ScoreRollup
+
+
+# 📅 Period buckets
+PERIODS = (ScoreRollup.DAY, ScoreRollup.WEEK, ScoreRollup.MONTH)
+
+_TRUNCATE = {
+    ScoreRollup.DAY: TruncDay,
+    ScoreRollup.WEEK: TruncWeek,
+    ScoreRollup.MONTH: TruncMonth,
+}
+
+
+def bucket_for(period, moment=None):
+    """Return the first day of the ``period`` containing ``moment`` (default: now)."""
+    day = timezone.localtime(moment or timezone.now()).date()
+    if period == ScoreRollup.WEEK:
+        return day - timedelta(days=day.weekday())
+    if period == ScoreRollup.MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def bucket_range(period, bucket):
+    """Return the ``[start, end)`` datetimes covered by a bucket."""
+    if period == ScoreRollup.DAY:
+        end = bucket + timedelta(days=1)
+    elif period == ScoreRollup.WEEK:
+        end = bucket + timedelta(weeks=1)
+    else:
+        end = (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return _start_of(bucket), _start_of(end)
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# ✏️ Incremental maintenance
+def record_score(player_name, points, moment=None):
+    """Fold one new score into the day, week and month rollups."""
+    for period in PERIODS:
+        _upsert(period, bucket_for(period, moment), player_name, points, points, 1)
+
+
+def record_scores(scores):
+    """Fold many new scores into the rollups with one upsert per (bucket, player)."""
+    groups = {}
+    for score in scores:
+        for period in PERIODS:
+            key = (period, bucket_for(period, score.date), score.player_name)
+            best, total, games = groups.get(key, (score.points, 0, 0))
+            groups[key] = (max(best, score.points), total + score.points, games + 1)
+    for (period, bucket, player_name), (best, total, games) in groups.items():
+        _upsert(period, bucket, player_name, best, total, games)
+
+
+def _upsert(period, bucket, player_name, best, total, games):
+    rollups = ScoreRollup.objects.filter(period=period, bucket=bucket, player_name=player_name)
+    update = {
+        "best_points": Greatest("best_points", best),
+        "total_points": F("total_points") + total,
+        "games": F("games") + games,
+    }
+    if rollups.update(**update):
+        return
+    try:
+        with transaction.atomic():
+            ScoreRollup.objects.create(
+                period=period, bucket=bucket, player_name=player_name,
+                best_points=best, total_points=total, games=games,
+            )
+    except IntegrityError:
+        # Another request created the row first; fold into it instead.
+        rollups.update(**update)
+
+
+def refresh_player(player_name, moment):
+    """Recompute a player's rollups around ``moment`` (e.g. after a score is deleted)."""
+    for period in PERIODS:
+        bucket = bucket_for(period, moment)
+        start, end = bucket_range(period, bucket)
+        totals = Score.objects.filter(player_name=player_name, date__gte=start, date__lt=end).aggregate(
+            best=Max("points"), total=Sum("points"), games=Count("id"),
+        )
+        rollups = ScoreRollup.objects.filter(period=period, bucket=bucket, player_name=player_name)
+        if totals["games"]:
+            rollups.update(best_points=totals["best"], total_points=totals["total"], games=totals["games"])
+        else:
+            rollups.delete()
+
+
+# 🔁 Backfill
+def backfill(since=None, batch_size=5000):
+    """
+    Rebuild rollups from ``Score`` with one grouped query per period.
+
+    Buckets starting on or after ``since`` (a date) are replaced; older ones
+    are left untouched. Returns the number of rollup rows written.
+    """
+    written = 0
+    with transaction.atomic():
+        for period in PERIODS:
+            scores = Score.objects.all()
+            existing = ScoreRollup.objects.filter(period=period)
+            if since is not None:
+                first_bucket = bucket_for(period, _start_of(since))
+                scores = scores.filter(date__gte=_start_of(first_bucket))
+                existing = existing.filter(bucket__gte=first_bucket)
+            existing.delete()
+
+            rows = (
+                scores.annotate(bucket=_TRUNCATE[period]("date", output_field=DateField()))
+                .values("bucket", "player_name")
+                .annotate(best=Max("points"), total=Sum("points"), games=Count("id"))
+                .order_by()
+            )
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(ScoreRollup(
+                    period=period, bucket=row["bucket"], player_name=row["player_name"],
+                    best_points=row["best"], total_points=row["total"], games=row["games"],
+                ))
+                if len(batch) >= batch_size:
+                    ScoreRollup.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            ScoreRollup.objects.bulk_create(batch)
+            written += len(batch)
+    return written
+
+
+# 🏆 Queries
+def _top_rows(period, n, moment):
+    return (
+        ScoreRollup.objects.filter(period=period, bucket=bucket_for(period, moment))
+        .order_by("-best_points", "player_name")
+        .values_list("player_name", "best_points")[:n]
+    )
+
+
+def _ranked(rows):
+    return [
+        {"rank": position + 1, "player_name": player_name, "points": points}
+        for position, (player_name, points) in enumerate(rows)
+    ]
+
+
+def top(period, n=10, moment=None):
+    """Top ``n`` players by best score in the current ``period`` bucket."""
+    return _ranked(_top_rows(period, n, moment))
+
+
+async def atop(period, n=10, moment=None):
+    return _ranked([row async for row in _top_rows(period, n, moment)])
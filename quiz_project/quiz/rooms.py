@@ -0,0 +1,361 @@
+import asyncio
+import logging
+import time
+import uuid
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from .answer_key import POINTS_PER_CORRECT
+from .models import Score
+from .score_ingest import save_scores
+
+logger = logging.getLogger(__name__)
+
+# ⏱️ Server-authoritative room timers
+#
+# A room's timer lives in the shared cache as a deadline, not as a stream of
+# ticks: the server broadcasts one event when the timer starts (or resumes),
+# pauses and ends, and clients count down locally to ``deadline``. Each
+# process runs at most one scheduler task per room, which sleeps until the
+# deadline and broadcasts the end; a cache lease keeps a second process from
+# scheduling the same room.
+#
+# Broadcasts are coalesced: events a process raises for a room within
+# ``QUIZ_BROADCAST_WINDOW`` seconds go out as one group message, so a burst
+# (hundreds of joins, a start right after them) costs one channel-layer
+# fan-out instead of one per event.
+
+RUNNING = "running"
+PAUSED = "paused"
+ENDED = "ended"
+PRESENCE = "presence"
+
+DEFAULT_DURATION = 30
+MAX_DURATION = 3600
+STATE_TIMEOUT = 24 * 3600
+LEASE_GRACE = 5
+DEFAULT_BROADCAST_WINDOW = 0.05
+PRESENCE_TTL = 30
+
+MAX_ROUND_QUESTIONS = 50
+
+_schedulers = {}
+_broadcasts = {}
+_local_presence = {}
+_heartbeats = {}
+PROCESS_ID = uuid.uuid4().hex
+
+
+def room_cache():
+    return caches[getattr(settings, "QUIZ_ROOM_CACHE", "default")]
+
+
+def group_name(room_id):
+    return f"quiz_room_{room_id}"
+
+
+def _state_key(room_id):
+    return f"quiz:room:{room_id}:timer"
+
+
+def _lease_key(room_id):
+    return f"quiz:room:{room_id}:scheduler"
+
+
+def _presence_key(room_id, *parts):
+    return ":".join((f"quiz:room:{room_id}:presence", *map(str, parts)))
+
+
+def public_state(state, now=None):
+    """The timer as sent to clients (``remaining`` is derived for late joiners)."""
+    if state is None:
+        return {"status": None}
+    now = time.time() if now is None else now
+    remaining = state["remaining"] if state["status"] == PAUSED else max(0.0, state["deadline"] - now)
+    if state["status"] == ENDED:
+        remaining = 0.0
+    return {**state, "remaining": round(remaining, 3), "server_time": now}
+
+
+async def get_state(room_id):
+    return await room_cache().aget(_state_key(room_id))
+
+
+async def _save(room_id, state):
+    await room_cache().aset(_state_key(room_id), state, timeout=STATE_TIMEOUT)
+    return state
+
+
+async def start(room_id, duration=DEFAULT_DURATION, question_ids=()):
+    """
+    Start a new round; returns ``None`` if one is already running.
+
+    Only ``question_ids`` can be answered during the round.
+    """
+    state = await get_state(room_id)
+    if state and state["status"] == RUNNING and state["deadline"] > time.time():
+        return None
+    now = time.time()
+    round_number = (state or {}).get("round", 0) + 1
+    return await _save(room_id, {
+        "status": RUNNING, "round": round_number, "duration": duration,
+        "started_at": now, "deadline": now + duration, "remaining": float(duration),
+        "question_ids": list(question_ids),
+    })
+
+
+async def pause(room_id):
+    state = await get_state(room_id)
+    if not state or state["status"] != RUNNING:
+        return None
+    remaining = max(0.0, state["deadline"] - time.time())
+    return await _save(room_id, {**state, "status": PAUSED, "remaining": remaining})
+
+
+async def resume(room_id):
+    state = await get_state(room_id)
+    if not state or state["status"] != PAUSED:
+        return None
+    return await _save(room_id, {**state, "status": RUNNING, "deadline": time.time() + state["remaining"]})
+
+
+async def end(room_id, round_number=None):
+    """End the current round (only ``round_number`` if given); returns the ended state or ``None``."""
+    state = await get_state(room_id)
+    if not state or state["status"] == ENDED or (round_number is not None and state["round"] != round_number):
+        return None
+    return await _save(room_id, {**state, "status": ENDED, "remaining": 0.0, "ended_at": time.time()})
+
+
+# 🗓️ Scheduler: one task per room and process
+def ensure_scheduler(room_id, channel_layer, on_end=None):
+    """Make sure somebody will broadcast the end of the room's running round."""
+    task = _schedulers.get(room_id)
+    if task is not None and not task.done():
+        return task
+    task = asyncio.ensure_future(_run_scheduler(room_id, channel_layer, on_end))
+    _schedulers[room_id] = task
+    return task
+
+
+def cancel_scheduler(room_id):
+    """Stop this process's scheduler for a paused or stopped room (it would only wake up to exit)."""
+    task = _schedulers.get(room_id)
+    if task is not None and task is not asyncio.current_task():
+        task.cancel()
+
+
+async def _run_scheduler(room_id, channel_layer, on_end):
+    cache = room_cache()
+    lease = _lease_key(room_id)
+    holding = False
+    try:
+        while True:
+            state = await get_state(room_id)
+            if not state or state["status"] != RUNNING:
+                return
+            delay = state["deadline"] - time.time()
+            ttl = max(delay, 0) + LEASE_GRACE
+            if holding:
+                await cache.atouch(lease, timeout=ttl)
+            elif await cache.aadd(lease, True, timeout=ttl):
+                holding = True
+            else:
+                return  # Another process is scheduling this room.
+            if delay > 0:
+                # Wake at the deadline, then re-read: a pause or restart moves it.
+                await asyncio.sleep(delay)
+                continue
+            ended = await end(room_id, state["round"])
+            if ended is not None:
+                if on_end is not None:
+                    await on_end(room_id, ended)
+                # Even if every player has left, the round's scores are written
+                # (before the broadcast, so "ended" means they are saved).
+                await persist_scores(room_id, ended["round"])
+                broadcast(room_id, channel_layer, ENDED, public_state(ended))
+            return
+    finally:
+        if holding:
+            await cache.adelete(lease)
+        if _schedulers.get(room_id) is asyncio.current_task():
+            del _schedulers[room_id]
+
+
+# 📣 Coalesced broadcasts
+def broadcast(room_id, channel_layer, event, payload):
+    """
+    Queue ``event`` for every socket of the room.
+
+    The first event of a window schedules the flush; later ones ride along.
+    Only the latest presence count of a window is kept.
+    """
+    pending = _broadcasts.get(room_id)
+    if pending is None or pending["task"].done():
+        window = getattr(settings, "QUIZ_BROADCAST_WINDOW", DEFAULT_BROADCAST_WINDOW)
+        pending = _broadcasts[room_id] = {"events": [], "task": None}
+        pending["task"] = asyncio.ensure_future(_flush_broadcasts(room_id, channel_layer, pending, window))
+    if event == PRESENCE:
+        pending["events"] = [queued for queued in pending["events"] if queued[0] != PRESENCE]
+    pending["events"].append([event, payload])
+
+
+async def _flush_broadcasts(room_id, channel_layer, pending, window):
+    await asyncio.sleep(window)
+    if _broadcasts.get(room_id) is pending:
+        del _broadcasts[room_id]
+    try:
+        await channel_layer.group_send(group_name(room_id), {"type": "room_events", "events": pending["events"]})
+    except Exception:
+        # Nobody awaits this task: without this the failure would go unnoticed.
+        logger.exception("Broadcast of %d events to room %s failed", len(pending["events"]), room_id)
+
+
+# 👥 Presence: per-process counts, summed
+#
+# Each process publishes how many sockets it holds in a room under its own key,
+# refreshed every ``PRESENCE_TTL / 3`` seconds while it holds any. The room's
+# presence is the sum of the published counts, so the sockets of a worker that
+# crashed stop counting once its key expires. Processes hold numbered slots so
+# they can be listed without scanning keys; a slot lives as long as its
+# process's heartbeats and is then claimed again by the next process that
+# registers, so the slot numbers stay as low as the number of live processes.
+async def register_process(room_id, process_id=PROCESS_ID, timeout=PRESENCE_TTL):
+    """List (or keep listing) a process among the room's publishers; returns its slot."""
+    cache = room_cache()
+    member = _presence_key(room_id, "member", process_id)
+    slots = _presence_key(room_id, "slots")
+    slot = await cache.aget(member)
+    if slot is not None and await cache.aget(_presence_key(room_id, "slot", slot)) == process_id:
+        await cache.atouch(_presence_key(room_id, "slot", slot), timeout)
+        await cache.atouch(member, timeout)
+        await cache.atouch(slots, STATE_TIMEOUT)
+        return slot
+    await cache.aadd(slots, 0, timeout=STATE_TIMEOUT)
+    highest = await cache.aget(slots, 0)
+    slot = 1
+    # ``add`` claims a free slot atomically: the first one left by a dead process, or a new one.
+    while True:
+        if slot > highest:
+            slot = highest = await cache.aincr(slots)
+        if await cache.aadd(_presence_key(room_id, "slot", slot), process_id, timeout=timeout):
+            break
+        slot += 1
+    await cache.aset(member, slot, timeout=timeout)
+    return slot
+
+
+async def publish_presence(room_id, process_id, count, timeout=PRESENCE_TTL):
+    """Publish one process's socket count for the room."""
+    await room_cache().aset(_presence_key(room_id, "count", process_id), count, timeout=timeout)
+
+
+async def presence(room_id):
+    """Connected players in the room across every live process."""
+    cache = room_cache()
+    slots = await cache.aget(_presence_key(room_id, "slots"), 0)
+    processes = await cache.aget_many([_presence_key(room_id, "slot", slot) for slot in range(1, slots + 1)])
+    counts = await cache.aget_many([_presence_key(room_id, "count", process_id) for process_id in set(processes.values())])
+    return sum(counts.values())
+
+
+async def update_presence(room_id, delta):
+    """Add ``delta`` sockets of this process to the room; returns the room's new count."""
+    count = max(_local_presence.get(room_id, 0) + delta, 0)
+    if count:
+        _local_presence[room_id] = count
+        await register_process(room_id)
+        heartbeat = _heartbeats.get(room_id)
+        if heartbeat is None or heartbeat.done():
+            _heartbeats[room_id] = asyncio.ensure_future(_presence_heartbeat(room_id))
+    else:
+        _local_presence.pop(room_id, None)
+        heartbeat = _heartbeats.pop(room_id, None)
+        if heartbeat is not None:
+            heartbeat.cancel()
+    await publish_presence(room_id, PROCESS_ID, count)
+    return await presence(room_id)
+
+
+async def _presence_heartbeat(room_id):
+    try:
+        while True:
+            await asyncio.sleep(PRESENCE_TTL / 3)
+            count = _local_presence.get(room_id, 0)
+            if not count:
+                return
+            await register_process(room_id)
+            await publish_presence(room_id, PROCESS_ID, count)
+    except Exception:
+        logger.exception("Presence heartbeat for room %s failed", room_id)
+    finally:
+        if _heartbeats.get(room_id) is asyncio.current_task():
+            del _heartbeats[room_id]
+
+
+# 🧾 Running scores, tallied in the shared cache and written once per round
+#
+# Answers are graded in memory and tallied with atomic ``add``/``incr`` in the
+# room cache (Redis in production), so a worker that crashes mid-round loses
+# nothing and a player cannot answer the same question twice through two
+# workers. Each player who answers gets a numbered slot, which is how the
+# round's players are listed when its scores are written: once, by whichever
+# process sees the round end first.
+def _round_key(room_id, round_number, *parts):
+    return ":".join((f"quiz:room:{room_id}:round:{round_number}", *map(str, parts)))
+
+
+async def record_answer(room_id, round_number, player_id, player_name, question_id, correct):
+    """Tally one graded answer; returns the player's running score, or ``None`` for a repeat."""
+    cache = room_cache()
+    if not await cache.aadd(_round_key(room_id, round_number, "answered", player_id, question_id), True, timeout=STATE_TIMEOUT):
+        return None
+    if await cache.aadd(_round_key(room_id, round_number, "player", player_id), player_name, timeout=STATE_TIMEOUT):
+        players = _round_key(room_id, round_number, "players")
+        await cache.aadd(players, 0, timeout=STATE_TIMEOUT)
+        slot = await cache.aincr(players)
+        await cache.aset(_round_key(room_id, round_number, "slot", slot), player_id, timeout=STATE_TIMEOUT)
+    points = _round_key(room_id, round_number, "points", player_id)
+    await cache.aadd(points, 0, timeout=STATE_TIMEOUT)
+    return await cache.aincr(points, POINTS_PER_CORRECT if correct else 0)
+
+
+async def round_scores(room_id, round_number):
+    """``[(player_name, points)]`` tallied so far for one round."""
+    cache = room_cache()
+    count = await cache.aget(_round_key(room_id, round_number, "players"), 0)
+    slots = await cache.aget_many([_round_key(room_id, round_number, "slot", slot) for slot in range(1, count + 1)])
+    name_keys = {player_id: _round_key(room_id, round_number, "player", player_id) for player_id in slots.values()}
+    point_keys = {player_id: _round_key(room_id, round_number, "points", player_id) for player_id in slots.values()}
+    names = await cache.aget_many(name_keys.values())
+    points = await cache.aget_many(point_keys.values())
+    return [
+        (names[name_keys[player_id]], points.get(point_keys[player_id], 0))
+        for player_id in name_keys if name_keys[player_id] in names
+    ]
+
+
+async def persist_scores(room_id, round_number):
+    """
+    Write a finished round's scores with one bulk insert (first caller only).
+
+    Called once where the round ends (the scheduler at the deadline, or the
+    ``stop_timer`` that ended it). Returns how many were saved, or ``None`` if
+    the write failed: that is logged, and the tallies stay in the cache until
+    they expire, so a later call can retry.
+    """
+    cache = room_cache()
+    persisted = _round_key(room_id, round_number, "persisted")
+    if not await cache.aadd(persisted, True, timeout=STATE_TIMEOUT):
+        return 0
+    try:
+        scores = await round_scores(room_id, round_number)
+        if scores:
+            await database_sync_to_async(save_scores)([Score(player_name=name, points=points) for name, points in scores])
+    except Exception:
+        await cache.adelete(persisted)
+        logger.exception("Could not save the scores of room %s, round %s.", room_id, round_number)
+        return None
+    return len(scores)
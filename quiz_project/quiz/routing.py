@@ -2,5 +2,7 @@ from django.urls import re_path
 from .consumers import QuizTimerConsumer
 
 websocket_urlpatterns = [
+    re_path(r'ws/quiz/timer/(?P<room_id>[A-Za-z0-9_-]{1,64})/$', QuizTimerConsumer.as_asgi()),
+    # Ruta antigua: sala "default"
     re_path(r'ws/quiz/timer/$', QuizTimerConsumer.as_asgi()),
 ]
@@ -0,0 +1,230 @@
+import random
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Question
+
+
+# 🎲 In-memory ID index for random question sampling
+class QuestionIndex:
+    """
+    Compact index of question IDs grouped by (quiz_category_id, difficulty).
+
+    Each bucket is an ``array('q')`` of IDs (8 bytes per question), so the whole
+    bank fits in a few MB; a position map (id -> bucket key and offset) makes
+    moving or removing a question O(1). The index is built lazily with a single
+    ``values_list`` scan and then kept up to date incrementally from the
+    ``Question`` signals in ``quiz/signals.py``. Because those signals only fire
+    in the process that performed the write, the index is also rebuilt after
+    ``QUIZ_SAMPLER_MAX_AGE`` seconds so other workers converge.
+    """
+
+    def __init__(self, max_age=None):
+        self._lock = threading.RLock()
+        self._buckets = None
+        self._positions = {}
+        self._built_at = 0.0
+        self._max_age = max_age
+
+    @property
+    def max_age(self):
+        if self._max_age is not None:
+            return self._max_age
+        return getattr(settings, "QUIZ_SAMPLER_MAX_AGE", 300)
+
+    # 🔄 Build / invalidate
+    def rebuild(self):
+        """Reload every question ID from the database in one streamed query."""
+        buckets, positions = {}, {}
+        rows = Question.objects.values_list("id", "quiz_category_id", "difficulty")
+        for question_id, category_id, difficulty in rows.iterator(chunk_size=10000):
+            key = (category_id, difficulty)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = array("q")
+            positions[question_id] = (key, len(bucket))
+            bucket.append(question_id)
+        with self._lock:
+            self._buckets = buckets
+            self._positions = positions
+            self._built_at = time.monotonic()
+
+    def reset(self):
+        """Drop the index; it will be rebuilt on next use."""
+        with self._lock:
+            self._buckets = None
+            self._positions = {}
+
+    def stale(self):
+        return self._buckets is None or time.monotonic() - self._built_at > self.max_age
+
+    def _ensure_built(self):
+        # Outside the lock: the rebuild query must not block other threads.
+        if self.stale():
+            self.rebuild()
+
+    # ✏️ Incremental maintenance
+    def add(self, question_id, category_id, difficulty):
+        with self._lock:
+            if self._buckets is None:
+                return
+            key = (category_id, difficulty)
+            current = self._positions.get(question_id)
+            if current is not None and current[0] == key:
+                return  # saved without moving: nothing to do
+            self._discard(question_id)
+            bucket = self._buckets.setdefault(key, array("q"))
+            self._positions[question_id] = (key, len(bucket))
+            bucket.append(question_id)
+
+    def add_many(self, rows):
+        """``add`` every ``(question_id, category_id, difficulty)``, e.g. after a bulk insert."""
+        with self._lock:
+            for row in rows:
+                self.add(*row)
+
+    def remove(self, question_id):
+        with self._lock:
+            if self._buckets is not None:
+                self._discard(question_id)
+
+    def _discard(self, question_id):
+        found = self._positions.pop(question_id, None)
+        if found is None:
+            return
+        key, position = found
+        bucket = self._buckets[key]
+        # Swap-remove: the last ID takes the freed slot.
+        last = bucket.pop()
+        if last != question_id:
+            bucket[position] = last
+            self._positions[last] = (key, position)
+        if not bucket:
+            del self._buckets[key]
+
+    # 🎯 Sampling
+    def _select(self, category_id=None, difficulty=None):
+        return [
+            bucket for (bucket_category, bucket_difficulty), bucket in self._buckets.items()
+            if (category_id is None or bucket_category == category_id)
+            and (difficulty is None or bucket_difficulty == difficulty)
+        ]
+
+    def count(self, category_id=None, difficulty=None):
+        while True:
+            self._ensure_built()
+            with self._lock:
+                # Loop: a reset can drop the index between the build and the lock.
+                if self._buckets is not None:
+                    return sum(len(bucket) for bucket in self._select(category_id, difficulty))
+
+    def sample_ids(self, k, category_id=None, difficulty=None, rng=None):
+        """
+        Draw ``k`` distinct question IDs matching the filters.
+
+        Positions are sampled from ``range(total)`` (O(k)) and mapped onto the
+        matching buckets through their cumulative sizes, so no bucket is ever
+        copied or shuffled. Returns fewer than ``k`` IDs if not enough exist.
+        """
+        while True:
+            self._ensure_built()
+            ids = self._draw(k, category_id, difficulty, rng or random)
+            if ids is not None:
+                return ids
+
+    async def asample_ids(self, k, category_id=None, difficulty=None, rng=None):
+        """``sample_ids`` for coroutines: a rebuild runs in a thread, never on the event loop."""
+        while True:
+            if self.stale():
+                await sync_to_async(self.rebuild)()
+            ids = self._draw(k, category_id, difficulty, rng or random)
+            if ids is not None:
+                return ids
+
+    def _draw(self, k, category_id, difficulty, rng):
+        with self._lock:
+            if self._buckets is None:
+                return None
+            buckets = self._select(category_id, difficulty)
+            offsets = []
+            total = 0
+            for bucket in buckets:
+                offsets.append(total)
+                total += len(bucket)
+            positions = rng.sample(range(total), min(k, total))
+            ids = []
+            for position in positions:
+                index = bisect_right(offsets, position) - 1
+                ids.append(buckets[index][position - offsets[index]])
+            return ids
+
+
+question_index = QuestionIndex()
+
+
+def fetch_questions(ids):
+    """Load the given questions (with answers) preserving the order of ``ids``."""
+    questions = Question.objects.filter(id__in=ids).with_answers()
+    by_id = {question.id: question for question in questions}
+    return [by_id[question_id] for question_id in ids if question_id in by_id]
+
+
+async def afetch_questions(ids):
+    by_id = {question.id: question async for question in Question.objects.filter(id__in=ids).with_answers()}
+    return [by_id[question_id] for question_id in ids if question_id in by_id]
+
+
+def _unseen(ids, seen, limit):
+    return [question_id for question_id in ids if question_id not in seen][:limit]
+
+
+def _keep_live(ids, fetched, seen):
+    found = {question.id for question in fetched}
+    for question_id in ids:
+        if question_id not in found:
+            question_index.remove(question_id)
+    seen.update(found)
+
+
+def sample_questions(k, category_id=None, difficulty=None):
+    """
+    Return up to ``k`` random questions with their answers.
+
+    IDs that no longer exist (deleted by another worker) are dropped from the
+    index and the draw is topped up, so callers always get live rows.
+    """
+    questions = []
+    seen = set()
+    for _ in range(3):
+        missing = k - len(questions)
+        if missing <= 0:
+            break
+        ids = _unseen(question_index.sample_ids(missing + len(seen), category_id, difficulty), seen, missing)
+        if not ids:
+            break
+        fetched = fetch_questions(ids)
+        _keep_live(ids, fetched, seen)
+        questions.extend(fetched)
+    return questions
+
+
+async def asample_questions(k, category_id=None, difficulty=None):
+    """``sample_questions`` for async views: rows come from the async ORM, an index rebuild runs in a thread."""
+    questions = []
+    seen = set()
+    for _ in range(3):
+        missing = k - len(questions)
+        if missing <= 0:
+            break
+        ids = _unseen(await question_index.asample_ids(missing + len(seen), category_id, difficulty), seen, missing)
+        if not ids:
+            break
+        fetched = await afetch_questions(ids)
+        _keep_live(ids, fetched, seen)
+        questions.extend(fetched)
+    return questions
@@ -0,0 +1,334 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from . import rollups
+from .leaderboard import leaderboard
+from .models import Question, Score
+from .serializers import ScoreBatchItemSerializer
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to checking the PID only.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+# 📥 Batch score ingestion
+_QUESTION_FIELD = serializers.IntegerField()
+
+
+def _question_id(value):
+    """The id ``ScoreBatchItemSerializer`` will see for ``value`` (e.g. ``"5"`` -> 5), or ``None``."""
+    if value is None:
+        return None
+    try:
+        return _QUESTION_FIELD.to_internal_value(value)
+    except serializers.ValidationError:
+        return None
+
+
+def validate_scores(items):
+    """
+    Validate a list of score payloads in one pass.
+
+    Referenced question ids are resolved with a single query. Returns the
+    unsaved ``Score`` objects for the valid items and a list of
+    ``{"index": i, "errors": {...}}`` for the invalid ones.
+    """
+    referenced = {_question_id(item.get("question")) for item in items if isinstance(item, dict)}
+    referenced.discard(None)
+    question_ids = set(Question.objects.filter(id__in=referenced).values_list("id", flat=True)) if referenced else set()
+
+    scores, errors = [], []
+    for index, item in enumerate(items):
+        serializer = ScoreBatchItemSerializer(data=item, context={"question_ids": question_ids})
+        if serializer.is_valid():
+            data = serializer.validated_data
+            scores.append(Score(
+                player_name=data["player_name"], points=data["points"], question_id=data.get("question"),
+            ))
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+    return scores, errors
+
+
+def save_scores(scores):
+    """
+    Insert scores with one ``bulk_create`` and update the derived ranking state once.
+
+    ``bulk_create`` skips the model signals, so the rollups and the leaderboard
+    are updated here for the whole batch.
+    """
+    if not scores:
+        return []
+    with transaction.atomic():
+        created = Score.objects.bulk_create(scores)
+        rollups.record_scores(created)
+    leaderboard.submit_many((score.player_name, score.points) for score in created)
+    return created
+
+
+def save_or_isolate(batch):
+    """
+    ``save_scores`` for queued scores, without letting one bad row block the rest.
+
+    If the database rejects the batch for its data (``IntegrityError`` or
+    ``DataError``), the rows are retried one by one and the rejected ones are
+    logged and dropped. Rows are removed from ``batch`` as they are committed
+    or dropped, so when any other error (e.g. the database is down) propagates,
+    ``batch`` holds exactly what is left to retry. Returns how many were inserted.
+    """
+    try:
+        inserted = len(save_scores(batch))
+        batch.clear()
+        return inserted
+    except (IntegrityError, DataError):
+        logger.warning("A batch of %d scores was rejected; retrying them one by one.", len(batch))
+    inserted = 0
+    while batch:
+        score = batch[0]
+        try:
+            inserted += len(save_scores([score]))
+        except (IntegrityError, DataError):
+            logger.exception("Dropping a score the database rejected: %s", json.dumps(_spool_row(score)))
+        batch.pop(0)
+    return inserted
+
+
+# ⏳ Write-behind buffer
+class ScoreBuffer:
+    """
+    Accepts scores immediately and writes them to the database in bulk.
+
+    Scores are queued in process memory and flushed by a background thread
+    with ``save_scores`` once ``QUIZ_SCORE_BUFFER_SIZE`` are pending or every
+    ``QUIZ_SCORE_FLUSH_INTERVAL`` seconds, and once more at interpreter exit.
+
+    Every accepted score is also appended to a per-process JSON Lines journal
+    in ``QUIZ_SCORE_SPOOL_DIR`` and fsynced before it is acknowledged (set the
+    setting to ``None`` to trade that durability for speed). A journal file is
+    deleted only after its scores are committed, so scores left behind by a
+    crashed worker can be recovered with ``drain_score_buffer``. Recovery is
+    at-least-once: a crash between commit and deletion replays that file.
+    Scores keep the time they were accepted, however late they are inserted,
+    and rows the database rejects are dropped (see ``save_or_isolate``).
+    """
+
+    def __init__(self, max_size=None, flush_interval=None, spool_dir=None, autostart=True):
+        self._max_size = max_size
+        self._flush_interval = flush_interval
+        self._spool_dir = spool_dir
+        self._autostart = autostart
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = []
+        self._journal = None
+        self._journal_seq = 0
+        self._owner = None
+        self._owner_lock = None
+        self._sealed = []
+        self._thread = None
+
+    @property
+    def max_size(self):
+        return self._max_size or getattr(settings, "QUIZ_SCORE_BUFFER_SIZE", 500)
+
+    @property
+    def flush_interval(self):
+        return self._flush_interval or getattr(settings, "QUIZ_SCORE_FLUSH_INTERVAL", 1.0)
+
+    @property
+    def spool_dir(self):
+        if self._spool_dir:
+            return self._spool_dir
+        return getattr(settings, "QUIZ_SCORE_SPOOL_DIR", os.path.join(settings.BASE_DIR, "score_spool"))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def add(self, scores):
+        """Queue unsaved ``Score`` objects; they are durable once this returns if spooling is on."""
+        for score in scores:
+            if score.date is None:
+                score.date = timezone.now()
+        with self._lock:
+            if self.spool_dir:
+                journal = self._open_journal()
+                for score in scores:
+                    journal.write(json.dumps(_spool_row(score)) + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+            self._pending.extend(scores)
+            full = len(self._pending) >= self.max_size
+        if self._autostart:
+            self._start()
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Write every pending score now; returns how many were inserted."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._seal_journal()
+                sealed = list(self._sealed)
+            try:
+                inserted = save_or_isolate(batch)
+            except Exception:
+                # Only what was not committed yet goes back in the queue.
+                with self._lock:
+                    self._pending[:0] = batch
+                raise
+            for path in sealed:
+                os.remove(path)
+            with self._lock:
+                self._sealed = [path for path in self._sealed if path not in sealed]
+            return inserted
+
+    # 📓 Journal files
+    def _open_journal(self):
+        if self._journal is None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._journal_seq += 1
+            path = os.path.join(self.spool_dir, f"scores-{self._claim_owner()}-{self._journal_seq}.jsonl")
+            self._journal = open(path, "x", encoding="utf-8")
+        return self._journal
+
+    def _claim_owner(self):
+        # PIDs get reused, so journals are also named after a random token, and
+        # the owner holds a lock on ``scores-<owner>.lock`` for as long as it
+        # runs (re-claimed after a fork).
+        if self._owner is None or not self._owner.startswith(f"{os.getpid()}-"):
+            owner = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+            lock = open(os.path.join(self.spool_dir, f"scores-{owner}.lock"), "x")
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._owner, self._owner_lock = owner, lock
+        return self._owner
+
+    def _seal_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._sealed.append(self._journal.name)
+            self._journal = None
+
+    # 🧵 Background flusher
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="score-buffer-flusher", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Error flushing buffered scores; they will be retried.")
+            finally:
+                connections.close_all()
+
+
+def _spool_row(score):
+    return {
+        "player_name": score.player_name, "points": score.points, "question_id": score.question_id,
+        "date": score.date.isoformat(),
+    }
+
+
+def _spooled_score(row):
+    # Journals written before scores carried their date are dated now.
+    date = row.pop("date", None)
+    return Score(**row, date=parse_datetime(date) if date else timezone.now())
+
+
+def drain_spool(spool_dir, include_live=False):
+    """
+    Insert the scores journaled by processes that are no longer running.
+
+    Returns ``(files, scores)`` drained. Journals of live processes are skipped
+    unless ``include_live`` is set (only safe when no worker is running).
+    """
+    files = scores = 0
+    if not spool_dir or not os.path.isdir(spool_dir):
+        return files, scores
+    names = sorted(os.listdir(spool_dir))
+    dead = {}
+    for name in names:
+        if not (name.startswith("scores-") and name.endswith(".jsonl")):
+            continue
+        owner = name[len("scores-"):-len(".jsonl")].rsplit("-", 1)[0]
+        if owner not in dead:
+            dead[owner] = include_live or not _owner_alive(spool_dir, owner)
+        if not dead[owner]:
+            continue
+        path = os.path.join(spool_dir, name)
+        with open(path, encoding="utf-8") as journal:
+            batch = [_spooled_score(json.loads(line)) for line in journal if line.strip()]
+        scores += save_or_isolate(batch)
+        os.remove(path)
+        files += 1
+    # Locks left behind by owners that are gone (or whose journals were just drained).
+    for name in names:
+        if name.startswith("scores-") and name.endswith(".lock"):
+            owner = name[len("scores-"):-len(".lock")]
+            if dead.get(owner) or (owner not in dead and not _owner_alive(spool_dir, owner)):
+                os.remove(os.path.join(spool_dir, name))
+    return files, scores
+
+
+def _owner_alive(spool_dir, owner):
+    """Whether the process that journals as ``owner`` (``<pid>-<token>``) still runs."""
+    if "-" not in owner:
+        # Journals from before owners had a token.
+        return _process_alive(int(owner))
+    path = os.path.join(spool_dir, f"scores-{owner}.lock")
+    if not os.path.exists(path):
+        return False
+    if fcntl is None:
+        return _process_alive(int(owner.split("-")[0]))
+    with open(path) as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(lock, fcntl.LOCK_UN)
+    return False
+
+
+def _process_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_behind_enabled():
+    return getattr(settings, "QUIZ_SCORE_WRITE_BEHIND", False)
+
+
+score_buffer = ScoreBuffer()
@@ -0,0 +1,82 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Question
+
+
+# 🔎 Full-text search (SQLite FTS5, see migration 0007)
+#
+# Question hits rank on their own text; answer hits rank the question they
+# belong to at half weight. bm25() is negative, lower is better.
+
+QUESTION_FTS = "quiz_question_fts"
+ANSWER_FTS = "quiz_answer_fts"
+ANSWER_WEIGHT = 0.5
+
+_SEARCH_SQL = f"""
+    SELECT question_id, MIN(rank) AS rank FROM (
+        SELECT rowid AS question_id, bm25({QUESTION_FTS}) AS rank
+        FROM {QUESTION_FTS} WHERE {QUESTION_FTS} MATCH %s
+        UNION ALL
+        SELECT a.question_id, bm25({ANSWER_FTS}) * {ANSWER_WEIGHT} AS rank
+        FROM {ANSWER_FTS} JOIN quiz_answer a ON a.id = {ANSWER_FTS}.rowid
+        WHERE {ANSWER_FTS} MATCH %s
+    )
+    GROUP BY question_id
+    ORDER BY rank, question_id
+    LIMIT %s OFFSET %s
+"""
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_available():
+    return connection.vendor == "sqlite"
+
+
+def to_match_query(text):
+    """
+    Turn free user input into a safe FTS5 query.
+
+    Every word becomes a quoted prefix term, so FTS operators and stray quotes
+    in the input cannot produce a syntax error. Returns ``""`` if there are
+    no words.
+    """
+    return " ".join(f'"{token}"*' for token in _TOKEN.findall(text))
+
+
+def search_question_ids(text, limit=10, offset=0):
+    """Return ``[(question_id, rank), ...]`` best match first."""
+    match = to_match_query(text)
+    if not match:
+        return []
+    if not fts_available():
+        questions = Question.objects.filter(text__icontains=text) | Question.objects.filter(answers__text__icontains=text)
+        ids = questions.distinct().order_by("id").values_list("id", flat=True)[offset:offset + limit]
+        return [(question_id, 0.0) for question_id in ids]
+    with connection.cursor() as cursor:
+        cursor.execute(_SEARCH_SQL, [match, match, limit, offset])
+        return cursor.fetchall()
+
+
+def filter_by_search(queryset, text):
+    """Restrict a Question or Answer queryset to rows whose own text matches."""
+    match = to_match_query(text)
+    if not match:
+        return queryset.none()
+    if not fts_available():
+        return queryset.filter(text__icontains=text)
+    fts = QUESTION_FTS if queryset.model is Question else ANSWER_FTS
+    return queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match]))
+
+
+def rebuild_index():
+    """Re-index every question and answer from the base tables."""
+    if not fts_available():
+        return False
+    with connection.cursor() as cursor:
+        for fts in (QUESTION_FTS, ANSWER_FTS):
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    return True
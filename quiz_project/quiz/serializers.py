@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Question, Answer, Score, QuizCategory
+from .hashing import text_hash
+from .models import Question, Answer, Score, QuizCategory, GenerationJob
 
 class QuizCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -22,9 +23,47 @@ class QuestionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Question
-        fields = '__all__'
+        exclude = ['content_hash']
+
+    def validate(self, attrs):
+        # Same normalized text in the same category = duplicate (unique content_hash index)
+        category = attrs.get('quiz_category', getattr(self.instance, 'quiz_category', None))
+        text = attrs.get('text', getattr(self.instance, 'text', None))
+        if category is not None and text:
+            duplicates = Question.objects.filter(quiz_category=category, content_hash=text_hash(text))
+            if self.instance is not None:
+                duplicates = duplicates.exclude(pk=self.instance.pk)
+            if duplicates.exists():
+                raise serializers.ValidationError({'text': 'A question with this text already exists in this category.'})
+        return attrs
 
 class ScoreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Score
         fields = '__all__'
+
+class ScoreBatchItemSerializer(serializers.ModelSerializer):
+    # Question ids are checked against a set preloaded once per batch
+    # (context['question_ids']) instead of one lookup per item.
+    question = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Score
+        fields = ['player_name', 'points', 'question']
+
+    def validate_question(self, value):
+        if value is not None and value not in self.context['question_ids']:
+            raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+        return value
+
+class GenerationJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GenerationJob
+        fields = [
+            'id', 'category', 'difficulty', 'num_questions', 'status', 'attempts',
+            'result', 'error', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = [
+            'status', 'attempts', 'result', 'error', 'created_at', 'started_at', 'finished_at',
+        ]
+        extra_kwargs = {'num_questions': {'min_value': 1, 'max_value': 50}}
@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import content_cache, rollups
+from .hashing import text_hash
+from .leaderboard import leaderboard
+from .models import Answer, Question, QuizCategory, Score
+from .sampler import question_index
+
+
+# 🎲 Keep the random-sampling index in sync with the Question table
+@receiver(post_save, sender=Question)
+def index_question(sender, instance, **kwargs):
+    question_index.add(instance.id, instance.quiz_category_id, instance.difficulty)
+
+
+@receiver(post_delete, sender=Question)
+def unindex_question(sender, instance, **kwargs):
+    question_index.remove(instance.id)
+
+
+# #️⃣ Keep Question.content_hash in sync (also for fixtures, which save raw)
+@receiver(pre_save, sender=Question)
+def hash_question(sender, instance, **kwargs):
+    instance.content_hash = text_hash(instance.text)
+
+
+# 🧮 Bump the content-cache generations on any quiz content change
+@receiver(post_init, sender=Question)
+def remember_question_category(sender, instance, **kwargs):
+    # A question moved to another category invalidates both categories, so
+    # remember the one it was loaded with (read from __dict__: a deferred
+    # field must not trigger a query).
+    instance._loaded_category_id = instance.__dict__.get("quiz_category_id")
+
+
+def _delete_state(origin):
+    """Per-delete memo, so a bulk or cascading delete bumps each category once."""
+    state = {"questions": set(), "categories": set()}
+    if isinstance(origin, QuerySet):
+        state = origin.__dict__.setdefault("_content_cache_state", state)
+    return state
+
+
+def _started_from(origin, *models):
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in models
+
+
+def _bump_once(state, *category_ids):
+    fresh = {category_id for category_id in category_ids if category_id not in state["categories"]}
+    if fresh:
+        state["categories"].update(fresh)
+        # After commit: a reader refilling the page before then would cache the old rows.
+        transaction.on_commit(lambda: content_cache.bump(*fresh))
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question(sender, instance, origin=None, **kwargs):
+    previous_category_id = getattr(instance, "_loaded_category_id", None)
+    instance._loaded_category_id = instance.quiz_category_id
+    if origin is not None and _started_from(origin, QuizCategory):
+        return  # the category's own signal bumps it
+    _bump_once(_delete_state(origin), instance.quiz_category_id, previous_category_id)
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def invalidate_answer(sender, instance, origin=None, **kwargs):
+    if origin is not None and _started_from(origin, Question, QuizCategory):
+        return  # deleted along with its question
+    state = _delete_state(origin)
+    if instance.question_id in state["questions"]:
+        return
+    state["questions"].add(instance.question_id)
+    if Answer.question.is_cached(instance):
+        category_id = instance.question.quiz_category_id
+    else:
+        category_id = Question.objects.filter(pk=instance.question_id).values_list("quiz_category_id", flat=True).first()
+    _bump_once(state, category_id)
+
+
+@receiver(post_save, sender=QuizCategory)
+@receiver(post_delete, sender=QuizCategory)
+def invalidate_category(sender, instance, **kwargs):
+    category_id = instance.id  # a delete clears it before the commit
+    transaction.on_commit(lambda: content_cache.bump(category_id))
+
+
+# 🏆 Keep the leaderboard and period rollups in sync with the Score table
+@receiver(post_save, sender=Score)
+def rank_score(sender, instance, created, **kwargs):
+    if created:
+        leaderboard.submit(instance.player_name, instance.points)
+        rollups.record_score(instance.player_name, instance.points, instance.date)
+    else:
+        leaderboard.refresh_player(instance.player_name)
+        rollups.refresh_player(instance.player_name, instance.date)
+
+
+@receiver(post_delete, sender=Score)
+def unrank_score(sender, instance, **kwargs):
+    leaderboard.refresh_player(instance.player_name)
+    rollups.refresh_player(instance.player_name, instance.date)
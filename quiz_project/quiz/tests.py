@@ -1,3 +1,1281 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import F, Max, Sum
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import ad, content_cache, dataset, generation_pipeline, jobs, quiz_session, rollups, rooms, score_export
+from . import answer_key as answer_key_module
+from .answer_key import UNKNOWN, AnswerKey, answer_key
+from .cache_backends import TwoTierCache
+from .cache_fill import aget_or_fill, get_or_fill
+from .generation_pipeline import FakeLLM
+from .hashing import text_hash
+from .leaderboard import Leaderboard, leaderboard
+from .models import Answer, GenerationJob, Question, QuizCategory, Score, ScoreRollup
+from .routing import websocket_urlpatterns
+from .question_bank import BANK_PATH, load_bank, read_bank
+from .question_ingest import ingest_questions
+from .sampler import question_index
+from .score_ingest import ScoreBuffer, drain_spool, save_scores
+
+
+def create_questions(count, answers_per_question=4):
+    category, _ = QuizCategory.objects.get_or_create(name="General Knowledge")
+    questions = Question.objects.bulk_create(
+        Question(quiz_category=category, text=f"Question {i}?", difficulty=Question.EASY)
+        for i in range(count)
+    )
+    Answer.objects.bulk_create(
+        Answer(question=question, text=f"Answer {j}", is_correct=j == 0)
+        for question in questions
+        for j in range(answers_per_question)
+    )
+    content_cache.bump(category.id)  # bulk_create skips the signals
+    return questions
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+async def read_stream(response):
+    return b"".join(await collect(response.streaming_content))
+
+
+# 🎲 In-memory question index
+class QuestionIndexTests(TestCase):
+    def setUp(self):
+        question_index.reset()
+        self.questions = create_questions(6)
+
+    def assertIndexMatchesDatabase(self):
+        expected = {}
+        for question_id, category_id, difficulty in Question.objects.values_list("id", "quiz_category_id", "difficulty"):
+            expected.setdefault((category_id, difficulty), set()).add(question_id)
+        buckets = {key: set(bucket) for key, bucket in question_index._buckets.items()}
+        self.assertEqual(buckets, expected)
+        for question_id, (key, position) in question_index._positions.items():
+            self.assertEqual(question_index._buckets[key][position], question_id)
+
+    def test_signals_keep_the_index_in_sync(self):
+        self.assertEqual(question_index.count(), 6)
+        moved, removed = self.questions[0], self.questions[3]
+        moved.difficulty = Question.HARD
+        moved.save()
+        removed.delete()
+        Question.objects.create(quiz_category=moved.quiz_category, text="New one?")
+        self.assertIndexMatchesDatabase()
+        self.assertEqual(question_index.count(difficulty=Question.HARD), 1)
+        self.assertEqual(set(question_index.sample_ids(10)), set(Question.objects.values_list("id", flat=True)))
+
+    def test_resaving_without_moving_keeps_the_position(self):
+        question_index.count()
+        question = self.questions[2]
+        before = question_index._positions[question.id]
+        question.text = "Edited?"
+        question.save()
+        self.assertEqual(question_index._positions[question.id], before)
+        self.assertIndexMatchesDatabase()
+
+
+# 🧮 Query-count regression tests: question endpoints must not issue N+1 queries
+class QuestionQueryCountTests(TestCase):
+    # Questions page + batched answers (+ pagination COUNT or sampler index build).
+    MAX_LIST_QUERIES = 3
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(username="player", password="secret")
+        self.client.force_authenticate(user)
+
+    def assertBoundedQueries(self, url, sizes=(3, 30)):
+        """``url`` must stay within MAX_LIST_QUERIES whatever the number of rows."""
+        counts = []
+        for size in sizes:
+            with self.captureOnCommitCallbacks(execute=True):
+                Question.objects.all().delete()
+                create_questions(size)
+            question_index.reset()
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(
+                len(context), self.MAX_LIST_QUERIES,
+                "\n".join(query["sql"] for query in context.captured_queries),
+            )
+            counts.append(len(context))
+        self.assertEqual(len(set(counts)), 1, f"{url} query count grew with size: {counts}")
+
+    def test_all_questions(self):
+        self.assertBoundedQueries(reverse("get-all-questions"))
+
+    def test_random_questions(self):
+        self.assertBoundedQueries(reverse("get-random-questions") + "?count=3")
+
+    def test_question_viewset_list(self):
+        self.assertBoundedQueries(reverse("question-list"))
+
+
+# 🃏 Per-player quiz sessions
+class QuizSessionTests(TestCase):
+    def setUp(self):
+        caches[settings.QUIZ_SESSION_CACHE].clear()
+        question_index.reset()
+        self.questions = create_questions(12)
+        self.client = APIClient()
+
+    def create(self, count=5):
+        response = self.client.post(reverse("create-quiz-session") + f"?count={count}")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["count"], count)
+        return response.data["session_id"]
+
+    def test_next_walks_the_deck_once(self):
+        session_id = self.create()
+        url = reverse("session-next-question", args=[session_id])
+        served = []
+        for position in range(1, 6):
+            response = self.client.get(url)
+            self.assertFalse(response.data["finished"])
+            self.assertEqual((response.data["position"], response.data["remaining"]), (position, 5 - position))
+            served.append(response.data["question"]["id"])
+        self.assertEqual(len(set(served)), 5)
+        self.assertEqual(self.client.get(url).data, {"finished": True, "remaining": 0})
+
+    def test_deleted_questions_are_skipped(self):
+        session_id = self.create(count=3)
+        deck = list(quiz_session.get_session(session_id).question_ids)
+        Question.objects.filter(id=deck[0]).delete()
+        response = self.client.get(reverse("session-next-question", args=[session_id]))
+        self.assertEqual((response.data["question"]["id"], response.data["position"]), (deck[1], 2))
+
+    def test_pages_do_not_move_the_cursor(self):
+        session_id = self.create(count=5)
+        deck = list(quiz_session.get_session(session_id).question_ids)
+        url = reverse("session-questions", args=[session_id])
+        first, second = self.client.get(url + "?page_size=3"), self.client.get(url + "?page=2&page_size=3")
+        self.assertEqual([q["id"] for q in first.data["results"] + second.data["results"]], deck)
+        self.assertEqual(quiz_session.get_session(session_id).cursor, 0)
+        self.assertEqual(self.client.get(url + "?page=0").status_code, 400)
+
+    def test_unknown_session_is_404(self):
+        self.assertEqual(self.client.get(reverse("session-next-question", args=["nope"])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("session-questions", args=["nope"])).status_code, 404)
+
+    def test_not_enough_questions_is_400(self):
+        self.assertEqual(self.client.post(reverse("create-quiz-session") + "?count=50").status_code, 400)
+
+    def test_concurrent_next_calls_serve_distinct_questions(self):
+        session = quiz_session.create_session(12)
+
+        def take(_):
+            # Each request loads its own copy of the session, as the view does.
+            return quiz_session.next_question(quiz_session.get_session(session.session_id))
+
+        with mock.patch.object(quiz_session, "fetch_questions", side_effect=lambda ids: [Question(id=i) for i in ids]):
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                served = list(pool.map(take, range(16)))
+        ids = [question.id for question in served if question is not None]
+        self.assertEqual(sorted(ids), sorted(session.question_ids))
+        self.assertEqual(served.count(None), 4)
+
+
+# 📄 questions/all/: keyset pagination and streamed JSON Lines export
+class AllQuestionsPaginationTests(TestCase):
+    def test_cursor_pages_cover_every_question_once(self):
+        create_questions(25)
+        url, seen = reverse("get-all-questions") + "?page_size=10", []
+        while url:
+            body = self.client.get(url).json()
+            seen.extend(question["id"] for question in body["results"])
+            url = body["next"]
+        self.assertEqual(seen, sorted(Question.objects.values_list("id", flat=True)))
+
+    def test_jsonl_export_streams_one_line_per_question(self):
+        create_questions(5, answers_per_question=2)
+        response = async_to_sync(self.async_client.get)(reverse("get-all-questions") + "?export=jsonl")
+        self.assertTrue(response.is_async)
+        with self.assertNumQueries(2):
+            lines = async_to_sync(read_stream)(response).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(len(json.loads(lines[0])["answers"]), 2)
+
+
+# 🏆 Materialized leaderboard
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        leaderboard.invalidate()
+
+    def test_ranking_tracks_best_score_per_player(self):
+        for player_name, points in [("ana", 50), ("bob", 80), ("cid", 65), ("ana", 90), ("dan", 10)]:
+            Score.objects.create(player_name=player_name, points=points)
+
+        ranking = self.client.get(reverse("get-ranking")).json()
+        self.assertEqual([row["player_name"] for row in ranking], ["ana", "bob", "cid", "dan"])
+
+        row = self.client.get(reverse("get-player-rank", args=["cid"]) + "?around=1").json()
+        self.assertEqual(row["rank"], 3)
+        self.assertEqual([neighbour["player_name"] for neighbour in row["around"]], ["bob", "cid", "dan"])
+
+        Score.objects.filter(player_name="ana", points=90).delete()
+        self.assertEqual(leaderboard.rank("ana"), {"rank": 3, "player_name": "ana", "points": 50})
+
+    def test_negative_around_is_rejected(self):
+        Score.objects.create(player_name="ana", points=50)
+        response = self.client.get(reverse("get-player-rank", args=["ana"]) + "?around=-1")
+        self.assertEqual(response.status_code, 400)
+
+    def test_changes_reach_other_workers_as_deltas(self):
+        other = Leaderboard()  # another worker's board
+        Score.objects.create(player_name="ana", points=50)
+        self.assertEqual(len(other), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Score.objects.create(player_name="bob", points=80)
+            Score.objects.bulk_create([Score(player_name="cid", points=20)])  # no signal: not published
+            Score.objects.filter(player_name="ana").delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(other.top(), [{"rank": 1, "player_name": "bob", "points": 80}])
+
+    def test_a_missing_delta_forces_a_rebuild_after_the_gap_timeout(self):
+        other = Leaderboard()
+        self.assertEqual(len(other), 0)
+        shared = caches["default"].l2
+        shared.add(Leaderboard.SEQUENCE_KEY, 0, timeout=None)
+        shared.incr(Leaderboard.SEQUENCE_KEY)  # numbered, never written
+        Score.objects.bulk_create([Score(player_name="bob", points=80)])
+        with self.assertNumQueries(0):
+            self.assertIsNone(other.rank("bob"))
+        with mock.patch.object(Leaderboard, "GAP_TIMEOUT", -1):
+            self.assertEqual(other.rank("bob"), {"rank": 1, "player_name": "bob", "points": 80})
+
+
+# 📅 Time-windowed rankings from score rollups
+class ScoreRollupTests(TestCase):
+    def test_window_ranking_and_backfill_agree(self):
+        for player_name, points in [("ana", 50), ("bob", 80), ("ana", 90)]:
+            Score.objects.create(player_name=player_name, points=points)
+
+        expected = [
+            {"rank": 1, "player_name": "ana", "points": 90},
+            {"rank": 2, "player_name": "bob", "points": 80},
+        ]
+        ranking = self.client.get(reverse("get-ranking") + "?window=week").json()
+        self.assertEqual(ranking, expected)
+        self.assertEqual(ScoreRollup.objects.get(period="day", player_name="ana").games, 2)
+
+        # A score from last year (backdated without signals) only lands in old buckets.
+        old = Score.objects.create(player_name="cid", points=999)
+        Score.objects.filter(pk=old.pk).update(date=timezone.now() - timedelta(days=400))
+        rollups.backfill()
+        self.assertEqual(self.client.get(reverse("get-ranking") + "?window=week").json(), expected)
+        self.assertEqual(ScoreRollup.objects.filter(player_name="cid").count(), 3)
+
+
+# 📥 Batch score submission
+class ScoreBatchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(username="server", password="secret")
+        self.client.force_authenticate(user)
+        leaderboard.invalidate()
+
+    def test_valid_items_are_saved_and_invalid_ones_reported(self):
+        question = create_questions(1)[0]
+        payload = [
+            {"player_name": "ana", "points": 70, "question": question.id},
+            {"player_name": "bob", "points": "many"},
+            {"player_name": "cid", "points": 40, "question": 999999},
+            {"player_name": "dan", "points": 55},
+            {"player_name": "eva", "points": 30, "question": str(question.id)},
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse("submit-scores-batch"), payload, format="json")
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()["created"], 3)
+        self.assertEqual([error["index"] for error in response.json()["errors"]], [1, 2])
+        self.assertEqual(Score.objects.filter(question=question).count(), 2)
+        self.assertEqual(len([q for q in context.captured_queries if q["sql"].startswith("INSERT INTO \"quiz_score\"")]), 1)
+        self.assertEqual([row["player_name"] for row in leaderboard.top()], ["ana", "dan", "eva"])
+        self.assertEqual(rollups.top("day")[0]["player_name"], "ana")
+
+
+# ⏳ Write-behind score buffer
+class ScoreBufferTests(TestCase):
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir)
+
+    def journals(self):
+        return [name for name in os.listdir(self.spool_dir) if name.endswith(".jsonl")]
+
+    def test_flush_writes_pending_scores_and_clears_the_journal(self):
+        buffer = ScoreBuffer(spool_dir=self.spool_dir, autostart=False)
+        buffer.add([Score(player_name="ana", points=10), Score(player_name="bob", points=20)])
+        self.assertEqual(Score.objects.count(), 0)
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(Score.objects.count(), 2)
+        self.assertEqual(self.journals(), [])
+
+    def test_drain_recovers_journal_of_a_dead_process(self):
+        with open(os.path.join(self.spool_dir, "scores-999999999-1.jsonl"), "w") as journal:
+            journal.write(json.dumps({"player_name": "ana", "points": 10, "question_id": None}) + "\n")
+        self.assertEqual(drain_spool(self.spool_dir), (1, 1))
+        self.assertEqual(Score.objects.get().player_name, "ana")
+
+    def test_journals_of_the_running_process_are_left_alone(self):
+        buffer = ScoreBuffer(spool_dir=self.spool_dir, autostart=False)
+        buffer.add([Score(player_name="ana", points=10)])
+        self.assertEqual(drain_spool(self.spool_dir), (0, 0))
+        self.assertEqual(len(self.journals()), 1)
+
+    def test_a_reused_pid_does_not_keep_a_crashed_journal_alive(self):
+        # Same PID as this (live) process, but another owner token and no lock holder.
+        name = f"scores-{os.getpid()}-0123456789ab-1.jsonl"
+        for suffix in (name, f"scores-{os.getpid()}-0123456789ab.lock"):
+            open(os.path.join(self.spool_dir, suffix), "w").close()
+        with open(os.path.join(self.spool_dir, name), "w") as journal:
+            journal.write(json.dumps({"player_name": "ana", "points": 10, "question_id": None}) + "\n")
+        buffer = ScoreBuffer(spool_dir=self.spool_dir, autostart=False)
+        buffer.add([Score(player_name="bob", points=20)])
+        self.assertEqual(drain_spool(self.spool_dir), (1, 1))
+        self.assertEqual(Score.objects.get().player_name, "ana")
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(self.journals(), [])
+
+    def test_scores_keep_the_time_they_were_accepted(self):
+        buffer = ScoreBuffer(spool_dir=self.spool_dir, autostart=False)
+        accepted = timezone.now() - timedelta(hours=1)
+        buffer.add([Score(player_name="ana", points=10, date=accepted)])
+        # Replay the journal as if the worker had crashed before flushing.
+        os.rename(
+            os.path.join(self.spool_dir, self.journals()[0]),
+            os.path.join(self.spool_dir, "scores-999999999-1.jsonl"),
+        )
+        self.assertEqual(drain_spool(self.spool_dir), (1, 1))
+        self.assertEqual(Score.objects.get().date, accepted)
+
+    def test_a_rejected_row_does_not_block_the_batch(self):
+        buffer = ScoreBuffer(spool_dir=self.spool_dir, autostart=False)
+        buffer.add([Score(player_name="ana", points=10), Score(player_name=None, points=5), Score(player_name="bob", points=20)])
+        with self.assertLogs("quiz.score_ingest", "ERROR"):
+            self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(sorted(Score.objects.values_list("player_name", flat=True)), ["ana", "bob"])
+        self.assertEqual(self.journals(), [])
+
+
+# 🗂️ EXPLAIN harness: hot queries must be served by an index, not a full scan
+@skipUnless(connection.vendor == "sqlite", "Plan assertions are written against SQLite's EXPLAIN QUERY PLAN.")
+class HotQueryIndexTests(TestCase):
+    def assertUsesIndex(self, queryset, table):
+        plan = queryset.explain()
+        steps = [line for line in plan.splitlines() if f" {table}" in line]
+        self.assertTrue(steps, plan)
+        for step in steps:
+            self.assertRegex(step, r"USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY", plan)
+        self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_question_by_category_and_difficulty(self):
+        self.assertUsesIndex(
+            Question.objects.filter(quiz_category_id=1, difficulty=Question.HARD).values_list("id"), "quiz_question",
+        )
+
+    def test_question_duplicate_check(self):
+        self.assertUsesIndex(
+            Question.objects.filter(quiz_category_id__in=[1, 2], content_hash__in=["a", "b"]).values_list("content_hash"),
+            "quiz_question",
+        )
+
+    def test_score_top_points(self):
+        self.assertUsesIndex(Score.objects.order_by("-points")[:10], "quiz_score")
+
+    def test_score_latest(self):
+        self.assertUsesIndex(Score.objects.order_by("-date")[:10], "quiz_score")
+
+    def test_score_by_player(self):
+        self.assertUsesIndex(Score.objects.filter(player_name="ana").order_by("-points")[:1], "quiz_score")
+
+    def test_score_by_player_and_date_range(self):
+        now = timezone.now()
+        self.assertUsesIndex(
+            Score.objects.filter(player_name="ana", date__gte=now - timedelta(days=7), date__lt=now), "quiz_score",
+        )
+
+    def test_rollup_window_ranking(self):
+        self.assertUsesIndex(
+            ScoreRollup.objects.filter(period="week", bucket=timezone.now().date()).order_by("-best_points", "player_name")[:10],
+            "quiz_scorerollup",
+        )
+
+
+# 🔎 Full-text search over questions and answers
+@skipUnless(connection.vendor == "sqlite", "Search is backed by SQLite FTS5.")
+class QuestionSearchTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = QuizCategory.objects.create(name="Science")
+            self.water = Question.objects.create(quiz_category=category, text="What is the chemical symbol for water?")
+            self.planet = Question.objects.create(quiz_category=category, text="Which planet is known as the Red Planet?")
+            Answer.objects.create(question=self.planet, text="Mars", is_correct=True)
+            Answer.objects.create(question=self.water, text="H2O", is_correct=True)
+
+    def search(self, q):
+        response = self.client.get(reverse("search-questions"), {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [question["id"] for question in response.json()["results"]]
+
+    def test_matches_question_and_answer_text(self):
+        self.assertEqual(self.search("chemic"), [self.water.id])
+        self.assertEqual(self.search("mars"), [self.planet.id])
+        self.assertEqual(self.search('red "planet'), [self.planet.id])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.water.text = "Which gas do plants absorb?"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.water.save()
+        self.assertEqual(self.search("water"), [])
+        self.assertEqual(self.search("plants"), [self.water.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.planet.delete()
+        self.assertEqual(self.search("mars"), [])
+
+
+# 🧮 Generation-counter invalidation of cached quiz content
+class ContentCacheTests(TestCase):
+    def test_any_content_change_invalidates_cached_pages(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = QuizCategory.objects.create(name="History")
+            question = Question.objects.create(quiz_category=category, text="Who built the pyramids?")
+            answer = Answer.objects.create(question=question, text="Egyptians", is_correct=True)
+        url = reverse("get-all-questions")
+
+        def answers():
+            return [a["text"] for a in self.client.get(url).json()["results"][0]["answers"]]
+
+        self.assertEqual(answers(), ["Egyptians"])
+        before = content_cache.generation(category.id)
+        answer.text = "Ancient Egyptians"
+        with self.captureOnCommitCallbacks(execute=True):
+            answer.save()
+            self.assertEqual(content_cache.generation(category.id), before)
+        self.assertGreater(content_cache.generation(category.id), before)
+        self.assertEqual(answers(), ["Ancient Egyptians"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Answer.objects.filter(pk=answer.pk).delete()
+        self.assertEqual(answers(), [])
+
+    def test_saving_a_loaded_question_does_not_read_it_back(self):
+        first, second = QuizCategory.objects.create(name="History"), QuizCategory.objects.create(name="Science")
+        Question.objects.create(quiz_category=first, text="Who built the pyramids?")
+        question = Question.objects.get()
+        before = content_cache.generations([first.id, second.id])
+        question.quiz_category = second
+        with CaptureQueriesContext(connection) as context, self.captureOnCommitCallbacks(execute=True):
+            question.save()
+        self.assertFalse([q["sql"] for q in context.captured_queries if q["sql"].startswith("SELECT")])
+        after = content_cache.generations([first.id, second.id])
+        self.assertTrue(all(after[category_id] > before[category_id] for category_id in after))
+
+    def test_deletes_bump_each_category_once(self):
+        questions = create_questions(3)
+        with mock.patch.object(content_cache, "bump", wraps=content_cache.bump) as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                questions[0].delete()  # cascades to its 4 answers
+            self.assertEqual(bump.call_count, 1)
+            bump.reset_mock()
+            with CaptureQueriesContext(connection) as context, self.captureOnCommitCallbacks(execute=True):
+                Answer.objects.filter(question__in=questions[1:]).delete()
+            self.assertEqual(bump.call_count, 1)
+        lookups = [q for q in context.captured_queries if 'SELECT "quiz_question"."quiz_category_id"' in q["sql"]]
+        self.assertEqual(len(lookups), 2)
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "quiz.example.com"])
+    def test_cached_pages_are_keyed_on_the_page_not_the_url(self):
+        create_questions(5)
+        url = reverse("get-all-questions") + "?page_size=2"
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            body = self.client.get(url + "&utm=x", HTTP_HOST="quiz.example.com").json()
+        self.assertEqual(len(context), 0)
+        self.assertTrue(body["next"].startswith("http://quiz.example.com/"))
+        self.assertIn("utm=x", body["next"])
+        self.assertEqual(len(self.client.get(body["next"]).json()["results"]), 2)
+
+
+# 🗄️ Two-tier cache backend
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+    "l2": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "two-tier-l2"},
+})
+class TwoTierCacheTests(TestCase):
+    def setUp(self):
+        caches["l2"].clear()
+
+    def make_tier(self):
+        return TwoTierCache("", {"OPTIONS": {"L2": "l2", "L1_MAX_ENTRIES": 2, "L1_CHECK_INTERVAL": 0}})
+
+    def test_reads_are_served_from_l1_and_counted(self):
+        tier = self.make_tier()
+        tier.set("a", {"x": 1})
+        self.assertEqual(tier.get("a"), {"x": 1})
+        self.assertIsNone(tier.get("missing"))
+        self.assertEqual(tier.stats()["l1_hits"], 1)
+        self.assertEqual(tier.stats()["l2_misses"], 1)
+
+    def test_lru_bound_and_cross_process_invalidation(self):
+        writer, reader = self.make_tier(), self.make_tier()
+        writer.set("a", 1)
+        self.assertEqual(reader.get("a"), 1)
+        reader.get("b"), reader.get("c")
+        writer.set("b", 2)
+        writer.set("c", 3)
+        self.assertLessEqual(writer.stats()["l1_entries"], 2)
+
+        writer.incr("a")
+        self.assertEqual(reader.get("a"), 2)
+        writer.delete("a")
+        self.assertIsNone(reader.get("a"))
+
+    async def test_async_l1_hits_do_not_touch_l2(self):
+        tier = TwoTierCache("", {"OPTIONS": {"L2": "l2", "L1_CHECK_INTERVAL": 60}})
+        await tier.aset("a", [1, 2])
+        await tier.aget("a")  # first read checks the epoch in L2
+        with mock.patch.object(LocMemCache, "get", side_effect=AssertionError("L2 read")):
+            self.assertEqual(await tier.aget("a"), [1, 2])
+
+
+# 🚦 Single-flight cache fills
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        # The configured cache: a TwoTierCache whose shared tier holds the lock.
+        self.cache = caches["default"]
+        self.key = f"single-flight-test:{time.time_ns()}"
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "fresh"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: get_or_fill(self.key, compute, timeout=60, cache=self.cache), range(8)))
+        self.assertEqual(results, ["fresh"] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_expired_value_is_served_stale_while_one_caller_refreshes(self):
+        get_or_fill(self.key, lambda: "old", timeout=60, cache=self.cache)
+        # Expire it logically and hold the fill lock, as if another caller were refreshing.
+        _, value, _, delta = self.cache.get(self.key)
+        self.cache.set(self.key, ("__single_flight__", value, time.time() - 1, delta), timeout=60)
+        self.cache.l2.add(f"{self.key}:fill-lock", 1, timeout=60)
+        self.assertEqual(get_or_fill(self.key, lambda: "new", timeout=60, cache=self.cache), "old")
+
+    def test_a_non_atomic_lock_cache_is_refused(self):
+        with tempfile.TemporaryDirectory() as location:
+            with self.assertRaises(ImproperlyConfigured):
+                get_or_fill(self.key, lambda: "value", timeout=60, cache=FileBasedCache(location, {}))
+
+    def test_early_refresh_before_expiry(self):
+        get_or_fill(self.key, lambda: time.sleep(0.01) or "old", timeout=60, cache=self.cache)
+        self.assertEqual(get_or_fill(self.key, lambda: "new", timeout=60, cache=self.cache, beta=1e9), "new")
+
+    async def test_async_fills_share_entries_and_compute_once(self):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "fresh"
+
+        results = await asyncio.gather(*(aget_or_fill(self.key, compute, timeout=60, cache=self.cache) for _ in range(8)))
+        self.assertEqual(results, ["fresh"] * 8)
+        self.assertEqual(len(calls), 1)
+        # Same envelope as the sync fills: either side reads what the other wrote.
+        self.assertEqual(await sync_to_async(get_or_fill)(self.key, lambda: "sync", timeout=60, cache=self.cache), "fresh")
+
+
+# 🤖 Database-backed OpenAI generation jobs
+class GenerationJobTests(TestCase):
+    GENERATED = [{
+        "question": "What is the capital of France?",
+        "answers": [{"text": "Paris", "is_correct": True}, {"text": "Rome", "is_correct": False}],
+        "difficulty": "easy",
+        "category": "Geography",
+    }]
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(username="editor", password="secret")
+        self.client.force_authenticate(user)
+
+    def test_enqueue_then_worker_runs_job(self):
+        response = self.client.post(reverse("enqueue-generation"), {"category": "Geography", "num_questions": 1}, format="json")
+        self.assertEqual(response.status_code, 202)
+        job_url = reverse("generation-job", args=[response.json()["job_id"]])
+        self.assertEqual(self.client.get(job_url).json()["status"], GenerationJob.PENDING)
+
+        with mock.patch.object(jobs, "make_client", return_value=FakeLLM(latency=0, seed=1)):
+            self.assertEqual(jobs.work(once=True), 1)
+
+        job = self.client.get(job_url).json()
+        self.assertEqual(job["status"], GenerationJob.DONE)
+        self.assertEqual(job["result"], {"generated": 1, "saved": 1})
+        self.assertTrue(Question.objects.filter(quiz_category__name="Geography").exists())
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job = jobs.enqueue("Geography", "easy", 1)
+        with mock.patch.object(jobs, "generate", return_value=[]), self.assertLogs("quiz.jobs", "ERROR"):
+            self.assertEqual(jobs.work(once=True), jobs.MAX_ATTEMPTS)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.FAILED)
+        self.assertEqual(job.attempts, jobs.MAX_ATTEMPTS)
+
+    def test_worker_that_lost_its_lease_does_not_record_the_result(self):
+        jobs.enqueue("Geography", "easy", 1)
+        job = jobs.claim_next()
+        # The lease expired and another worker reclaimed the job.
+        GenerationJob.objects.filter(id=job.id).update(attempts=F("attempts") + 1)
+        with mock.patch.object(jobs, "generate", return_value=self.GENERATED), self.assertLogs("quiz.jobs", "WARNING"):
+            self.assertFalse(jobs.run_job(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.RUNNING)
+        self.assertFalse(Question.objects.exists())
+
+
+# ⚡ Concurrent question generation pipeline
+class GenerationPipelineTests(SimpleTestCase):
+    def test_batches_run_concurrently_and_cover_every_category(self):
+        client = FakeLLM(latency=0.01, seed=1)
+        questions = generation_pipeline.generate(["Science", "History"], 25, client, batch_size=10, concurrency=4)
+        self.assertEqual(client.calls, 6)
+        self.assertEqual(client.max_in_flight, 4)
+        self.assertEqual(len(questions), 50)
+        self.assertEqual(sum(q["category"] == "Science" for q in questions), 25)
+
+    def test_failed_calls_are_retried(self):
+        client = FakeLLM(latency=0, failure_rate=0.5, seed=3)
+        with self.assertLogs("quiz.generation_pipeline", "WARNING"):
+            questions = generation_pipeline.generate(["Science"], 40, client, batch_size=5, max_retries=10, backoff=0.001)
+        self.assertEqual(len(questions), 40)
+        self.assertGreater(client.calls, 8)
+
+    def test_exhausted_batches_are_logged_and_dropped(self):
+        client = FakeLLM(latency=0, failure_rate=1.0, seed=3)
+        with self.assertLogs("quiz.generation_pipeline", "ERROR") as logs:
+            questions = generation_pipeline.generate(["Science"], 5, client, batch_size=5, max_retries=1, backoff=0)
+        self.assertEqual(questions, [])
+        self.assertIn("dropped after 2 attempts", logs.output[-1])
+
+    def test_token_bucket_waits_for_refill(self):
+        class FakeClock:
+            now = 0.0
+
+            def monotonic(self):
+                return self.now
+
+            async def sleep(self, seconds):
+                self.now += seconds
+
+        clock = FakeClock()
+        bucket = generation_pipeline.TokenBucket(per_minute=600, clock=clock.monotonic, sleep=clock.sleep)  # 10 tokens/s
+        asyncio.run(bucket.acquire(600))
+        self.assertEqual(clock.now, 0)
+        asyncio.run(bucket.acquire(2))
+        self.assertAlmostEqual(clock.now, 0.2)
+
+    def test_openai_client_uses_the_v1_api(self):
+        client = generation_pipeline.OpenAIClient(api_key="test")
+        response = mock.Mock(choices=[mock.Mock(message=mock.Mock(content="[]"))], usage=mock.Mock(total_tokens=42))
+        batch = generation_pipeline.plan_batches(["Science"], 1)[0]
+        with mock.patch.object(client.client.chat.completions, "create", mock.AsyncMock(return_value=response)) as create:
+            self.assertEqual(asyncio.run(client.complete(batch)), ("[]", 42))
+        self.assertEqual(create.call_args.kwargs["max_tokens"], batch.max_tokens)
+
+
+# 📥 Bulk question ingestion
+class QuestionIngestTests(TestCase):
+    def item(self, text, category="Science", **extra):
+        answers = [{"text": "Yes", "is_correct": True}, {"text": "No", "is_correct": False}]
+        return {"question": text, "answers": answers, "difficulty": "easy", "category": category, **extra}
+
+    def test_report_and_constant_query_count(self):
+        QuizCategory.objects.create(name="Science")
+        items = [self.item(f"Question {i}?", category=("Science", "History")[i % 2]) for i in range(300)]
+        with CaptureQueriesContext(connection) as queries:
+            report = ingest_questions(items)
+        self.assertEqual(report["inserted"], 300)
+        self.assertLess(len(queries), 15)
+        self.assertEqual(Answer.objects.count(), 600)
+        self.assertEqual(Question.objects.filter(quiz_category__name="History").count(), 150)
+
+    def test_duplicates_and_invalid_items_are_reported(self):
+        ingest_questions([self.item("Stored?")])
+        report = ingest_questions([
+            self.item("Stored?"),
+            self.item("New?"),
+            self.item("New?"),
+            self.item("", ),
+            self.item("Bad difficulty?", difficulty="extreme"),
+            {"question": "No correct answer?", "answers": [{"text": "A", "is_correct": False}]},
+            self.item("Blank category?", category="   "),
+            self.item("Unhashable difficulty?", difficulty=["easy"]),
+        ])
+        self.assertEqual(report["inserted"], 1)
+        self.assertEqual([s["index"] for s in report["skipped"]], [0, 2])
+        self.assertEqual([i["index"] for i in report["invalid"]], [3, 4, 5, 6, 7])
+        self.assertIn("difficulty", report["invalid"][1]["errors"])
+        self.assertIn("category", report["invalid"][3]["errors"])
+        self.assertIn("difficulty", report["invalid"][4]["errors"])
+
+    def test_ingested_questions_are_sampled_and_invalidate_caches(self):
+        before = content_cache.generation()
+        question_index.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            ingest_questions([self.item(f"Sampled {i}?") for i in range(5)])
+        self.assertNotEqual(content_cache.generation(), before)
+        with self.assertNumQueries(0):  # added in place, not rebuilt
+            self.assertEqual(question_index.count(), 5)
+
+
+# 🧪 Synthetic datasets
+class DatasetTests(TestCase):
+    def test_same_seed_gives_same_rows(self):
+        self.assertEqual(dataset.question_chunk((7, 3, 300, 20, 10, 4)), dataset.question_chunk((7, 3, 300, 20, 10, 4)))
+        self.assertNotEqual(dataset.question_chunk((7, 3, 300, 20, 10, 4)), dataset.question_chunk((8, 3, 300, 20, 10, 4)))
+
+    def test_generate_inserts_and_updates_derived_state(self):
+        question_index.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            dataset.generate(seed=1, questions=120, categories=5, scores=400, players=30, days=10, chunk_size=50, log=lambda message: None)
+        self.assertEqual(Question.objects.count(), 120)
+        self.assertEqual(Answer.objects.count(), 480)
+        self.assertEqual(Answer.objects.filter(is_correct=True).count(), 120)
+        self.assertEqual(QuizCategory.objects.count(), 5)
+        self.assertEqual(Score.objects.count(), 400)
+        self.assertGreaterEqual(Score.objects.order_by("date").first().date, timezone.now() - timedelta(days=10))
+        with self.assertNumQueries(0):
+            self.assertEqual(question_index.count(), 120)
+        self.assertEqual(ScoreRollup.objects.filter(period=ScoreRollup.MONTH).aggregate(n=Sum("games"))["n"], 400)
+        self.assertEqual(leaderboard.top(1)[0]["points"], Score.objects.aggregate(m=Max("points"))["m"])
+
+
+# 📚 Curated question bank
+class QuestionBankTests(TestCase):
+    BANK = {
+        "Science": [
+            ("What is the chemical symbol for water?", [("H2O", True), ("O2", False)]),
+            ("What   is the chemical symbol for WATER?", [("H2O", True), ("O2", False)]),
+            ("No answers?", []),
+        ],
+        "Art": [("Who painted the Mona Lisa?", [("Leonardo da Vinci", True), ("Pablo Picasso", False)])],
+    }
+
+    def test_reload_is_a_no_op_and_changed_answers_are_replaced(self):
+        report = load_bank(self.BANK)
+        self.assertEqual((report["inserted"], report["duplicate"], len(report["invalid"])), (2, 1, 1))
+
+        with CaptureQueriesContext(connection) as queries:
+            report = load_bank(self.BANK)
+        self.assertEqual((report["inserted"], report["updated"], report["unchanged"]), (0, 0, 2))
+        self.assertFalse([q for q in queries.captured_queries if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))])
+
+        changed = {"Art": [(" who painted the mona lisa? ", [("Leonardo da Vinci", True), ("Raphael", False)])]}
+        self.assertEqual(load_bank(changed)["updated"], 1)
+        self.assertEqual(Question.objects.count(), 2)
+        self.assertEqual(
+            sorted(Answer.objects.filter(question__quiz_category__name="Art").values_list("text", flat=True)),
+            ["Leonardo da Vinci", "Raphael"],
+        )
+
+    def test_shipped_bank_is_lazy_and_readable_from_python_files(self):
+        self.assertEqual(read_bank(BANK_PATH).keys(), ad.category_questions_data.keys())
+        with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+            f.write(f"category_questions_data = {self.BANK!r}\n")
+        self.addCleanup(os.remove, f.name)
+        self.assertEqual(read_bank(f.name), self.BANK)
+
+
+# 📤 Streaming score export from the admin
+class ScoreExportTests(TestCase):
+    def setUp(self):
+        admin_user = get_user_model().objects.create_superuser(username="admin", password="secret", email="a@example.com")
+        self.client.force_login(admin_user)
+        self.async_client.force_login(admin_user)
+        question = create_questions(1)[0]
+        for i in range(25):
+            Score.objects.create(player_name=f"player{i}", points=i, question=question if i % 2 else None)
+        old = Score.objects.create(player_name="old", points=99)
+        Score.objects.filter(id=old.id).update(date=timezone.now() - timedelta(days=30))
+        self.question = question
+
+    def export(self, **params):
+        # Through the ASGI handler, where a sync iterator would be collected whole.
+        response = async_to_sync(self.async_client.get)(reverse("admin:score_export_csv"), params)
+        with CaptureQueriesContext(connection) as queries:
+            body = async_to_sync(read_stream)(response).decode()
+        return response, body, len(queries)
+
+    def test_csv_streams_all_scores_with_question_in_one_query(self):
+        response, body, queries = self.export()
+        self.assertTrue(response.streaming)
+        self.assertTrue(response.is_async)
+        lines = body.strip().splitlines()
+        self.assertEqual(lines[0], "Jugador,Puntos,Fecha,Pregunta")
+        self.assertEqual(len(lines), 27)
+        self.assertIn("player1,1,", body)
+        self.assertTrue(lines[2].endswith(self.question.text))
+        self.assertEqual(queries, 1)
+        self.assertEqual(len(async_to_sync(collect)(score_export.iter_csv(Score.objects.all(), chunk_size=4))), 7)
+
+    def test_jsonl_with_date_range(self):
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        response, body, _ = self.export(format="jsonl", since=since)
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 25)
+        self.assertNotIn("old", {row["player_name"] for row in rows})
+        self.assertEqual(self.client.get(reverse("admin:score_export_csv"), {"until": "yesterday"}).status_code, 400)
+
+    async def test_admin_action_streams_selected_scores(self):
+        selected = [score.id async for score in Score.objects.filter(points__lt=3)]
+        response = await self.async_client.post(reverse("admin:quiz_score_changelist"), {
+            "action": "export_scores_to_jsonl", "_selected_action": selected,
+        })
+        self.assertEqual(len((await read_stream(response)).splitlines()), 3)
+
+
+# #️⃣ Content-hash deduplication
+class ContentHashTests(TestCase):
+    def setUp(self):
+        self.category = QuizCategory.objects.create(name="Science")
+
+    def test_save_sets_normalized_hash_and_index_rejects_variants(self):
+        question = Question.objects.create(quiz_category=self.category, text="What is H2O?")
+        self.assertEqual(question.content_hash, text_hash("  what IS   h2o? "))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Question.objects.create(quiz_category=self.category, text="WHAT is h2o?")
+        other = QuizCategory.objects.create(name="Chemistry")
+        Question.objects.create(quiz_category=other, text="What is H2O?")
+
+    def test_ingest_skips_case_and_whitespace_variants(self):
+        Question.objects.create(quiz_category=self.category, text="What is H2O?")
+        answers = [{"text": "Water", "is_correct": True}]
+        report = ingest_questions([
+            {"question": "what is  h2o?", "category": "Science", "answers": answers},
+            {"question": "What is NaCl?", "category": "Science", "answers": answers},
+            {"question": "WHAT IS NACL?", "category": "Science", "answers": answers},
+        ])
+        self.assertEqual((report["inserted"], len(report["skipped"])), (1, 2))
+
+    def test_api_and_admin_report_duplicates(self):
+        Question.objects.create(quiz_category=self.category, text="What is H2O?")
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username="editor", password="secret"))
+        response = client.post(reverse("add-question"), {"quiz_category": self.category.id, "text": "what is h2o?"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("text", response.json())
+        with self.assertRaises(ValidationError):
+            Question(quiz_category=self.category, text=" WHAT IS H2O? ").full_clean()
+
+
+# ⏱️ Per-room WebSocket timers
+async def receive_event(communicator, timeout=1):
+    """Next message for ``communicator``, skipping presence updates."""
+    while True:
+        message = await communicator.receive_json_from(timeout=timeout)
+        if message.get("event") != rooms.PRESENCE:
+            return message
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    QUIZ_ROOM_CACHE="rooms",
+    CACHES={**settings.CACHES, "rooms": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "rooms"}},
+)
+class RoomTimerTests(SimpleTestCase):
+    def setUp(self):
+        caches["rooms"].clear()
+
+    async def connect(self, room):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/quiz/timer/{room}/")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_one_deadline_broadcast_per_transition_and_rooms_are_isolated(self):
+        first, second, other = await self.connect("a"), await self.connect("a"), await self.connect("b")
+        await first.send_json_to({"action": "start_timer", "duration": 1})
+        await first.send_json_to({"action": "start_timer", "duration": 1})  # already running: no new loop
+
+        started = await receive_event(second)
+        self.assertEqual(started["event"], "started")
+        self.assertAlmostEqual(started["deadline"] - started["server_time"], 1, delta=0.2)
+        # The second start only gets a state reply to the sender.
+        replies = {(await receive_event(first))["event"] for _ in range(2)}
+        self.assertEqual(replies, {"started", "state"})
+
+        self.assertEqual((await receive_event(second, timeout=3))["event"], "ended")
+        self.assertEqual((await receive_event(first, timeout=3))["event"], "ended")
+        self.assertTrue(await second.receive_nothing(timeout=0.3))
+        self.assertEqual(await other.receive_json_from(), {"event": rooms.PRESENCE, "players": 1})
+        self.assertTrue(await other.receive_nothing(timeout=0.1))
+        for communicator in (first, second, other):
+            await communicator.disconnect()
+
+    async def test_pause_resume_and_late_joiner(self):
+        host = await self.connect("pausable")
+        await host.send_json_to({"action": "start_timer", "duration": 60})
+        await receive_event(host)
+        await host.send_json_to({"action": "pause_timer"})
+        paused = await receive_event(host)
+        self.assertEqual((paused["event"], paused["status"]), ("paused", rooms.PAUSED))
+
+        late = await self.connect("pausable")
+        state = await receive_event(late)
+        self.assertEqual(state["event"], "state")
+        self.assertAlmostEqual(state["remaining"], paused["remaining"], delta=0.01)
+
+        await host.send_json_to({"action": "resume_timer"})
+        resumed = await receive_event(late)
+        self.assertAlmostEqual(resumed["deadline"] - resumed["server_time"], paused["remaining"], delta=0.2)
+        await host.send_json_to({"action": "stop_timer"})
+        self.assertEqual((await receive_event(late))["event"], "ended")
+        await host.disconnect()
+        await late.disconnect()
+
+    async def test_events_within_the_window_share_one_group_message(self):
+        layer = mock.Mock(group_send=mock.AsyncMock())
+        rooms.broadcast("burst", layer, rooms.PRESENCE, {"players": 1})
+        rooms.broadcast("burst", layer, "started", {"status": rooms.RUNNING})
+        rooms.broadcast("burst", layer, rooms.PRESENCE, {"players": 2})
+        await asyncio.sleep(0.1)
+        layer.group_send.assert_awaited_once_with(rooms.group_name("burst"), {"type": "room_events", "events": [
+            ["started", {"status": rooms.RUNNING}], [rooms.PRESENCE, {"players": 2}],
+        ]})
+
+        rooms.broadcast("burst", layer, "paused", {"status": rooms.PAUSED})
+        await asyncio.sleep(0.1)
+        self.assertEqual(layer.group_send.await_count, 2)
+
+    async def test_presence_counts_connected_players(self):
+        sockets = [await self.connect("crowd") for _ in range(3)]
+        for communicator in sockets:
+            # Joins are coalesced: everyone ends up with the final count.
+            while (message := await communicator.receive_json_from())["players"] != 3:
+                self.assertEqual(message["event"], rooms.PRESENCE)
+        await sockets[0].disconnect()
+        for communicator in sockets[1:]:
+            self.assertEqual(await communicator.receive_json_from(), {"event": rooms.PRESENCE, "players": 2})
+        self.assertEqual(await rooms.presence("crowd"), 2)
+        for communicator in sockets[1:]:
+            await communicator.disconnect()
+        self.assertEqual(await rooms.presence("crowd"), 0)
+
+    async def test_presence_of_a_crashed_worker_expires(self):
+        await rooms.register_process("crowd", "crashed-worker")
+        await rooms.publish_presence("crowd", "crashed-worker", 4, timeout=0.2)
+        communicator = await self.connect("crowd")
+        self.assertEqual((await communicator.receive_json_from())["players"], 5)
+        await asyncio.sleep(0.3)
+        self.assertEqual(await rooms.presence("crowd"), 1)
+        await communicator.disconnect()
+
+    async def test_slots_of_stopped_processes_are_reused(self):
+        self.assertEqual(await rooms.register_process("crowd", "crashed-worker", timeout=0.2), 1)
+        self.assertEqual(await rooms.register_process("crowd", "live-worker", timeout=0.2), 2)
+        await asyncio.sleep(0.15)
+        # A heartbeat keeps the slot, so it outlives its first timeout.
+        self.assertEqual(await rooms.register_process("crowd", "live-worker", timeout=0.2), 2)
+        await asyncio.sleep(0.1)
+        self.assertEqual(await rooms.register_process("crowd", "new-worker"), 1)
+        self.assertEqual(await rooms.register_process("crowd", "live-worker"), 2)
+        self.assertEqual(await caches["rooms"].aget(rooms._presence_key("crowd", "slots")), 2)
+
+    async def test_failed_broadcasts_are_logged(self):
+        layer = mock.Mock(group_send=mock.AsyncMock(side_effect=RuntimeError("layer down")))
+        with self.assertLogs("quiz.rooms", "ERROR"):
+            rooms.broadcast("down", layer, "started", {"status": rooms.RUNNING})
+            await asyncio.sleep(0.1)
+
+
+# 🧾 Answers over the room WebSocket
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    QUIZ_ROOM_CACHE="rooms",
+    CACHES={**settings.CACHES, "rooms": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "rooms"}},
+)
+class RoomAnswerTests(TransactionTestCase):
+    def setUp(self):
+        caches["rooms"].clear()
+        category = QuizCategory.objects.create(name="Química")
+        self.question = Question.objects.create(quiz_category=category, text="¿Fórmula del agua?")
+        self.right = Answer.objects.create(question=self.question, text="H2O", is_correct=True)
+        self.wrong = Answer.objects.create(question=self.question, text="CO2", is_correct=False)
+        answer_key.refresh()
+
+    def test_grading_is_an_in_memory_lookup(self):
+        key = AnswerKey()
+        key.refresh()
+        with self.assertNumQueries(0):
+            self.assertIs(key.grade(self.question.id, self.right.id), True)
+            self.assertIs(key.grade(self.question.id, self.wrong.id), False)
+            self.assertIsNone(key.grade(self.question.id + 1000, self.right.id))
+
+        # A content change (signals bump the generation) is picked up on the next refresh.
+        other = Answer.objects.create(question=self.question, text="HOH", is_correct=True)
+        key.refresh()
+        self.assertIs(key.grade(self.question.id, other.id), True)
+        self.assertIs(key.grade(self.question.id, self.right.id), True)
+
+    async def connect(self, user=None, path="/ws/quiz/timer/answers/", application=None):
+        communicator = WebsocketCommunicator(application or URLRouter(websocket_urlpatterns), path)
+        if user is not None:
+            communicator.scope["user"] = user
+        self.assertTrue((await communicator.connect())[0])
+        return communicator
+
+    async def test_answers_are_graded_and_written_once_at_round_end(self):
+        ana_user = await get_user_model().objects.acreate(username="ana")
+        luis_user = await get_user_model().objects.acreate(username="luis")
+        ana, luis = await self.connect(ana_user), await self.connect(luis_user)
+
+        answer = {"action": "submit_answer", "question_id": self.question.id, "answer_id": self.right.id}
+        await ana.send_json_to(answer)
+        self.assertIn("error", await receive_event(ana))  # no round running yet
+
+        await ana.send_json_to({"action": "start_timer", "duration": 1, "question_ids": [self.question.id]})
+        await receive_event(ana)
+        await receive_event(luis)
+
+        # The player comes from the socket's user, not from the message.
+        await ana.send_json_to({**answer, "player_name": "luis"})
+        result = await receive_event(ana)
+        self.assertEqual((result["event"], result["correct"], result["score"]), ("answer_result", True, rooms.POINTS_PER_CORRECT))
+        await ana.send_json_to({**answer, "answer_id": self.wrong.id})
+        self.assertIn("already answered", (await receive_event(ana))["error"])
+
+        await luis.send_json_to({**answer, "answer_id": self.wrong.id})
+        result = await receive_event(luis)
+        self.assertEqual((result["correct"], result["score"]), (False, 0))
+        self.assertTrue(await luis.receive_nothing(timeout=0.1))  # results only go to the sender
+        self.assertEqual(await Score.objects.acount(), 0)
+        # Tallies live in the shared cache, not in this process.
+        state = await rooms.get_state("answers")
+        self.assertEqual(sorted(await rooms.round_scores("answers", state["round"])), [("ana", rooms.POINTS_PER_CORRECT), ("luis", 0)])
+
+        self.assertEqual((await receive_event(ana, timeout=3))["event"], "ended")
+        self.assertEqual((await receive_event(luis, timeout=3))["event"], "ended")
+        scores = {name: points async for name, points in Score.objects.values_list("player_name", "points")}
+        self.assertEqual(scores, {"ana": rooms.POINTS_PER_CORRECT, "luis": 0})
+        for communicator in (ana, luis):
+            await communicator.disconnect()
+        self.assertEqual(await Score.objects.acount(), 2)
+
+    async def test_answers_need_a_user_and_a_question_of_the_round(self):
+        other = await Question.objects.acreate(quiz_category_id=self.question.quiz_category_id, text="¿Otra?")
+        anonymous = await self.connect()
+        player = await self.connect(await get_user_model().objects.acreate(username="eva"))
+        await player.send_json_to({"action": "start_timer", "duration": 60, "count": 1})
+        started = await receive_event(player)
+        await receive_event(anonymous)
+        self.assertEqual(len(started["question_ids"]), 1)
+
+        dealt = started["question_ids"][0]
+        await anonymous.send_json_to({"action": "submit_answer", "question_id": dealt, "answer_id": self.right.id})
+        self.assertIn("Authentication required", (await receive_event(anonymous))["error"])
+        outside = other.id if dealt == self.question.id else self.question.id
+        await player.send_json_to({"action": "submit_answer", "question_id": outside, "answer_id": self.right.id})
+        self.assertIn("not part of this round", (await receive_event(player))["error"])
+        await player.send_json_to({"action": "stop_timer"})
+        for communicator in (anonymous, player):
+            await communicator.disconnect()
+
+    async def test_stop_timer_writes_the_round_once_and_logs_a_failed_write(self):
+        ana = await self.connect(await get_user_model().objects.acreate(username="ana"))
+        luis = await self.connect(await get_user_model().objects.acreate(username="luis"))
+
+        async def play_round():
+            await ana.send_json_to({"action": "start_timer", "duration": 60, "question_ids": [self.question.id]})
+            for communicator in (ana, luis):
+                await receive_event(communicator)
+            await ana.send_json_to({"action": "submit_answer", "question_id": self.question.id, "answer_id": self.right.id})
+            await receive_event(ana)
+            await luis.send_json_to({"action": "stop_timer"})
+            for communicator in (ana, luis):
+                self.assertEqual((await receive_event(communicator))["event"], "ended")
+
+        with mock.patch("quiz.rooms.save_scores", wraps=save_scores) as save:
+            await play_round()
+        self.assertEqual(save.call_count, 1)  # not once per socket
+        self.assertEqual(await Score.objects.acount(), 1)
+        with mock.patch("quiz.rooms.save_scores", side_effect=DatabaseError), self.assertLogs("quiz.rooms", "ERROR"):
+            await play_round()
+        for communicator in (ana, luis):
+            await communicator.disconnect()
+
+    async def test_sockets_authenticate_with_a_jwt(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from quiz_project.asgi import application
+
+        user = await get_user_model().objects.acreate(username="jwt-player")
+        token = str(AccessToken.for_user(user))
+        player = await self.connect(path=f"/ws/quiz/timer/jwt/?token={token}", application=application)
+        await player.send_json_to({"action": "start_timer", "duration": 60, "question_ids": [self.question.id]})
+        await receive_event(player)
+        await player.send_json_to({"action": "submit_answer", "question_id": self.question.id, "answer_id": self.right.id})
+        self.assertEqual((await receive_event(player))["score"], rooms.POINTS_PER_CORRECT)
+
+        forged = await self.connect(path="/ws/quiz/timer/jwt/?token=forged", application=application)
+        await receive_event(forged)  # current state
+        await forged.send_json_to({"action": "submit_answer", "question_id": self.question.id, "answer_id": self.right.id})
+        self.assertIn("Authentication required", (await receive_event(forged))["error"])
+        await player.send_json_to({"action": "stop_timer"})
+        for communicator in (player, forged):
+            await communicator.disconnect()
+
+
+# 📝 Vectorized batch grading
+class BatchGradingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username="grader", password="secret"))
+        leaderboard.invalidate()
+        self.history, self.science = QuizCategory.objects.create(name="Historia"), QuizCategory.objects.create(name="Ciencia")
+        self.questions = []
+        for category in (self.history, self.science):
+            for number in range(3):
+                question = Question.objects.create(quiz_category=category, text=f"{category.name} {number}?")
+                right = Answer.objects.create(question=question, text="sí", is_correct=True)
+                wrong = Answer.objects.create(question=question, text="no", is_correct=False)
+                self.questions.append((question.id, right.id, wrong.id))
+        answer_key.refresh()
+
+    def test_grade_many_handles_several_correct_answers_and_unknown_questions(self):
+        question_id, right_id, wrong_id = self.questions[0]
+        also_right = Answer.objects.create(question_id=question_id, text="también", is_correct=True)
+        key = AnswerKey()
+        key.refresh()
+        with self.assertNumQueries(0):
+            codes = key.grade_many(
+                [question_id, question_id, question_id, self.questions[1][0], 999999],
+                [right_id, also_right.id, wrong_id, self.questions[1][1], right_id],
+            )
+        self.assertEqual(codes.tolist(), [1, 1, 0, 1, UNKNOWN])
+
+    def test_refresh_rereads_only_the_changed_categories(self):
+        key = AnswerKey()
+        key.refresh()
+        question_id, _, wrong_id = self.questions[-1]  # a science question
+        Answer.objects.filter(id=wrong_id).update(is_correct=True)
+        content_cache.bump(self.science.id)
+        with mock.patch.object(answer_key_module, "_fetch", wraps=answer_key_module._fetch) as fetch:
+            key.refresh()
+        fetch.assert_called_once_with([self.science.id])
+        self.assertIs(key.grade(question_id, wrong_id), True)
+        self.assertIs(key.grade(self.questions[0][0], self.questions[0][1]), True)
+
+    def test_endpoint_grades_sheets_and_optionally_saves_scores(self):
+        (q1, r1, w1), (q2, r2, _), (q3, _, w3) = self.questions[:3]
+        payload = {"save": True, "sheets": [
+            {"player_name": "ana", "answers": [[q1, r1], [q2, r2], [q3, w3]]},
+            {"player_name": "bob", "answers": [[q1, w1], [999999, 1]]},
+            {"player_name": "cid", "answers": [[q1, "r1"]]},
+        ]}
+        response = self.client.post(reverse("grade-answer-sheets"), payload, format="json")
+        self.assertEqual(response.status_code, 207)
+        body = response.json()
+        self.assertEqual(
+            [(row["player_name"], row["correct"], row["unknown"], row["points"]) for row in body["results"]],
+            [("ana", 2, 0, 20), ("bob", 0, 1, 0)],
+        )
+        self.assertEqual(body["errors"][0]["index"], 2)
+        self.assertEqual(dict(Score.objects.values_list("player_name", "points")), {"ana": 20, "bob": 0})
+
+    def test_endpoint_requires_authentication(self):
+        response = APIClient().post(reverse("grade-answer-sheets"), {"sheets": []}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+
+# ⚡ Async read endpoints
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        leaderboard.invalidate()
+        question_index.reset()
+        self.questions = create_questions(5)
+        for name, points in (("ana", 70), ("bob", 90)):
+            Score.objects.create(player_name=name, points=points)
+
+    def get_async(self, name, *args, **params):
+        return async_to_sync(self.async_client.get)(reverse(name, args=args), params)
+
+    def test_async_views_return_the_sync_payloads(self):
+        question_id = self.questions[0].id
+        for async_name, sync_name, args in (
+            ("async-categories", "quizcategory-list", ()),
+            ("async-question-detail", "question-detail", (question_id,)),
+            ("async-ranking", "get-ranking", ()),
+        ):
+            with self.subTest(async_name):
+                response = self.get_async(async_name, *args)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), self.client.get(reverse(sync_name, args=args)).json())
+
+    def test_random_questions_and_errors(self):
+        response = self.get_async("async-random-questions", count=3, category="General Knowledge")
+        self.assertEqual(response.status_code, 200)
+        questions = response.json()
+        self.assertEqual(len({question["id"] for question in questions}), 3)
+        self.assertTrue(all(len(question["answers"]) == 4 for question in questions))
+
+        self.assertEqual(self.get_async("async-random-questions", category="Nope").status_code, 400)
+        self.assertEqual(self.get_async("async-random-questions", count=6).status_code, 400)
+        self.assertEqual(self.get_async("async-ranking", window="year").status_code, 400)
+        self.assertEqual(self.get_async("async-question-detail", 999999).status_code, 404)
+
+    def test_a_board_dropped_during_the_rebuild_is_rebuilt_in_a_thread(self):
+        # The sync builders would raise SynchronousOnlyOperation on the event loop.
+        for owner, drop in (
+            (question_index, question_index.reset),
+            (leaderboard, lambda: setattr(leaderboard, "_entries", None)),
+        ):
+            rebuild = owner.rebuild
+
+            def rebuild_then_drop_once():
+                result = rebuild()
+                if calls.call_count == 1:
+                    drop()  # e.g. a bulk insert or rebuild_leaderboard lands meanwhile
+                return result
+
+            drop()
+            with self.subTest(type(owner).__name__), \
+                    mock.patch.object(owner, "rebuild", side_effect=rebuild_then_drop_once) as calls:
+                if owner is question_index:
+                    self.assertEqual(len(async_to_sync(question_index.asample_ids)(10)), 5)
+                else:
+                    self.assertEqual(async_to_sync(leaderboard.atop)(1)[0]["player_name"], "bob")
+                self.assertEqual(calls.call_count, 2)
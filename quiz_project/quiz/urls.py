@@ -2,9 +2,10 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from . import async_views
 from .views import (
-    api_home, get_random_questions, submit_score, get_ranking, get_all_questions,
-    add_question, edit_question, delete_question, add_answer, edit_answer, delete_answer,
+    api_home, get_random_questions, search_questions, create_quiz_session, get_next_session_question, get_session_questions, submit_score, submit_scores_batch, grade_answer_sheets, get_ranking, get_player_rank, get_all_questions,
+    add_question, edit_question, delete_question, enqueue_generation, get_generation_job, add_answer, edit_answer, delete_answer,
     QuizCategoryViewSet, QuestionViewSet, AnswerViewSet, ScoreViewSet, PublicView
 )
 
@@ -26,9 +27,17 @@ urlpatterns = [
     # 🎯 Quiz Endpoints
     path('questions/random/', get_random_questions, name="get-random-questions"),
     path('questions/all/', get_all_questions, name="get-all-questions"),
+    path('questions/search/', search_questions, name="search-questions"),
     path('questions/add/', add_question, name="add-question"),
     path('questions/edit/<int:question_id>/', edit_question, name="edit-question"),
     path('questions/delete/<int:question_id>/', delete_question, name="delete-question"),
+    path('questions/generate/', enqueue_generation, name="enqueue-generation"),
+    path('questions/generate/<int:job_id>/', get_generation_job, name="generation-job"),
+
+    # 🃏 Quiz Sessions
+    path('sessions/', create_quiz_session, name="create-quiz-session"),
+    path('sessions/<str:session_id>/next/', get_next_session_question, name="session-next-question"),
+    path('sessions/<str:session_id>/questions/', get_session_questions, name="session-questions"),
 
     # 🎯 Answer Endpoints
     path('answers/add/<int:question_id>/', add_answer, name="add-answer"),
@@ -37,7 +46,16 @@ urlpatterns = [
 
     # 🏆 Scores & Rankings
     path('scores/submit/', submit_score, name="submit-score"),
+    path('scores/submit/batch/', submit_scores_batch, name="submit-scores-batch"),
+    path('scores/grade/', grade_answer_sheets, name="grade-answer-sheets"),
     path('scores/ranking/', get_ranking, name="get-ranking"),
+    path('scores/ranking/<str:player_name>/', get_player_rank, name="get-player-rank"),
+
+    # ⚡ Async read endpoints (served on the event loop under ASGI)
+    path('async/questions/random/', async_views.random_questions, name="async-random-questions"),
+    path('async/questions/<int:question_id>/', async_views.question_detail, name="async-question-detail"),
+    path('async/categories/', async_views.categories, name="async-categories"),
+    path('async/ranking/', async_views.ranking, name="async-ranking"),
 
     # 🔐 Authentication (JWT)
     path('api/auth/token/', TokenObtainPairView.as_view(), name="token_obtain_pair"),
@@ -1,29 +1,10 @@
 import random
-from faker import Faker
-from quiz.models import QuizCategory, Question, Answer
 
-fake = Faker()
+from quiz.dataset import generate
 
-def create_fake_data():
-    # Create 50 quiz categories
-    categories = []
-    for _ in range(50):
-        category = QuizCategory.objects.create(name=fake.word().capitalize())
-        categories.append(category)
-
-    # Create 50 questions per category (total of 2500 questions)
-    difficulties = ['easy', 'medium', 'hard']
-    for category in categories:
-        for _ in range(50):
-            question = Question.objects.create(
-                text=fake.sentence(),
-                quiz_category=category,
-                difficulty=random.choice(difficulties)
-            )
-            
-            # Create 4 answers per question (one correct and three incorrect)
-            correct_answer = Answer.objects.create(question=question, text=fake.sentence(), is_correct=True)
-            for _ in range(3):
-                Answer.objects.create(question=question, text=fake.sentence(), is_correct=False)
 
+def create_fake_data(seed=None):
+    # 50 categories, 2500 questions with 1 correct and 3 incorrect answers each,
+    # inserted in bulk (see generate_dataset for larger, seeded datasets)
+    generate(seed=random.randrange(2 ** 32) if seed is None else seed, questions=2500, categories=50, log=lambda message: None)
     print("Fake data created successfully!")
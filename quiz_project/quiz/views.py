@@ -1,44 +1,31 @@
-import random
 import json
-import openai
+from itertools import islice
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.core.cache import cache
 from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework import viewsets, status
-from .models import Question, Answer, Score, QuizCategory
-from .serializers import QuestionSerializer, AnswerSerializer, ScoreSerializer, QuizCategorySerializer
-
-
-# ✅ OpenAI API Setup
-openai.api_base = "https://api.openai.com/v1"
-openai.api_key = settings.OPENAI_API_KEY
-
-
-# 🔍 Helper to Fetch Questions from OpenAI with Caching
-def fetch_questions_from_openai():
-    """Fetches general knowledge questions from OpenAI and caches them for 1 hour."""
-    cached_questions = cache.get("questions")
-    if cached_questions:
-        return cached_questions
-    
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": "Generate 5 general knowledge questions with 3 options and one correct answer. JSON format."}],
-            temperature=0.7
-        )
-        questions = json.loads(response["choices"][0]["message"]["content"])
-        cache.set("questions", questions, timeout=3600)
-        return questions
-
-    except Exception as e:
-        print(f"Error fetching questions from OpenAI: {e}")
-        return []
+from .models import Question, Answer, Score, QuizCategory, GenerationJob
+from .serializers import QuestionSerializer, AnswerSerializer, ScoreSerializer, QuizCategorySerializer, GenerationJobSerializer
+from . import content_cache, rollups
+from .answer_key import POINTS_PER_CORRECT, answer_key, grade_sheets, validate_sheets
+from .leaderboard import leaderboard
+from .pagination import QuestionCursorPagination
+from .score_ingest import save_scores, score_buffer, validate_scores, write_behind_enabled
+from .sampler import fetch_questions, sample_questions
+from .search import search_question_ids
+from .quiz_session import create_session, get_session, next_question, page_questions
+
+DEFAULT_RANDOM_COUNT = 10
+MAX_RANDOM_COUNT = 50
+EXPORT_CHUNK_SIZE = 2000
+MAX_RANKING_RADIUS = 50
+MAX_SCORE_BATCH = 1000
+MAX_GRADE_SHEETS = 100000
 
 
 # 🌐 API Home
@@ -48,43 +35,240 @@ def api_home(request):
     return JsonResponse({"message": "Welcome to the Quiz API!"})
 
 
-# 🎯 Get 10 Random Questions
+# 🎯 Get Random Questions
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_random_questions(request):
-    """Returns 10 random questions with caching."""
-    cached_questions = cache.get("random_questions")
-    if cached_questions:
-        return Response(json.loads(cached_questions))
+    """
+    Returns random questions drawn from the in-memory ID index.
+
+    Optional filters: ``?category=<id|name>``, ``?difficulty=easy|medium|hard``
+    and ``?count=<n>`` (default 10). Every call gets a fresh draw; use a quiz
+    session to keep a stable per-player deck.
+    """
+    filters, error = _parse_question_filters(request.query_params)
+    if error:
+        return Response({"error": error}, status=400)
+    category_id, difficulty, count = filters
+
+    questions = sample_questions(count, category_id=category_id, difficulty=difficulty)
+    if len(questions) < count:
+        return Response({"error": "Not enough questions available."}, status=400)
+    return Response(QuestionSerializer(questions, many=True).data)
+
+
+def _parse_question_filters(params):
+    """Parse ``category``, ``difficulty`` and ``count`` query params."""
+    category_id = None
+    category = str(params.get("category") or "")
+    if category:
+        if category.isdigit():
+            category_id = int(category)
+        else:
+            category_id = QuizCategory.objects.filter(name=category).values_list("id", flat=True).first()
+            if category_id is None:
+                return None, f"Unknown category '{category}'."
+
+    difficulty = params.get("difficulty") or None
+    if difficulty and difficulty not in dict(Question.DIFFICULTY_CHOICES):
+        return None, f"Invalid difficulty '{difficulty}'."
+
+    try:
+        count = int(params.get("count", DEFAULT_RANDOM_COUNT))
+    except ValueError:
+        return None, "count must be an integer."
+    if not 1 <= count <= MAX_RANDOM_COUNT:
+        return None, f"count must be between 1 and {MAX_RANDOM_COUNT}."
+
+    return (category_id, difficulty, count), None
+
 
-    questions = list(Question.objects.all())
-    if len(questions) < 10:
+# 🃏 Create a Per-Player Quiz Session
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def create_quiz_session(request):
+    """
+    Deal a seeded deck of questions for one player.
+
+    Accepts the same ``category``, ``difficulty`` and ``count`` filters as the
+    random endpoint, as query params or in the body.
+    """
+    params = request.query_params.copy()
+    params.update(request.data)
+    filters, error = _parse_question_filters(params)
+    if error:
+        return Response({"error": error}, status=400)
+    category_id, difficulty, count = filters
+
+    session = create_session(count, category_id=category_id, difficulty=difficulty)
+    if session is None:
         return Response({"error": "Not enough questions available."}, status=400)
+    return Response(
+        {"session_id": session.session_id, "seed": session.seed, "count": len(session.question_ids)},
+        status=status.HTTP_201_CREATED,
+    )
 
-    random.shuffle(questions)
-    selected_questions = QuestionSerializer(questions[:10], many=True).data
-    cache.set("random_questions", json.dumps(selected_questions), timeout=3600)
-    return Response(selected_questions)
+
+# 🃏 Serve the Next Question of a Session
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_next_session_question(request, session_id):
+    """Return the next question of the session's deck."""
+    session = get_session(session_id)
+    if session is None:
+        return Response({"error": "Session not found or expired."}, status=status.HTTP_404_NOT_FOUND)
+
+    question = next_question(session)
+    if question is None:
+        return Response({"finished": True, "remaining": 0})
+    return Response({
+        "finished": False,
+        "position": session.cursor,
+        "remaining": session.remaining,
+        "question": QuestionSerializer(question).data,
+    })
+
+
+# 🃏 Serve a Page of a Session's Deck
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_session_questions(request, session_id):
+    """Return a page of the session's deck (``?page=`` and ``?page_size=``)."""
+    session = get_session(session_id)
+    if session is None:
+        return Response({"error": "Session not found or expired."}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        page = int(request.query_params.get("page", 1))
+        page_size = int(request.query_params.get("page_size", settings.REST_FRAMEWORK.get("PAGE_SIZE", 10)))
+    except ValueError:
+        return Response({"error": "page and page_size must be integers."}, status=400)
+    if page < 1 or not 1 <= page_size <= MAX_RANDOM_COUNT:
+        return Response({"error": f"page must be >= 1 and page_size between 1 and {MAX_RANDOM_COUNT}."}, status=400)
+
+    questions = page_questions(session, page, page_size)
+    return Response({
+        "count": len(session.question_ids),
+        "page": page,
+        "results": QuestionSerializer(questions, many=True).data,
+    })
 
 
 # 🎯 Get All Questions
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_all_questions(request):
-    """Retrieve all questions."""
-    questions = Question.objects.all()
-    serializer = QuestionSerializer(questions, many=True)
-    return Response(serializer.data)
+    """
+    Retrieve all questions, cursor-paginated on ``id``.
+
+    ``?export=jsonl`` streams the whole bank as JSON Lines instead, reading the
+    table in chunks so memory stays flat regardless of its size.
+    """
+    questions = Question.objects.with_answers()
+    if request.query_params.get("export") == "jsonl":
+        response = StreamingHttpResponse(_stream_questions_jsonl(questions), content_type="application/x-ndjson")
+        response["Content-Disposition"] = 'attachment; filename="questions.jsonl"'
+        return response
+
+    paginator = QuestionCursorPagination()
+
+    def render_page():
+        page = paginator.paginate_queryset(questions, request)
+        serializer = QuestionSerializer(page, many=True)
+        return paginator.cacheable_data(paginator.get_paginated_response(serializer.data).data)
+
+    # Keyed on the page itself, not the URL: extra query params or another host
+    # must not create new entries.
+    data = content_cache.get_or_set("all_questions", paginator.page_key(request), render_page)
+    return Response(paginator.with_links(data, request))
+
+
+async def _stream_questions_jsonl(questions, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one JSON document per question, prefetching answers per chunk."""
+    # Async so ASGI sends each chunk as it is read instead of buffering the export.
+    rows = questions.order_by("id").iterator(chunk_size=chunk_size)
+    next_chunk = sync_to_async(
+        lambda: "".join(json.dumps(QuestionSerializer(question).data) + "\n" for question in islice(rows, chunk_size))
+    )
+    while chunk := await next_chunk():
+        yield chunk
+
+
+# 🔎 Search Questions
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_questions(request):
+    """
+    Full-text search over question and answer text, best match first.
+
+    ``?q=<terms>`` (prefix-matched), paginated with ``?page=`` and ``?page_size=``.
+    """
+    text = request.query_params.get("q", "").strip()
+    if not text:
+        return Response({"error": "q is required."}, status=400)
+    try:
+        page = int(request.query_params.get("page", 1))
+        page_size = int(request.query_params.get("page_size", QuestionCursorPagination.page_size))
+    except ValueError:
+        return Response({"error": "page and page_size must be integers."}, status=400)
+    if page < 1 or not 1 <= page_size <= QuestionCursorPagination.max_page_size:
+        return Response({"error": f"page must be >= 1 and page_size between 1 and {QuestionCursorPagination.max_page_size}."}, status=400)
+
+    def render_page():
+        # Fetch one extra hit to know whether there is a next page without a COUNT.
+        hits = search_question_ids(text, limit=page_size + 1, offset=(page - 1) * page_size)
+        has_next = len(hits) > page_size
+        questions = fetch_questions([question_id for question_id, _ in hits[:page_size]])
+        return {
+            "page": page,
+            "next": page + 1 if has_next else None,
+            "results": QuestionSerializer(questions, many=True).data,
+        }
+
+    return Response(content_cache.get_or_set("search", (text, page, page_size), render_page))
 
 
 # 🏆 Get Top 10 Rankings
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_ranking(request):
-    """Retrieve the top 10 scores."""
-    scores = Score.objects.order_by('-points')[:10]
-    serializer = ScoreSerializer(scores, many=True)
-    return Response(serializer.data)
+    """
+    Retrieve the top 10 players by best score.
+
+    ``?window=day|week|month`` ranks the current period from the score rollups;
+    ``all`` (the default) uses the all-time materialized leaderboard.
+    """
+    window = request.query_params.get("window", "all")
+    if window == "all":
+        return Response(leaderboard.top(10))
+    if window not in rollups.PERIODS:
+        return Response({"error": "window must be one of day, week, month, all."}, status=400)
+    return Response(rollups.top(window, 10))
+
+
+# 🏆 Get a Player's Rank
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_player_rank(request, player_name):
+    """
+    Retrieve a player's rank and best score.
+
+    ``?around=<n>`` also returns up to ``n`` players above and below them.
+    """
+    row = leaderboard.rank(player_name)
+    if row is None:
+        return Response({"error": "Player has no scores."}, status=status.HTTP_404_NOT_FOUND)
+
+    around = request.query_params.get("around")
+    if around is None:
+        return Response(row)
+    try:
+        radius = min(int(around), MAX_RANKING_RADIUS)
+    except ValueError:
+        return Response({"error": "around must be an integer."}, status=400)
+    if radius < 0:
+        return Response({"error": "around must not be negative."}, status=400)
+    return Response({**row, "around": leaderboard.around(player_name, radius)})
 
 
 # 🔒 Submit Player's Score (Protected)
@@ -92,14 +276,88 @@ def get_ranking(request):
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def submit_score(request):
-    """Submit a player's score."""
+    """
+    Submit a player's score.
+
+    With ``QUIZ_SCORE_WRITE_BEHIND`` enabled the score is queued for a bulk
+    write and the request returns 202 immediately.
+    """
     serializer = ScoreSerializer(data=request.data)
     if serializer.is_valid():
+        if write_behind_enabled():
+            score_buffer.add([Score(**serializer.validated_data)])
+            return Response({"message": "Score accepted."}, status=status.HTTP_202_ACCEPTED)
         serializer.save()
         return Response({"message": "Score submitted successfully!"}, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# 🔒 Submit a Batch of Scores (Protected)
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def submit_scores_batch(request):
+    """
+    Submit many players' scores at once (e.g. a whole room at round end).
+
+    Valid items are written in a single transaction; invalid ones are reported
+    by index without failing the rest of the batch.
+    """
+    items = request.data.get("scores") if isinstance(request.data, dict) else request.data
+    if not isinstance(items, list) or not items:
+        return Response({"error": "Expected a non-empty list of scores."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > MAX_SCORE_BATCH:
+        return Response({"error": f"A batch may contain at most {MAX_SCORE_BATCH} scores."}, status=status.HTTP_400_BAD_REQUEST)
+
+    scores, errors = validate_scores(items)
+    if write_behind_enabled() and scores:
+        score_buffer.add(scores)
+        return Response({"accepted": len(scores), "errors": errors}, status=status.HTTP_202_ACCEPTED)
+
+    created = save_scores(scores)
+    if not created:
+        response_status = status.HTTP_400_BAD_REQUEST
+    elif errors:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_201_CREATED
+    return Response({"created": len(created), "errors": errors}, status=response_status)
+
+
+# 🔒 Grade a Batch of Answer Sheets (Protected)
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def grade_answer_sheets(request):
+    """
+    Grade many players' answer sheets on the server.
+
+    Body: ``{"sheets": [{"player_name": "ana", "answers": [[question_id, answer_id], ...]}],
+    "save": false}``. Sheets are graded together against the in-memory answer
+    key; with ``save`` one score per sheet is written with a single bulk insert.
+    """
+    items = request.data.get("sheets") if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not items:
+        return Response({"error": "Expected a non-empty list of sheets."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > MAX_GRADE_SHEETS:
+        return Response({"error": f"At most {MAX_GRADE_SHEETS} sheets can be graded at once."}, status=status.HTTP_400_BAD_REQUEST)
+
+    player_names, sheets, errors = validate_sheets(items)
+    if not sheets:
+        return Response({"results": [], "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+    if answer_key.needs_check():
+        answer_key.refresh()
+    correct, unknown = grade_sheets(sheets)
+    points = correct * POINTS_PER_CORRECT
+    results = [
+        {"player_name": name, "answered": len(sheet), "correct": hits, "unknown": misses, "points": total}
+        for name, sheet, hits, misses, total in zip(player_names, sheets, correct.tolist(), unknown.tolist(), points.tolist())
+    ]
+    if request.data.get("save") is True:
+        save_scores([Score(player_name=name, points=total) for name, total in zip(player_names, points.tolist())])
+    return Response({"results": results, "errors": errors}, status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_200_OK)
+
+
 # 🛠️ Add a New Question (Protected)
 @api_view(['POST'])
 @authentication_classes([JWTAuthentication])
@@ -109,11 +367,38 @@ def add_question(request):
     serializer = QuestionSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save()
-        cache.delete("random_questions")  # Invalidate cache
         return Response({"message": "Question added successfully!"}, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# 🤖 Queue OpenAI Question Generation (Protected)
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def enqueue_generation(request):
+    """
+    Queue a question-generation job and return its id immediately.
+
+    A ``run_generation_jobs`` worker calls OpenAI and stores the questions;
+    poll ``questions/generate/<job_id>/`` for the outcome.
+    """
+    serializer = GenerationJobSerializer(data=request.data)
+    if serializer.is_valid():
+        job = serializer.save()
+        return Response({"job_id": job.id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# 🤖 Generation Job Status (Protected)
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def get_generation_job(request, job_id):
+    """Return the status (and result or error) of a generation job."""
+    job = get_object_or_404(GenerationJob, id=job_id)
+    return Response(GenerationJobSerializer(job).data)
+
+
 # 🛠️ Edit an Existing Question (Protected)
 @api_view(['PUT'])
 @authentication_classes([JWTAuthentication])
@@ -124,7 +409,6 @@ def edit_question(request, question_id):
     serializer = QuestionSerializer(question, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
-        cache.delete("random_questions")  # Invalidate cache
         return Response({"message": "Question updated successfully!"}, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -137,7 +421,6 @@ def delete_question(request, question_id):
     """Delete a question."""
     question = get_object_or_404(Question, id=question_id)
     question.delete()
-    cache.delete("random_questions")  # Invalidate cache
     return Response({"message": "Question deleted successfully!"}, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -198,8 +481,9 @@ class QuizCategoryViewSet(viewsets.ModelViewSet):
 
 
 class QuestionViewSet(viewsets.ModelViewSet):
-    queryset = Question.objects.all()
+    queryset = Question.objects.with_answers()
     serializer_class = QuestionSerializer
+    pagination_class = QuestionCursorPagination
 
 
 class AnswerViewSet(viewsets.ModelViewSet):
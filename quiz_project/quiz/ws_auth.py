@@ -0,0 +1,40 @@
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+
+# 🔐 WebSocket authentication
+@database_sync_to_async
+def user_for_token(raw_token):
+    """The user of a simplejwt access token, or ``AnonymousUser`` if it is not valid."""
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Sets ``scope["user"]`` from ``?token=<access token>``, the same JWT the REST API takes.
+
+    Browsers cannot send an ``Authorization`` header on a WebSocket, hence the
+    query string. Without a token the session user set by ``AuthMiddlewareStack``
+    is kept.
+    """
+
+    async def __call__(self, scope, receive, send):
+        token = parse_qs(scope.get("query_string", b"").decode()).get("token")
+        if token:
+            scope = dict(scope, user=await user_for_token(token[0]))
+        return await super().__call__(scope, receive, send)
+
+
+def JWTAuthMiddlewareStack(inner):
+    """Session (cookie) authentication, overridden by a JWT when one is given."""
+    return AuthMiddlewareStack(JWTAuthMiddleware(inner))
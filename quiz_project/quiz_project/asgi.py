@@ -2,13 +2,17 @@ import os
 import django
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from quiz.routing import websocket_urlpatterns 
 
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quiz_project.settings')
 django.setup()
 
+# Después de django.setup(): los consumers importan modelos
+from quiz.routing import websocket_urlpatterns  # noqa: E402
+from quiz.ws_auth import JWTAuthMiddlewareStack  # noqa: E402
+
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
-    "websocket": URLRouter(websocket_urlpatterns),
+    # scope["user"]: sesión de Django o ?token=<JWT de acceso>
+    "websocket": JWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns)),
 })
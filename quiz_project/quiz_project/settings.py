@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -97,12 +98,41 @@ CHANNEL_LAYERS = {
 }
 
 
-# Configuración de Redis para cachear preguntas generadas
+# Caché en dos niveles: LRU por proceso (L1) delante de una caché compartida (L2).
+# L2 necesita add/incr atómicos (single-flight, cursores de sesión, salas, presencia):
+# Redis es obligatorio con más de un proceso (QUIZ_CACHE_REDIS_URL). Sin él, L2 es una
+# caché en memoria del propio proceso, válida solo para desarrollo con un único worker.
+# Los tests usan siempre la caché en memoria para no compartir estado con otros entornos.
+QUIZ_CACHE_REDIS_URL = os.environ.get('QUIZ_CACHE_REDIS_URL')
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
 CACHES = {
     'default': {
+        'BACKEND': 'quiz.cache_backends.TwoTierCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 5,
+            'L1_CHECK_INTERVAL': 0.5,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': QUIZ_CACHE_REDIS_URL,
+    } if QUIZ_CACHE_REDIS_URL and not TESTING else {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'LOCATION': 'quiz-shared',
+        # Sesiones y salas viven aquí: que no se descarten a las 300 entradas.
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
 }
+# Las sesiones de quiz se reescriben en cada respuesta: van directas a L2.
+QUIZ_SESSION_CACHE = 'shared'
+# Estado de las salas en tiempo real (temporizador...): compartido entre procesos, sin L1.
+QUIZ_ROOM_CACHE = 'shared'
+# Los eventos de una sala dentro de esta ventana (segundos) salen en un solo group_send.
+QUIZ_BROADCAST_WINDOW = 0.05
+# Journal (fsync) de las puntuaciones en write-behind hasta que llegan a la base de datos; None lo desactiva.
+QUIZ_SCORE_SPOOL_DIR = BASE_DIR / 'score_spool'
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',